@@ -1,13 +1,93 @@
 """API's Fast API Application."""
 
+import asyncio
 import contextlib
+import math
+from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from api.db import create_engine
+from api.articles.fragments import ArticleFragments
+from api.articles.like_buffer import LikeBuffer
+from api.cache import (
+    Cache,
+    CacheBackend,
+    MemoryBackend,
+    RedisBackend,
+    ShardedBackend,
+)
+from api.circuit_breaker import CircuitOpenError
+from api.concurrency import AdaptiveLimiter, ConcurrencyLimitExceeded
+from api.db import async_session_maker, create_engine
+from api.deadlines import DeadlineExceeded
+from api.instrumentation import (
+    SlowQueryLog,
+    StatementCacheStats,
+    install_query_tags,
+    install_query_timing,
+)
+from api.invalidation import InvalidationBus
+from api.middlewares import DeadlineMiddleware, ServerTimingMiddleware
 from api.routers import v1
-from api.settings import Settings
+from api.settings import Settings, SharedCacheSettings
+from api.singleflight import SingleFlight
+from api.stale import stale_response
+from api.warmup import warm_up
+
+
+def _create_instrumented_engine(
+    db_url: str, settings: Settings
+) -> tuple[AsyncEngine, StatementCacheStats]:
+    """Create an engine with the API's statement instrumentation."""
+    engine = create_engine(
+        db_url=db_url,
+        pool=settings.DB_POOL,
+        statement_cache=settings.DB_STATEMENT_CACHE,
+        circuit_breaker=settings.DB_CIRCUIT_BREAKER,
+    )
+    if settings.DB_QUERY_TAGS:
+        install_query_tags(engine)
+    statement_cache_stats = StatementCacheStats.install(engine)
+    install_query_timing(engine)
+
+    slow_query = settings.DB_SLOW_QUERY
+    if slow_query.threshold_ms is not None:
+        SlowQueryLog.install(
+            engine,
+            threshold=slow_query.threshold_ms / 1000,
+            explain=slow_query.explain,
+            max_explains=slow_query.max_explains,
+        )
+    return engine, statement_cache_stats
+
+
+def _create_shared_cache(settings: SharedCacheSettings) -> Cache:
+    """Create the shared cache on the configured nodes."""
+    backend: CacheBackend
+    if not settings.nodes:
+        backend = MemoryBackend(max_bytes=settings.max_bytes)
+    else:
+        nodes: dict[str, CacheBackend] = {}
+        for node in settings.nodes:
+            host, _, port = node.rpartition(":")
+            nodes[node] = RedisBackend(
+                host,
+                int(port),
+                max_connections=settings.max_connections,
+                timeout=settings.timeout,
+            )
+        backend = (
+            ShardedBackend(nodes)
+            if len(nodes) > 1
+            else nodes[settings.nodes[0]]
+        )
+    return Cache(
+        backend, namespace=settings.namespace, default_ttl=settings.ttl
+    )
 
 
 @contextlib.asynccontextmanager
@@ -15,14 +95,179 @@ async def lifespan(app: FastAPI):
     """Application ASGI's lifespan handler."""
     settings = app.state.settings
 
-    engine = create_engine(db_url=settings.get_db_url())
+    engine, app.state.db_statement_cache_stats = _create_instrumented_engine(
+        settings.get_db_url(), settings
+    )
     app.state.db_engine = engine
 
+    replica_engine = None
+    app.state.db_replica_statement_cache_stats = None
+    if settings.DB_REPLICA_URL:
+        replica_engine, app.state.db_replica_statement_cache_stats = (
+            _create_instrumented_engine(settings.DB_REPLICA_URL, settings)
+        )
+    app.state.db_replica_engine = replica_engine
+
+    # session factories are reused by every request
+    app.state.db_session_maker = async_session_maker(engine)
+    app.state.db_primary_read_session_maker = async_session_maker(
+        engine, read_only=True
+    )
+    app.state.db_read_session_maker = async_session_maker(
+        replica_engine or engine, read_only=True
+    )
+
+    concurrency = settings.DB_CONCURRENCY
+    app.state.db_limiter = None
+    if concurrency.enabled:
+        app.state.db_limiter = AdaptiveLimiter(
+            initial_limit=concurrency.initial_limit,
+            min_limit=concurrency.min_limit,
+            max_limit=concurrency.max_limit,
+            latency_threshold=concurrency.latency_threshold_ms / 1000,
+            backoff=concurrency.backoff,
+            retry_after=concurrency.retry_after,
+        )
+
+    invalidation_bus = None
+    if settings.CACHE.enabled:
+        invalidation_bus = InvalidationBus(
+            # the listener uses asyncpg directly
+            dsn=settings.get_db_url().replace("+asyncpg", ""),
+            channel=settings.CACHE.invalidation_channel,
+            cache_max_size=settings.CACHE.max_size,
+            cache_ttl=settings.CACHE.ttl,
+            reconnect_delay=settings.CACHE.reconnect_delay,
+        )
+        await invalidation_bus.start()
+    app.state.invalidation_bus = invalidation_bus
+
+    shared_cache = None
+    if settings.SHARED_CACHE.enabled:
+        shared_cache = _create_shared_cache(settings.SHARED_CACHE)
+    app.state.shared_cache = shared_cache
+    app.state.article_fragments = ArticleFragments(
+        shared_cache,
+        single_flight=(
+            SingleFlight() if settings.SHARED_CACHE.single_flight else None
+        ),
+        early_refresh_beta=settings.SHARED_CACHE.early_refresh_beta,
+        stale_if_error=settings.SHARED_CACHE.stale_if_error,
+    )
+
+    like_buffer = None
+    if settings.LIKE_BUFFER.enabled:
+        like_buffer = LikeBuffer(
+            app.state.db_session_maker,
+            flush_interval=settings.LIKE_BUFFER.flush_interval,
+        )
+        await like_buffer.start()
+    app.state.like_buffer = like_buffer
+
+    # `/readyz` reports not ready until the warm-up is done
+    app.state.warmed_up = False
+    warm_up_task = None
+    if settings.WARM_UP.enabled:
+
+        async def run_warm_up() -> None:
+            try:
+                await warm_up(app, settings.WARM_UP)
+            finally:
+                app.state.warmed_up = True
+
+        warm_up_task = asyncio.get_running_loop().create_task(run_warm_up())
+    else:
+        app.state.warmed_up = True
+    app.state.warm_up_task = warm_up_task
+
     try:
         yield
     finally:
+        if warm_up_task is not None:
+            warm_up_task.cancel()
+        if like_buffer is not None:
+            # before the engine, the last flush needs it
+            await like_buffer.stop()
+        app.state.like_buffer = None
+        if invalidation_bus is not None:
+            await invalidation_bus.stop()
+        app.state.invalidation_bus = None
+        if shared_cache is not None:
+            await shared_cache.close()
+        app.state.shared_cache = None
         app.state.db_engine = None
+        app.state.db_replica_engine = None
         await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
+
+async def _stale_response(request: Request) -> Optional[Response]:
+    """Get the stale copy of the response of a request, if any."""
+    max_stale = request.app.state.settings.SHARED_CACHE.stale_if_error
+    return await stale_response(request, max_stale)
+
+
+async def _circuit_open_handler(
+    request: Request, error: CircuitOpenError
+) -> Response:
+    """Fail fast while the database circuit is open."""
+    stale = await _stale_response(request)
+    if stale is not None:
+        return stale
+    return JSONResponse(
+        {"detail": "Database is unavailable, try again later."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+async def _concurrency_limit_handler(
+    request: Request, error: ConcurrencyLimitExceeded
+) -> JSONResponse:
+    """Shed load beyond the database concurrency limit."""
+    return JSONResponse(
+        {"detail": "Too many requests, try again later."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+async def _pool_timeout_handler(
+    request: Request, error: exc.TimeoutError
+) -> Response:
+    """No database connection got free in time."""
+    stale = await _stale_response(request)
+    if stale is not None:
+        return stale
+    return JSONResponse(
+        {"detail": "Database is busy, try again later."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+async def _deadline_exceeded_handler(
+    request: Request, error: DeadlineExceeded
+) -> Response:
+    """The request deadline passed, its statement was cancelled."""
+    stale = await _stale_response(request)
+    if stale is not None:
+        return stale
+    return JSONResponse(
+        {"detail": "Request deadline exceeded."},
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+    )
+
+
+async def _database_error_handler(
+    request: Request, error: Exception
+) -> Response:
+    """The database connection failed, e.g. during a failover."""
+    stale = await _stale_response(request)
+    if stale is not None:
+        return stale
+    # an internal server error, as without the handler
+    raise error
 
 
 def create_app(settings: Settings) -> FastAPI:
@@ -42,9 +287,29 @@ def create_app(settings: Settings) -> FastAPI:
     # Routers
     app.include_router(v1.router)
 
+    # Exception handlers
+    app.add_exception_handler(CircuitOpenError, _circuit_open_handler)
+    app.add_exception_handler(
+        ConcurrencyLimitExceeded, _concurrency_limit_handler
+    )
+    app.add_exception_handler(exc.TimeoutError, _pool_timeout_handler)
+    app.add_exception_handler(DeadlineExceeded, _deadline_exceeded_handler)
+    # connecting fails with the errors of the socket
+    for error in (exc.OperationalError, exc.InterfaceError, OSError):
+        app.add_exception_handler(error, _database_error_handler)
+
     # Middlewares
     app.add_middleware(
         CORSMiddleware,
         **settings.CORS_MIDDLEWARE.model_dump(),
     )
+    app.add_middleware(
+        DeadlineMiddleware,
+        default_timeout=settings.REQUEST_TIMEOUT_SECONDS,
+        max_timeout=settings.MAX_REQUEST_TIMEOUT_SECONDS,
+    )
+    app.add_middleware(
+        ServerTimingMiddleware,
+        emit_header=settings.SERVER_TIMING_HEADER,
+    )
     return app
@@ -1,20 +1,81 @@
 """Module for dependencies related to articles."""
 
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import Depends
+from fastapi import Depends, FastAPI, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.articles.fragments import ArticleFragments
+from api.articles.like_buffer import LikeBuffer
 from api.articles.managers import ArticleManager
-from api.dependencies import get_db_session
+from api.articles.schemas import ArticleFieldset
+from api.dependencies import (
+    get_app_instance,
+    get_db_read_session,
+    get_db_session,
+)
+
+
+async def get_article_fragments(
+    app: Annotated[FastAPI, Depends(get_app_instance)],
+) -> ArticleFragments:
+    """Dependency to provide the pre-encoded article JSON of the app."""
+    return app.state.article_fragments
+
+
+async def get_like_buffer(
+    app: Annotated[FastAPI, Depends(get_app_instance)],
+) -> Optional[LikeBuffer]:
+    """Dependency to provide the like buffer of the app, if enabled."""
+    return app.state.like_buffer
 
 
 async def get_article_manager(
     db: Annotated[AsyncSession, Depends(get_db_session)],
+    fragments: Annotated[ArticleFragments, Depends(get_article_fragments)],
+    like_buffer: Annotated[Optional[LikeBuffer], Depends(get_like_buffer)],
 ) -> ArticleManager:
     """Dependency to provide an instance of ArticleManager.
 
     This function is used to inject the ArticleManager into routes that
     require it.
     """
-    return ArticleManager(db)
+    return ArticleManager(
+        db,
+        fragments=fragments,
+        like_buffer=like_buffer,
+    )
+
+
+async def get_article_read_manager(
+    db: Annotated[AsyncSession, Depends(get_db_read_session)],
+    fragments: Annotated[ArticleFragments, Depends(get_article_fragments)],
+    like_buffer: Annotated[Optional[LikeBuffer], Depends(get_like_buffer)],
+) -> ArticleManager:
+    """Dependency to provide a read-only instance of ArticleManager.
+
+    The manager runs on the read replica (if configured) inside `READ ONLY`
+    transactions, so it must only be used by routes which do not write.
+    """
+    return ArticleManager(
+        db,
+        fragments=fragments,
+        like_buffer=like_buffer,
+    )
+
+
+async def get_article_fieldset(
+    fields: Annotated[
+        Optional[str],
+        Query(description="Comma separated article fields to return."),
+    ] = None,
+    include: Annotated[
+        Optional[str],
+        Query(description="Comma separated relationships to embed."),
+    ] = None,
+) -> ArticleFieldset:
+    """Dependency to parse the sparse fieldset of article routes."""
+    try:
+        return ArticleFieldset.from_query(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
@@ -0,0 +1,341 @@
+"""Pre-encoded JSON of articles.
+
+Building and encoding article responses is the largest CPU cost of the read
+routes. The JSON of every article is kept in the shared cache per
+representation, tagged with the version it was built from (see
+`ArticleManager.get_article_version()`), and responses are assembled from
+the cached bytes:
+
+```python
+fragments = ArticleFragments(cache)
+versions = await manager.list_article_versions(limit=20)
+cached = await fragments.get_many(versions, DETAIL)
+...
+await fragments.set_many([(version, encode(response)), ...], DETAIL)
+```
+
+A fragment of another version is never served. Writes delete the
+fragments of their article too, so they do not take memory until they
+expire.
+
+Hot fragments are protected from stampedes: concurrent builds of the same
+fragment are coalesced by `get_or_build()`, concurrent reads of the same
+versions by `coalesce_read()`, and fragments are rebuilt a little before
+they expire by one reader at random (see `api.cache.early_refresh`).
+
+Fragments, and the last pages of the article list, are kept for
+`stale_if_error` seconds past their expiry, to be served by `get_stale()`
+while the database fails (see `api.stale`).
+"""
+
+import hashlib
+import json
+import math
+import time
+from typing import Awaitable, Callable, Optional, Sequence, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import exc
+from sqlalchemy.engine import Row
+
+from api.cache import Cache, LocalCache
+from api.cache.early_refresh import refresh_early
+from api.deadlines import DeadlineExceeded, is_query_canceled
+from api.singleflight import SingleFlight
+
+DETAIL = "detail"
+"""The full article with a preview of its comments, alone or listed."""
+REPRESENTATIONS = (DETAIL,)
+
+T = TypeVar("T")
+
+
+def fragment_key(article_id: int, representation: str) -> str:
+    """Get the cache key of an article representation."""
+    return f"article:{article_id}:{representation}"
+
+
+def fragment_keys(article_id: int) -> list[str]:
+    """Get the cache keys of all representations of an article."""
+    return [fragment_key(article_id, r) for r in REPRESENTATIONS]
+
+
+def version_tag(version: Row) -> bytes:
+    """Get a short digest of an article version."""
+    raw = json.dumps(tuple(version), default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:32].encode()
+
+
+def encode(response: BaseModel) -> bytes:
+    """Encode a response model to JSON."""
+    return response.model_dump_json().encode()
+
+
+def page_key(limit: Optional[int], cursor: Optional[str]) -> str:
+    """Get the cache key of a page of the article list."""
+    if limit is None:
+        return "articles:all"
+    return f"articles:{limit}:{cursor or ''}"
+
+
+def _pack(tag: bytes, stored: float, delta: float, data: bytes) -> bytes:
+    # the store and build times are kept for the early refresh, in ms
+    return b"%s %d %d %s" % (
+        tag,
+        round(stored * 1000),
+        round(delta * 1000),
+        data,
+    )
+
+
+def _unpack(value: bytes) -> tuple[bytes, float, float, bytes]:
+    tag, stored_ms, delta_ms, data = value.split(b" ", 3)
+    return tag, int(stored_ms) / 1000, int(delta_ms) / 1000, data
+
+
+class ArticleFragments:
+    """Get and store the JSON of article versions."""
+
+    def __init__(
+        self,
+        cache: Optional[Cache],
+        single_flight: Optional[SingleFlight] = None,
+        early_refresh_beta: float = 1.0,
+        stale_if_error: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize ArticleFragments.
+
+        Args:
+            cache (Optional[Cache]): The shared cache; nothing is cached
+                without.
+            single_flight (Optional[SingleFlight]): Coalesces the builds
+                of `get_or_build()` and the reads of `coalesce_read()`,
+                they are not without.
+            early_refresh_beta (float): Eagerness to rebuild fragments
+                before they expire, `0` waits for them to expire.
+            stale_if_error (float): Seconds fragments are kept past their
+                expiry, for `get_stale()`.
+            clock (Callable[[], float]): Unix time source.
+        """
+        self.cache = cache
+        self.single_flight = single_flight
+        self.early_refresh_beta = early_refresh_beta
+        self.stale_if_error = stale_if_error
+        self.stale_served = 0
+        """Stale copies given out by `get_stale()`."""
+        self.writes = 0
+        """Writes of articles committed by this worker, see `written()`."""
+        self._clock = clock
+        # ETags of the pages this worker stored, until they expire
+        ttl = cache.default_ttl if cache is not None else None
+        self._stored_pages = LocalCache(
+            max_size=1000,
+            ttl=ttl if ttl is not None else math.inf,
+            clock=clock,
+        )
+
+    def _expires(self, stored: float) -> Optional[float]:
+        ttl = self.cache.default_ttl if self.cache is not None else None
+        return stored + ttl if ttl is not None else None
+
+    async def _set(self, items: dict[str, bytes]) -> None:
+        ttl = self.cache.default_ttl
+        if ttl is not None:
+            ttl += self.stale_if_error
+        await self.cache.set_many(items, ttl)
+
+    async def get_many(
+        self, versions: Sequence[Row], representation: str
+    ) -> dict[int, bytes]:
+        """Get the cached JSON of article versions, by article ID.
+
+        Expired fragments, and the ones picked for an early refresh, are
+        left out.
+        """
+        if self.cache is None or not versions:
+            return {}
+        by_key = {fragment_key(v.id, representation): v for v in versions}
+        found = await self.cache.get_many(list(by_key))
+        now = self._clock()
+        fragments = {}
+        for key, value in found.items():
+            version = by_key[key]
+            try:
+                tag, stored, delta, data = _unpack(value)
+            except ValueError:
+                continue
+            expires = self._expires(stored)
+            if tag != version_tag(version):
+                continue
+            if expires is not None and now >= expires:
+                continue
+            if refresh_early(expires, delta, self.early_refresh_beta, now=now):
+                continue
+            fragments[version.id] = data
+        return fragments
+
+    async def set_many(
+        self,
+        fragments: Sequence[tuple[Row, bytes]],
+        representation: str,
+        delta: float = 0.0,
+    ) -> None:
+        """Store the JSON of article versions.
+
+        Args:
+            fragments (Sequence[tuple[Row, bytes]]): Versions and their
+                JSON.
+            representation (str): One of `REPRESENTATIONS`.
+            delta (float): Seconds it took to build the fragments, the
+                longer the earlier they are refreshed.
+        """
+        if self.cache is None or not fragments:
+            return
+        now = self._clock()
+        await self._set(
+            {
+                fragment_key(version.id, representation): _pack(
+                    version_tag(version), now, delta, data
+                )
+                for version, data in fragments
+            }
+        )
+
+    async def get_or_build(
+        self,
+        version: Row,
+        representation: str,
+        build: Callable[[], Awaitable[Optional[bytes]]],
+        deadline: Optional[float] = None,
+    ) -> Optional[bytes]:
+        """Get the cached JSON of an article version, or build and store it.
+
+        Concurrent calls for the same version share a single build.
+
+        Args:
+            version (Row): The article version.
+            representation (str): One of `REPRESENTATIONS`.
+            build (Callable[[], Awaitable[Optional[bytes]]]): Builds the
+                JSON, `None` if the article is gone.
+            deadline (Optional[float]): `time.monotonic()` deadline of the
+                caller, see `api.deadlines`.
+        """
+        cached = await self.get_many([version], representation)
+        if version.id in cached:
+            return cached[version.id]
+
+        async def build_and_store() -> Optional[bytes]:
+            start = time.perf_counter()
+            data = await build()
+            if data is not None:
+                delta = time.perf_counter() - start
+                await self.set_many([(version, data)], representation, delta)
+            return data
+
+        if self.single_flight is None:
+            return await build_and_store()
+        # builds of other versions are not joined, they may be older than
+        # the version the caller read
+        key = f"{fragment_key(version.id, representation)}:"
+        key += version_tag(version).decode()
+        return await self._share(key, build_and_store, deadline)
+
+    async def coalesce_read(
+        self,
+        key: str,
+        read: Callable[[], Awaitable[T]],
+        deadline: Optional[float] = None,
+    ) -> T:
+        """Run a read of article versions, or join the same one in flight.
+
+        Reads in flight since before the last `written()` are not joined,
+        so a client reading after its write, through this worker, sees it.
+
+        Args:
+            key (str): Identifies the read, its query, parameters and the
+                database it runs on.
+            read (Callable[[], Awaitable[T]]): Runs the read.
+            deadline (Optional[float]): `time.monotonic()` deadline of the
+                caller, see `api.deadlines`.
+        """
+        if self.single_flight is None:
+            return await read()
+        return await self._share(f"{key}@{self.writes}", read, deadline)
+
+    async def _share(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        deadline: Optional[float],
+    ) -> T:
+        async def run() -> T:
+            try:
+                return await call()
+            except exc.DBAPIError as e:
+                if is_query_canceled(e):
+                    raise DeadlineExceeded() from e
+                raise
+
+        # every caller keeps its own deadline, a call cancelled at the
+        # deadline of the caller running it is run again by its waiters
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time.monotonic(), 0)
+        try:
+            return await self.single_flight.do(
+                key, run, timeout=timeout, retry_on=(DeadlineExceeded,)
+            )
+        except TimeoutError:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded() from None
+            raise
+
+    def written(self) -> None:
+        """Count a write of articles committed by this worker."""
+        self.writes += 1
+
+    async def set_page(self, key: str, data: bytes, etag: str) -> None:
+        """Store the JSON of a page of the article list, see `page_key()`.
+
+        Pages are only read by `get_stale()`, the fresh ones are assembled
+        from the fragments of their articles. A page is only written again
+        once its `etag` changed or the copy of this worker expired.
+        """
+        if self.cache is None or self._stored_pages.get(key) == etag:
+            return
+        await self._set({key: _pack(b"-", self._clock(), 0, data)})
+        self._stored_pages.set(key, etag)
+
+    def forget_pages(self) -> None:
+        """Write all pages again on their next `set_page()`."""
+        self._stored_pages.clear()
+
+    async def get_stale(self, key: str) -> Optional[tuple[bytes, float]]:
+        """Get the JSON stored under a key, whichever its version.
+
+        Returns:
+            Optional[tuple[bytes, float]]: The JSON and its age in seconds,
+                `None` if it is missing or more than `stale_if_error`
+                seconds past its expiry.
+        """
+        if self.cache is None or self.stale_if_error <= 0:
+            return None
+        value = await self.cache.get(key)
+        if value is None:
+            return None
+        try:
+            _tag, stored, _delta, data = _unpack(value)
+        except ValueError:
+            return None
+        now = self._clock()
+        expires = self._expires(stored)
+        if expires is not None and now - expires > self.stale_if_error:
+            return None
+        self.stale_served += 1
+        return data, now - stored
+
+    async def delete(self, article_id: int) -> None:
+        """Delete the JSON of all versions of an article."""
+        if self.cache is not None:
+            await self.cache.delete(*fragment_keys(article_id))
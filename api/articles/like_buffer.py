@@ -0,0 +1,274 @@
+"""Write-behind buffer of like counters.
+
+Every like of an article increments the same `likes` row, so a popular
+article makes all its likers wait for each other's row lock. With the
+buffer, likes are only added up in the worker's memory, and a background
+task writes all the deltas at once every `flush_interval` seconds:
+
+```python
+buffer = LikeBuffer(session_maker, flush_interval=1.0)
+await buffer.start()
+
+buffer.add("Article", article_id, likes=1)
+likes, dislikes = buffer.merge("Article", article_id, db_counts)
+...
+await buffer.stop()  # flushes what is left
+```
+
+Reads add the deltas not written yet to the counters of the database, so
+the counts a worker serves do not go backwards when it flushes:
+
+```python
+likes, dislikes = await buffer.read(read_counts, merge_deltas)
+```
+
+Reads of a replica still miss the deltas of a flush for as long as the
+replica lags behind the commit.
+
+Likes of a worker which dies before flushing are lost, and so are the
+likes of articles deleted before the flush.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    bindparam,
+    exists,
+    func,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.articles.models import Article, Comment, Like
+
+logger = logging.getLogger(__name__)
+
+Key = tuple[str, int]
+"""`(likeable_type, likeable_id)` of a like counter."""
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_LIKES = Like.__table__
+# all deltas in a single statement of a fixed shape, whatever their number
+_DELTAS = (
+    func.unnest(
+        bindparam("likeable_types", type_=ARRAY(String)),
+        bindparam("likeable_ids", type_=ARRAY(Integer)),
+        bindparam("likes", type_=ARRAY(Integer)),
+        bindparam("dislikes", type_=ARRAY(Integer)),
+    )
+    .table_valued("likeable_type", "likeable_id", "likes", "dislikes")
+    .render_derived(name="deltas")
+)
+# counters of deleted articles and comments are not created again
+_LIKEABLE_EXISTS = or_(
+    *(
+        and_(
+            _DELTAS.c.likeable_type == likeable_type,
+            exists().where(model.id == _DELTAS.c.likeable_id),
+        )
+        for likeable_type, model in (("Article", Article), ("Comment", Comment))
+    )
+)
+_NEW_LIKES = insert(_LIKES).from_select(
+    ["likeable_type", "likeable_id", "likes", "dislikes"],
+    # `WHERE` also keeps `ON CONFLICT` from being parsed as a join condition
+    select(_DELTAS).where(_LIKEABLE_EXISTS),
+)
+_FLUSH_STATEMENT = _NEW_LIKES.on_conflict_do_update(
+    index_elements=[_LIKES.c.likeable_type, _LIKES.c.likeable_id],
+    set_={
+        "likes": _LIKES.c.likes + _NEW_LIKES.excluded.likes,
+        "dislikes": _LIKES.c.dislikes + _NEW_LIKES.excluded.dislikes,
+        "updated_at": func.now(),
+    },
+)
+
+
+class LikeBuffer:
+    """Add up like counter increments in memory and write them in batches."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        flush_interval: float = 1.0,
+    ) -> None:
+        """Initialize LikeBuffer.
+
+        Args:
+            session_maker (async_sessionmaker[AsyncSession]): Sessions on
+                the primary database, to write the deltas.
+            flush_interval (float): Seconds between two writes.
+        """
+        self.session_maker = session_maker
+        self.flush_interval = flush_interval
+        self.flushes = 0
+        """Batches written."""
+        self.errors = 0
+        """Batches which failed and were put back."""
+        self._pending: dict[Key, tuple[int, int]] = {}
+        # taken out of `_pending` but not committed yet, still counted
+        self._flushing: dict[Key, tuple[int, int]] = {}
+        # bumped when a flush starts to commit and once it committed, odd
+        # in between, see `read()`
+        self._generation = 0
+        self._committed = asyncio.Event()
+        self._committed.set()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        likeable_type: str,
+        likeable_id: int,
+        likes: int = 0,
+        dislikes: int = 0,
+    ) -> None:
+        """Add likes and dislikes to a counter, written by the next flush."""
+        key = (likeable_type, likeable_id)
+        pending_likes, pending_dislikes = self._pending.get(key, (0, 0))
+        self._pending[key] = (
+            pending_likes + likes,
+            pending_dislikes + dislikes,
+        )
+
+    def pending(self, likeable_type: str, likeable_id: int) -> tuple[int, int]:
+        """Get the likes and dislikes of a counter not written yet."""
+        key = (likeable_type, likeable_id)
+        likes, dislikes = self._pending.get(key, (0, 0))
+        flushing_likes, flushing_dislikes = self._flushing.get(key, (0, 0))
+        return likes + flushing_likes, dislikes + flushing_dislikes
+
+    def merge(
+        self, likeable_type: str, likeable_id: int, counts: tuple[int, int]
+    ) -> tuple[int, int]:
+        """Add the deltas not written yet to counters read from the database."""
+        likes, dislikes = self.pending(likeable_type, likeable_id)
+        return counts[0] + likes, counts[1] + dislikes
+
+    @property
+    def generation(self) -> int:
+        """Flush commits started and finished, odd while one commits."""
+        return self._generation
+
+    async def read(
+        self,
+        read: Callable[[int], Awaitable[T]],
+        merge: Callable[[T], R],
+    ) -> R:
+        """Read counters from the database and merge the deltas not written
+        yet into them.
+
+        A read which may have seen the database before a flush committed
+        and the buffer after it, missing the flushed deltas, or the other
+        way around, counting them twice, is run again.
+
+        Args:
+            read (Callable[[int], Awaitable[T]]): Reads the counters, given
+                the `generation` it runs in; reads of another generation
+                must not be shared with it.
+            merge (Callable[[T], R]): Adds the deltas to what was read,
+                with `pending()` or `merge()`.
+        """
+        while True:
+            while not self._committed.is_set():
+                await self._committed.wait()
+            generation = self._generation
+            result = await read(generation)
+            # no commit started since the read started, the database and
+            # the buffer agree
+            if self._generation == generation:
+                return merge(result)
+
+    async def flush(self) -> int:
+        """Write all pending deltas in a single statement.
+
+        Deltas which fail to be written are put back, for the next flush.
+
+        Returns:
+            int: Number of counters written.
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+            # sorted, so concurrent flushes of workers lock rows in the same
+            # order and can't deadlock
+            self._flushing = dict(sorted(self._pending.items()))
+            self._pending = {}
+            flushing = self._flushing
+            try:
+                await self._write(flushing)
+            except Exception:
+                logger.warning("Failed to flush like counters", exc_info=True)
+                if self._flushing is not flushing:
+                    # failed once committed, e.g. closing the session
+                    return len(flushing)
+                self.errors += 1
+                self._flushing = {}
+                for key, (likes, dislikes) in flushing.items():
+                    self.add(*key, likes=likes, dislikes=dislikes)
+                return 0
+            return len(flushing)
+
+    async def _write(self, deltas: dict[Key, tuple[int, int]]) -> None:
+        async with self.session_maker() as session:
+            await session.execute(
+                _FLUSH_STATEMENT,
+                {
+                    "likeable_types": [key[0] for key in deltas],
+                    "likeable_ids": [key[1] for key in deltas],
+                    "likes": [likes for likes, _ in deltas.values()],
+                    "dislikes": [dislikes for _, dislikes in deltas.values()],
+                },
+            )
+            self._generation += 1
+            self._committed.clear()
+            try:
+                await session.commit()
+                # the reads which started before are run again by `read()`
+                self._flushing = {}
+                self.flushes += 1
+            finally:
+                self._generation += 1
+                self._committed.set()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # stopping must not interrupt a write, it would not know whether
+            # the deltas were committed
+            await asyncio.shield(self.flush())
+
+    async def start(self) -> None:
+        """Start flushing in a background task."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop flushing in the background and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the buffer state and counters as a dictionary."""
+        return {
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
@@ -1,20 +1,318 @@
 """Article repository manager to operate on the DB."""
 
-from typing import Optional
+from collections import namedtuple
+from datetime import datetime
+from typing import Awaitable, Callable, Collection, Optional, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Integer,
+    Text,
+    and_,
+    bindparam,
+    case,
+    cast,
+    event,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, load_only, selectinload
 
-from api.articles.models import Article, Like
+from api.articles.fragments import ArticleFragments
+from api.articles.like_buffer import LikeBuffer
+from api.articles.models import Article, Comment, Like
+from api.deadlines import session_deadline
+from api.instrumentation import tag_queries
 
+T = TypeVar("T")
+R = TypeVar("R")
 
+# Hot queries are built once: SQLAlchemy memoizes the cache key of a
+# statement object, so re-executing it skips construction and compilation,
+# and the SQL string stays stable for asyncpg's prepared statement cache.
+_ARTICLE_BY_ID_QUERY = select(Article).where(
+    Article.id == bindparam("article_id")
+)
+
+# Counters are incremented by the database, concurrent likes can't overwrite
+# each other; the row is only inserted for existing articles. It is a Core
+# statement, the ORM would run an INSERT with parameters as a bulk insert.
+_LIKES = Like.__table__
+_NEW_ARTICLE_LIKES = insert(_LIKES).from_select(
+    ["likeable_type", "likeable_id", "likes", "dislikes"],
+    select(
+        literal("Article"),
+        Article.id,
+        bindparam("likes", type_=Integer),
+        bindparam("dislikes", type_=Integer),
+    ).where(Article.id == bindparam("article_id")),
+)
+_ADD_LIKES_STATEMENT = _NEW_ARTICLE_LIKES.on_conflict_do_update(
+    index_elements=[_LIKES.c.likeable_type, _LIKES.c.likeable_id],
+    set_={
+        "likes": _LIKES.c.likes + _NEW_ARTICLE_LIKES.excluded.likes,
+        "dislikes": _LIKES.c.dislikes + _NEW_ARTICLE_LIKES.excluded.dislikes,
+        "updated_at": func.now(),
+    },
+).returning(_LIKES.c.likes, _LIKES.c.dislikes)
+
+# all rows are sent at once, the server defaults are returned along with the
+# IDs, so the articles need no refresh
+_INSERT_ARTICLES_STATEMENT = insert(Article).returning(
+    Article, sort_by_parameter_order=True
+)
+
+# What an article response is made of: its row, the state of its comments
+# and its like counters; read from the indexes but the article row.
+_COMMENT_STATS = (
+    select(
+        func.count().label("comments"),
+        func.max(Comment.updated_at).label("comments_updated_at"),
+    )
+    .where(Comment.article_id == Article.id)
+    .lateral("comment_stats")
+)
+_ARTICLE_VERSIONS_QUERY = (
+    select(
+        Article.id,
+        Article.created_at,
+        Article.updated_at,
+        _COMMENT_STATS.c.comments,
+        _COMMENT_STATS.c.comments_updated_at,
+        Like.likes,
+        Like.dislikes,
+    )
+    .select_from(Article)
+    .join(_COMMENT_STATS, true())
+    .outerjoin(
+        Like,
+        and_(Like.likeable_type == "Article", Like.likeable_id == Article.id),
+    )
+)
+_ARTICLE_VERSION_QUERY = _ARTICLE_VERSIONS_QUERY.where(
+    Article.id == bindparam("article_id")
+)
+# a version with the likes not written yet by the `LikeBuffer`
+_ArticleVersion = namedtuple(
+    "_ArticleVersion",
+    [column.name for column in _ARTICLE_VERSIONS_QUERY.selected_columns],
+)
+# the newest comments of every article, each one read from the index of
+# `(article_id, created_at, id)` and cut at the limit
+_PREVIEW_ARTICLES = (
+    func.unnest(bindparam("article_ids", type_=ARRAY(Integer)))
+    .table_valued("id")
+    .render_derived(name="preview_articles")
+)
+_LATEST_COMMENTS = (
+    select(Comment)
+    .where(Comment.article_id == _PREVIEW_ARTICLES.c.id)
+    .order_by(Comment.created_at.desc(), Comment.id.desc())
+    .limit(bindparam("comments", type_=Integer))
+    .lateral("latest_comments")
+)
+_LATEST_COMMENT = aliased(Comment, _LATEST_COMMENTS)
+_COMMENT_PREVIEWS_QUERY = (
+    select(_LATEST_COMMENT)
+    .select_from(_PREVIEW_ARTICLES)
+    .join(_LATEST_COMMENTS, true())
+    .order_by(
+        _LATEST_COMMENT.article_id,
+        _LATEST_COMMENT.created_at.desc(),
+        _LATEST_COMMENT.id.desc(),
+    )
+)
+# tells a missing article, no row, from one never liked, a row of NULLs
+_EXISTING_ARTICLE_LIKES_QUERY = (
+    select(Like.likes, Like.dislikes)
+    .select_from(Article)
+    .outerjoin(
+        Like,
+        and_(Like.likeable_type == "Article", Like.likeable_id == Article.id),
+    )
+    .where(Article.id == bindparam("article_id"))
+)
+
+
+def _isoformat(column):
+    """Write a timestamp the way pydantic does, as `row_to_json()` trims
+    the trailing zeros of the fraction: six digits, or none for whole
+    seconds.
+    """
+    fraction = func.to_char(column, "US")
+    return func.concat(
+        func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS'),
+        case((fraction == "000000", ""), else_=func.concat(".", fraction)),
+    ).label(column.key)
+
+
+# Full article responses rendered by the database, byte for byte those
+# encoded from `ArticleResponse`. `row_to_json()` writes compact JSON with
+# the keys in column order, and `LIMIT NULL` embeds all the comments.
+_ARTICLE_COMMENTS_JSON = func.array_to_json(
+    func.array(
+        select(
+            func.row_to_json(
+                select(
+                    Comment.id,
+                    Comment.content,
+                    _isoformat(Comment.created_at),
+                    _isoformat(Comment.updated_at),
+                )
+                .where(Comment.article_id == Article.id)
+                .order_by(Comment.created_at.desc(), Comment.id.desc())
+                .limit(bindparam("comments", type_=Integer))
+                .correlate(Article)
+                .subquery("comment")
+                .table_valued()
+            )
+        ).scalar_subquery()
+    )
+)
+# likes buffered by the `LikeBuffer`, not written yet
+_PENDING_LIKES = (
+    func.unnest(
+        bindparam("pending_ids", type_=ARRAY(Integer)),
+        bindparam("pending_likes", type_=ARRAY(Integer)),
+        bindparam("pending_dislikes", type_=ARRAY(Integer)),
+    )
+    .table_valued("article_id", "likes", "dislikes")
+    .render_derived(name="pending")
+)
+_ARTICLE_JSON_ROWS = (
+    select(
+        Article.title,
+        Article.short_description,
+        Article.description,
+        Article.id,
+        _isoformat(Article.created_at),
+        _isoformat(Article.updated_at),
+        _ARTICLE_COMMENTS_JSON.label("comments"),
+        (
+            func.coalesce(Like.likes, 0)
+            + func.coalesce(_PENDING_LIKES.c.likes, 0)
+        ).label("article_likes"),
+        (
+            func.coalesce(Like.dislikes, 0)
+            + func.coalesce(_PENDING_LIKES.c.dislikes, 0)
+        ).label("article_dislikes"),
+    )
+    .select_from(Article)
+    .outerjoin(
+        Like,
+        and_(Like.likeable_type == "Article", Like.likeable_id == Article.id),
+    )
+    .outerjoin(_PENDING_LIKES, _PENDING_LIKES.c.article_id == Article.id)
+    .where(
+        Article.id == func.any(bindparam("article_ids", type_=ARRAY(Integer)))
+    )
+    .subquery("article")
+)
+# read as text, the driver would decode JSON
+_ARTICLES_JSON_QUERY = select(
+    _ARTICLE_JSON_ROWS.c.id,
+    cast(func.row_to_json(_ARTICLE_JSON_ROWS.table_valued()), Text).label(
+        "json"
+    ),
+)
+
+
+def _load_options(
+    fields: Optional[Collection[str]],
+    include: Collection[str],
+    required: Collection[str] = (),
+) -> list:
+    """Loader options reading only some columns and relationships.
+
+    Columns not in `fields` are deferred, so they are never fetched.
+    Relationships are loaded by a second query, instead of a join which
+    would repeat the article row for every related row.
+
+    Args:
+        fields (Optional[Collection[str]]): Article columns to load, all if
+            `None`.
+        include (Collection[str]): Relationships to load.
+        required (Collection[str]): Columns the caller needs on top of
+            `fields`.
+    """
+    options = []
+    if fields is not None:
+        columns = [getattr(Article, name) for name in {*fields, *required}]
+        options.append(load_only(*columns))
+    if "comments" in include:
+        options.append(selectinload(Article.comments))
+    return options
+
+
+@tag_queries
 class ArticleManager:
     """Manager to run main actions on articles records."""
 
-    def __init__(self, session: AsyncSession):
-        """Initialize ArticleManager with a database session."""
+    def __init__(
+        self,
+        session: AsyncSession,
+        fragments: Optional[ArticleFragments] = None,
+        like_buffer: Optional[LikeBuffer] = None,
+    ):
+        """Initialize ArticleManager with a database session.
+
+        Args:
+            session (AsyncSession): The database session.
+            fragments (Optional[ArticleFragments]): The pre-encoded
+                article JSON in the shared cache; nothing is cached there
+                without.
+            like_buffer (Optional[LikeBuffer]): Buffers likes in memory
+                rather than writing them right away, if given.
+        """
         self.session = session
+        self.fragments = fragments or ArticleFragments(None)
+        self.like_buffer = like_buffer
+
+    async def _read_likes(
+        self, read: Callable[[int], Awaitable[T]], merge: Callable[[T], R]
+    ) -> R:
+        # the buffer runs the read again if it raced with a flush
+        if self.like_buffer is None:
+            return merge(await read(0))
+        return await self.like_buffer.read(read, merge)
+
+    def _merge_version(self, version: Row) -> Row:
+        if self.like_buffer is None:
+            return version
+        likes, dislikes = self.like_buffer.pending("Article", version.id)
+        if not likes and not dislikes:
+            return version
+        return _ArticleVersion(*version)._replace(
+            likes=(version.likes or 0) + likes,
+            dislikes=(version.dislikes or 0) + dislikes,
+        )
+
+    def _read_key(self, key: str, generation: int) -> str:
+        # reads of the primary, e.g. to read one's writes, must not join
+        # reads of a lagging replica, nor reads of another flush generation
+        # of the like buffer
+        url = self.session.sync_session.get_bind().engine.url
+        return f"{key}:{generation}:{url.render_as_string()}"
+
+    def _track_write(self) -> None:
+        # version reads in flight before the commit must not be joined after
+        event.listen(
+            self.session.sync_session,
+            "after_commit",
+            lambda _session: self.fragments.written(),
+            once=True,
+        )
+
+    async def _invalidate(self, article_id: int) -> None:
+        # fragments are checked against the article version, deleting them
+        # before the commit only frees their memory
+        await self.fragments.delete(article_id)
+        self._track_write()
 
     async def create_article(
         self,
@@ -40,73 +338,401 @@ class ArticleManager:
             description=description,
         )
         self.session.add(article)
+        self._track_write()
         if commit:
             await self.session.commit()
             await self.session.refresh(article)
         return article
 
-    async def get_article_likes(self, article_id: int) -> tuple[int, int]:
-        """Get like/dislike counts for an article.
+    async def create_articles(
+        self, articles: list[dict[str, Optional[str]]], commit: bool = True
+    ) -> list[Article]:
+        """Create articles with a single multi-row `INSERT ... RETURNING`.
+
         Args:
-            article_id (int): The ID of the article.
+            articles (list[dict[str, Optional[str]]]): `title`,
+                `short_description` and `description` of every article.
+            commit (bool): Whether to commit the transaction immediately.
 
         Returns:
-            tuple[int, int]: A tuple containing the number of likes and
-                dislikes.
+            list[Article]: The created Article instances, in the order of
+                `articles`.
         """
-        query = select(Like).where(
-            Like.likeable_type == "Article", Like.likeable_id == article_id
+        if not articles:
+            return []
+        res = await self.session.scalars(
+            _INSERT_ARTICLES_STATEMENT, [dict(values) for values in articles]
         )
-        res = await self.session.execute(query)
-        like = res.scalars().first()
-        if like:
-            return like.likes, like.dislikes
-        return 0, 0
+        created = list(res)
+        self._track_write()
+        if commit:
+            await self.session.commit()
+        return created
 
-    async def get_article_by_id(self, article_id: int) -> Optional[Article]:
-        """Retrieve an article by its ID, including comments.
+    async def get_article_by_id(
+        self,
+        article_id: int,
+        fields: Optional[Collection[str]] = None,
+        include: Collection[str] = (),
+    ) -> Optional[Article]:
+        """Retrieve an article by its ID.
 
         Args:
             article_id (int): The ID of the article to retrieve.
+            fields (Optional[Collection[str]]): Columns to load, all if
+                omitted; the others raise on access.
+            include (Collection[str]): Relationships to load, the others
+                raise on access.
 
         Returns:
             Optional[Article]: The Article instance if found, else None.
         """
+        query = _ARTICLE_BY_ID_QUERY
+        if fields is not None or include:
+            query = (
+                select(Article)
+                .options(*_load_options(fields, include))
+                .where(Article.id == bindparam("article_id"))
+            )
+        res = await self.session.execute(query, {"article_id": article_id})
+        return res.scalars().first()
+
+    async def get_articles_json(
+        self, article_ids: list[int], comments: Optional[int] = None
+    ) -> dict[int, bytes]:
+        """Render full articles as JSON in the database, in a single query.
+
+        The JSON is that of `ArticleResponse`, with the like counts and the
+        newest comments embedded; no ORM object is loaded.
+
+        Args:
+            article_ids (list[int]): The IDs of the articles to render.
+            comments (Optional[int]): Maximum number of comments embedded
+                in every article, all if omitted.
+
+        Returns:
+            dict[int, bytes]: The JSON of the articles found, by ID.
+        """
+
+        async def read(_generation: int) -> dict[int, bytes]:
+            pending = []
+            if self.like_buffer is not None:
+                for article_id in article_ids:
+                    likes = self.like_buffer.pending("Article", article_id)
+                    if likes != (0, 0):
+                        pending.append((article_id, *likes))
+            res = await self.session.execute(
+                _ARTICLES_JSON_QUERY,
+                {
+                    "article_ids": article_ids,
+                    "comments": comments,
+                    "pending_ids": [row[0] for row in pending],
+                    "pending_likes": [row[1] for row in pending],
+                    "pending_dislikes": [row[2] for row in pending],
+                },
+            )
+            return {row.id: row.json.encode() for row in res}
+
+        # the deltas are merged by the query
+        return await self._read_likes(read, lambda rendered: rendered)
+
+    async def get_article_version(self, article_id: int) -> Optional[Row]:
+        """Get a cheap version of an article, to tell whether it changed.
+
+        Args:
+            article_id (int): The ID of the article.
+
+        Returns:
+            Optional[Row]: `id`, `created_at`, `updated_at`, `comments`,
+                `comments_updated_at`, `likes` and `dislikes`, which change
+                with the article, its comments or its likes; None if the
+                article does not exist. `likes` and `dislikes` are None
+                for articles never liked.
+        """
+
+        async def query() -> Optional[Row]:
+            res = await self.session.execute(
+                _ARTICLE_VERSION_QUERY, {"article_id": article_id}
+            )
+            return res.first()
+
+        async def read(generation: int) -> Optional[Row]:
+            # concurrent requests for the article share a single query, the
+            # buffered likes are merged by each of them
+            return await self.fragments.coalesce_read(
+                self._read_key(f"version:{article_id}", generation),
+                query,
+                session_deadline(self.session),
+            )
+
+        def merge(version: Optional[Row]) -> Optional[Row]:
+            return self._merge_version(version) if version is not None else None
+
+        return await self._read_likes(read, merge)
+
+    async def list_article_versions(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[Row]:
+        """Get the versions of the articles `list_articles()` would list.
+
+        Args:
+            limit (Optional[int]): Maximum number of articles, all if
+                omitted.
+            after (Optional[tuple[datetime, int]]): `(created_at, id)` of
+                the last article of the previous page.
+
+        Returns:
+            list[Row]: The `get_article_version()` of each article, in the
+                order of `list_articles()`.
+        """
+        query = _ARTICLE_VERSIONS_QUERY.order_by(
+            Article.created_at.desc(), Article.id.desc()
+        )
+        if after is not None:
+            query = query.where(tuple_(Article.created_at, Article.id) < after)
+        if limit is not None:
+            query = query.limit(limit)
+
+        async def run() -> list[Row]:
+            return list(await self.session.execute(query))
+
+        async def read(generation: int) -> list[Row]:
+            return await self.fragments.coalesce_read(
+                self._read_key(f"versions:{limit}:{after}", generation),
+                run,
+                session_deadline(self.session),
+            )
+
+        return await self._read_likes(
+            read, lambda versions: [self._merge_version(v) for v in versions]
+        )
+
+    async def list_articles(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, int]] = None,
+        fields: Optional[Collection[str]] = None,
+        include: Collection[str] = (),
+    ) -> list[Article]:
+        """List articles, newest first.
+
+        Args:
+            limit (Optional[int]): Maximum number of articles, all if
+                omitted.
+            after (Optional[tuple[datetime, int]]): `(created_at, id)` of
+                the last article of the previous page; only older articles
+                are listed (keyset pagination).
+            fields (Optional[Collection[str]]): Columns to load, all if
+                omitted; `created_at` is always loaded for the cursor.
+            include (Collection[str]): Relationships to load, the others
+                raise on access.
+
+        Returns:
+            list[Article]: List of Article instances.
+        """
+        options = _load_options(fields, include, required=("created_at",))
         query = (
             select(Article)
-            .options(joinedload(Article.comments))
-            .where(Article.id == article_id)
+            .options(*options)
+            .order_by(Article.created_at.desc(), Article.id.desc())
         )
+        if after is not None:
+            query = query.where(tuple_(Article.created_at, Article.id) < after)
+        if limit is not None:
+            query = query.limit(limit)
         res = await self.session.execute(query)
-        return res.scalars().first()
+        return res.scalars().all()
+
+    async def get_articles_by_ids(
+        self,
+        article_ids: list[int],
+        fields: Optional[Collection[str]] = None,
+        include: Collection[str] = (),
+    ) -> list[Article]:
+        """Retrieve articles by their IDs, in no particular order.
+
+        Args:
+            article_ids (list[int]): The IDs of the articles to retrieve.
+            fields (Optional[Collection[str]]): Columns to load, all if
+                omitted; the others raise on access.
+            include (Collection[str]): Relationships to load, the others
+                raise on access.
+
+        Returns:
+            list[Article]: The articles found.
+        """
+        query = (
+            select(Article)
+            .options(*_load_options(fields, include))
+            .where(Article.id.in_(article_ids))
+        )
+        res = await self.session.execute(query)
+        return list(res.scalars())
+
+    async def list_comments(
+        self,
+        article_id: int,
+        limit: Optional[int] = None,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[Comment]:
+        """List comments of an article, newest first.
 
-    async def list_articles(self) -> list[Article]:
-        """List all articles in the database, including comments.
+        Args:
+            article_id (int): The ID of the article.
+            limit (Optional[int]): Maximum number of comments, all if
+                omitted.
+            after (Optional[tuple[datetime, int]]): `(created_at, id)` of
+                the last comment of the previous page; only older comments
+                are listed (keyset pagination).
 
         Returns:
-            list[Article]: List of all Article instances.
+            list[Comment]: List of Comment instances.
         """
-        query = select(Article).options(joinedload(Article.comments))
+        query = (
+            select(Comment)
+            .where(Comment.article_id == article_id)
+            .order_by(Comment.created_at.desc(), Comment.id.desc())
+        )
+        if after is not None:
+            query = query.where(tuple_(Comment.created_at, Comment.id) < after)
+        if limit is not None:
+            query = query.limit(limit)
         res = await self.session.execute(query)
-        return res.unique().scalars().all()
+        return list(res.scalars())
+
+    async def list_comment_previews(
+        self, article_ids: list[int], limit: int
+    ) -> dict[int, list[Comment]]:
+        """List the newest comments of several articles, in a single query.
 
-    async def get_likes_for_articles(
-        self, article_ids: list[int]
-    ) -> dict[int, tuple[int, int]]:
-        """Fetch likes/dislikes for all given article IDs in a single query.
         Args:
-            article_ids (list[int]): List of article IDs to fetch likes/
-                dislikes for.
+            article_ids (list[int]): The IDs of the articles.
+            limit (int): Maximum number of comments of every article.
 
         Returns:
-            dict[int, tuple[int, int]]: A mapping of article ID to
-                (likes, dislikes).
+            dict[int, list[Comment]]: The comments of every article, newest
+                first; articles without comments are left out.
         """
-        if not article_ids:
-            return {}
-        query = select(Like.likeable_id, Like.likes, Like.dislikes).where(
-            Like.likeable_type == "Article", Like.likeable_id.in_(article_ids)
+        res = await self.session.execute(
+            _COMMENT_PREVIEWS_QUERY,
+            {"article_ids": article_ids, "comments": limit},
         )
+        previews: dict[int, list[Comment]] = {}
+        for comment in res.scalars():
+            previews.setdefault(comment.article_id, []).append(comment)
+        return previews
+
+    async def article_exists(self, article_id: int) -> bool:
+        """Check whether an article exists.
+
+        Args:
+            article_id (int): The ID of the article.
+
+        Returns:
+            bool: True if the article exists.
+        """
+        query = select(Article.id).where(Article.id == article_id)
         res = await self.session.execute(query)
-        # Map: article_id -> (likes, dislikes)
-        return {row.likeable_id: (row.likes, row.dislikes) for row in res.all()}
+        return res.scalar() is not None
+
+    async def update_article(
+        self,
+        article: Article,
+        title: str,
+        short_description: Optional[str] = None,
+        description: Optional[str] = None,
+        commit: bool = True,
+    ) -> Article:
+        """Update an article and invalidate its cached data in all workers.
+
+        Args:
+            article (Article): The article to update.
+            title (str): The new title.
+            short_description (Optional[str]): The new short description.
+            description (Optional[str]): The new article text.
+            commit (bool): Whether to commit the transaction immediately.
+
+        Returns:
+            Article: The updated Article instance.
+        """
+        article.title = title
+        article.short_description = short_description
+        article.description = description
+        await self._invalidate(article.id)
+        if commit:
+            # `updated_at` is set on the Python side, nothing to refresh
+            await self.session.commit()
+        return article
+
+    async def delete_article(self, article: Article, commit: bool = True):
+        """Delete an article and invalidate its cached data in all workers.
+
+        Args:
+            article (Article): The article to delete.
+            commit (bool): Whether to commit the transaction immediately.
+        """
+        await self._invalidate(article.id)
+        await self.session.delete(article)
+        if commit:
+            await self.session.commit()
+
+    async def add_article_like(
+        self, article_id: int, dislike: bool = False, commit: bool = True
+    ) -> Optional[tuple[int, int]]:
+        """Like or dislike an article, in a single `INSERT ... ON CONFLICT`.
+
+        Args:
+            article_id (int): The ID of the article.
+            dislike (bool): Dislike the article rather than like it.
+            commit (bool): Whether to commit the transaction immediately.
+
+        Returns:
+            Optional[tuple[int, int]]: The numbers of likes and dislikes
+                after this one, None if the article does not exist.
+        """
+        if self.like_buffer is not None:
+            return await self._buffer_article_like(article_id, dislike)
+        res = await self.session.execute(
+            _ADD_LIKES_STATEMENT,
+            {
+                "article_id": article_id,
+                "likes": 0 if dislike else 1,
+                "dislikes": 1 if dislike else 0,
+            },
+        )
+        row = res.first()
+        if row is None:
+            return None
+        await self._invalidate(article_id)
+        if commit:
+            await self.session.commit()
+        return row.likes, row.dislikes
+
+    async def _buffer_article_like(
+        self, article_id: int, dislike: bool
+    ) -> Optional[tuple[int, int]]:
+
+        async def read(_generation: int) -> Optional[Row]:
+            res = await self.session.execute(
+                _EXISTING_ARTICLE_LIKES_QUERY, {"article_id": article_id}
+            )
+            return res.first()
+
+        def merge(row: Optional[Row]) -> Optional[tuple[int, int]]:
+            if row is None:
+                return None
+            # nothing is written, the buffer flushes the likes later; added
+            # here, a read run again must not add them twice
+            self.like_buffer.add(
+                "Article",
+                article_id,
+                likes=0 if dislike else 1,
+                dislikes=1 if dislike else 0,
+            )
+            return self.like_buffer.merge(
+                "Article", article_id, (row.likes or 0, row.dislikes or 0)
+            )
+
+        return await self.like_buffer.read(read, merge)
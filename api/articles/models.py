@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import List
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.schema import UniqueConstraint
 
@@ -29,11 +29,22 @@ class Article(Base):
         onupdate=datetime.now,
     )
 
+    # popular articles have thousands of comments: they are never loaded
+    # implicitly, but read in pages or with an explicit loader option, and
+    # the database deletes them along with the article. They are newest
+    # first, as in the article responses and comment pages.
     comments: Mapped[List["Comment"]] = relationship(
         "Comment",
-        lazy="joined",
+        lazy="raise",
+        order_by="(Comment.created_at.desc(), Comment.id.desc())",
         back_populates="article",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # keyset pagination of the article list, newest first
+        Index("ix_articles_created_at_id", "created_at", "id"),
     )
 
 
@@ -44,7 +55,8 @@ class Comment(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     article_id: Mapped[int] = mapped_column(
-        ForeignKey("articles.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("articles.id", ondelete="CASCADE"),
+        nullable=False,
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
@@ -61,6 +73,20 @@ class Comment(Base):
         "Article", back_populates="comments"
     )
 
+    __table_args__ = (
+        # keyset pagination of an article's comments, newest first; also
+        # serves lookups by `article_id` alone. `updated_at` is included so
+        # the comment stats of the article versions are read from the
+        # index only.
+        Index(
+            "ix_comments_article_id_created_at_id",
+            "article_id",
+            "created_at",
+            "id",
+            postgresql_include=["updated_at"],
+        ),
+    )
+
 
 class Like(Base):
     """Like/Dislike DB Model for polymorphic association (e.g., articles)."""
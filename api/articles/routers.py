@@ -1,13 +1,47 @@
 """Article API Router."""
 
-from typing import Annotated
+import json
+import time
+from datetime import datetime
+from typing import Annotated, Any, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from sqlalchemy.engine import Row
 
 from api.articles import schemas
-from api.articles.dependencies import get_article_manager
+from api.articles.dependencies import (
+    get_article_fieldset,
+    get_article_manager,
+    get_article_read_manager,
+)
+from api.articles.fragments import (
+    DETAIL,
+    encode,
+    fragment_key,
+    page_key,
+)
 from api.articles.managers import ArticleManager
-from api.articles.models import Article
+from api.articles.models import Article, Comment
+from api.deadlines import session_deadline
+from api.dependencies import get_app_settings
+from api.etags import (
+    ETAG_HEADER,
+    IF_NONE_MATCH_HEADER,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from api.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    next_page_link,
+    paginate,
+)
+from api.settings import Settings
+from api.stale import stale_if_error
 
 router = APIRouter(tags=["articles"])
 
@@ -23,7 +57,86 @@ async def create_article(
         short_description=payload.article.short_description,
         description=payload.article.description,
     )
-    # Manually build response to avoid async attribute errors
+    # a new article has no comments
+    return _article_response(article, comments=[])
+
+
+@router.post(
+    "/bulk",
+    response_model=schemas.ArticleBulkCreateResponse,
+    responses={422: {"model": schemas.ArticleBulkCreateResponse}},
+)
+async def create_articles(
+    payload: schemas.ArticleBulkCreateRequest,
+    response: Response,
+    article_manager: Annotated[ArticleManager, Depends(get_article_manager)],
+    settings: Annotated[Settings, Depends(get_app_settings)],
+):
+    """Create up to `BULK_CREATE.max_articles` articles at once.
+
+    All articles are validated first, then the valid ones are inserted by a
+    single statement in one transaction. Every article gets its own result,
+    in the order of the request.
+
+    An atomic request, see `BULK_CREATE.atomic`, creates nothing when an
+    article is invalid and fails with `422`; the valid articles are
+    `skipped`. Otherwise the valid articles are created and the invalid
+    ones reported.
+    """
+    max_articles = settings.BULK_CREATE.max_articles
+    if len(payload.articles) > max_articles:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many articles, at most {max_articles} per request.",
+        )
+    atomic = payload.atomic
+    if atomic is None:
+        atomic = settings.BULK_CREATE.atomic
+
+    # all articles are validated before anything is written
+    results: list[schemas.ArticleBulkCreateResult] = []
+    valid: dict[int, schemas.ArticleBase] = {}
+    for i, values in enumerate(payload.articles):
+        try:
+            valid[i] = schemas.ArticleBase.model_validate(values)
+        except ValidationError as e:
+            errors = [
+                schemas.BulkItemError(
+                    loc=error["loc"], msg=error["msg"], type=error["type"]
+                )
+                for error in e.errors()
+            ]
+            results.append(
+                schemas.ArticleBulkCreateResult(status="invalid", errors=errors)
+            )
+        else:
+            results.append(schemas.ArticleBulkCreateResult(status="skipped"))
+    if atomic and len(valid) < len(results):
+        response.status_code = 422
+        return schemas.ArticleBulkCreateResponse(items=results)
+
+    created = await article_manager.create_articles(
+        [article.model_dump() for article in valid.values()]
+    )
+    for i, article in zip(valid, created, strict=True):
+        results[i] = schemas.ArticleBulkCreateResult(
+            status="created",
+            # new articles have no comments
+            article=_article_response(article, comments=[]),
+        )
+    return schemas.ArticleBulkCreateResponse(items=results)
+
+
+def _article_response(
+    article: Article,
+    comments: list[Comment],
+    likes: tuple[int, int] = (0, 0),
+) -> schemas.ArticleResponse:
+    """Build the response of an article.
+
+    It is built manually, as validating the model from the article
+    attributes would lazy load its relationships.
+    """
     return schemas.ArticleResponse(
         id=article.id,
         title=article.title,
@@ -38,76 +151,320 @@ async def create_article(
                 created_at=c.created_at,
                 updated_at=c.updated_at,
             )
-            for c in getattr(article, "comments", [])
+            for c in comments
         ],
+        article_likes=likes[0],
+        article_dislikes=likes[1],
     )
 
 
+def _sparse_article(
+    article: Article,
+    fieldset: schemas.ArticleFieldset,
+    likes: tuple[int, int],
+    comments: Optional[list[Comment]] = None,
+) -> dict[str, Any]:
+    """Serialize only the requested fields of an article."""
+    names = fieldset.fields
+    if names is None:
+        names = schemas.ARTICLE_COLUMNS | schemas.ARTICLE_LIKE_FIELDS
+    values = {"article_likes": likes[0], "article_dislikes": likes[1]}
+    data: dict[str, Any] = {}
+    for name in schemas.ArticleResponse.model_fields:
+        if name == "id" or name in names:
+            data[name] = (
+                values[name] if name in values else getattr(article, name)
+            )
+    if comments is not None:
+        data["comments"] = [
+            {
+                "id": c.id,
+                "content": c.content,
+                "created_at": c.created_at,
+                "updated_at": c.updated_at,
+            }
+            for c in comments
+        ]
+    return data
+
+
+def _likes(version: Row) -> tuple[int, int]:
+    return version.likes or 0, version.dislikes or 0
+
+
+def _json_response(content: bytes, headers: dict[str, str]) -> Response:
+    """Send JSON encoded already, e.g. from the fragment cache."""
+    return Response(content, media_type="application/json", headers=headers)
+
+
 @router.get("/{article_id}", response_model=schemas.ArticleResponse)
 async def get_article_by_id(
     article_id: int,
-    article_manager: Annotated[ArticleManager, Depends(get_article_manager)],
+    request: Request,
+    article_manager: Annotated[
+        ArticleManager, Depends(get_article_read_manager)
+    ],
+    settings: Annotated[Settings, Depends(get_app_settings)],
+    fieldset: Annotated[schemas.ArticleFieldset, Depends(get_article_fieldset)],
 ):
-    """Get an article by its ID."""
-    article = await article_manager.get_article_by_id(article_id)
+    """Get an article by its ID.
+
+    Only the latest `PAGINATION.comment_preview` comments are embedded, the
+    others are read from `/api/articles/{article_id}/comments`.
+
+    `fields` and `include` limit the response to some fields and embedded
+    relationships, the others are not even read from the database.
+
+    Responses carry an `ETag`; a request with a matching `If-None-Match`
+    gets an empty `304 Not Modified` after a single cheap query.
+
+    While the database fails, the last full response is served instead, up
+    to `SHARED_CACHE.stale_if_error` seconds past its expiry.
+    """
+    preview = settings.PAGINATION.comment_preview
+    if not fieldset.sparse:
+        # served instead of an error if the database fails
+        stale_if_error(
+            request,
+            lambda: article_manager.fragments.get_stale(
+                fragment_key(article_id, DETAIL)
+            ),
+        )
+    version = await article_manager.get_article_version(article_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    etag = make_etag(tuple(version), fieldset.as_key(), preview)
+    if etag_matches(request.headers.get(IF_NONE_MATCH_HEADER), etag):
+        return not_modified(etag)
+    # the version has the like counters, no need to read them again
+    likes = _likes(version)
+
+    if not fieldset.sparse:
+        # concurrent requests missing the fragment share a single build
+        content = await article_manager.fragments.get_or_build(
+            version,
+            DETAIL,
+            lambda: _build_article_detail(
+                article_manager,
+                article_id,
+                likes,
+                preview,
+                settings.DB_RENDER_JSON,
+            ),
+            session_deadline(article_manager.session),
+        )
+        if content is None:
+            raise HTTPException(status_code=404, detail="Article not found")
+        return _json_response(content, {ETAG_HEADER: etag})
+
+    article = await article_manager.get_article_by_id(
+        article_id, fields=fieldset.columns
+    )
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    likes, dislikes = await article_manager.get_article_likes(article.id)
-    return schemas.ArticleResponse(
-        id=article.id,
-        title=article.title,
-        short_description=article.short_description,
-        description=article.description,
-        created_at=article.created_at,
-        updated_at=article.updated_at,
-        comments=[
-            schemas.CommentResponse(
-                id=c.id,
-                content=c.content,
-                created_at=c.created_at,
-                updated_at=c.updated_at,
-            )
-            for c in getattr(article, "comments", [])
-        ],
-        article_likes=likes,
-        article_dislikes=dislikes,
+    comments = None
+    if "comments" in fieldset.relationships:
+        comments = await article_manager.list_comments(
+            article.id, limit=preview
+        )
+    return JSONResponse(
+        jsonable_encoder(_sparse_article(article, fieldset, likes, comments)),
+        headers={ETAG_HEADER: etag},
     )
 
 
-@router.get("", response_model=list[schemas.ArticleResponse])
+async def _build_article_detail(
+    article_manager: ArticleManager,
+    article_id: int,
+    likes: tuple[int, int],
+    preview: int,
+    render_json: bool = False,
+) -> Optional[bytes]:
+    """Encode the full representation of an article, `None` if it is gone.
+
+    With `render_json`, the database renders it, see `DB_RENDER_JSON`.
+    """
+    if render_json:
+        rendered = await article_manager.get_articles_json(
+            [article_id], comments=preview
+        )
+        return rendered.get(article_id)
+    article = await article_manager.get_article_by_id(article_id)
+    if not article:
+        return None
+    comments = await article_manager.list_comments(article.id, limit=preview)
+    return encode(_article_response(article, comments, likes))
+
+
+@router.get(
+    "",
+    response_model=Union[schemas.ArticlePage, list[schemas.ArticleResponse]],
+)
 async def list_articles(
-    article_manager: Annotated[ArticleManager, Depends(get_article_manager)],
+    request: Request,
+    article_manager: Annotated[
+        ArticleManager, Depends(get_article_read_manager)
+    ],
+    settings: Annotated[Settings, Depends(get_app_settings)],
+    fieldset: Annotated[schemas.ArticleFieldset, Depends(get_article_fieldset)],
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    cursor: Optional[str] = None,
 ):
-    """List all articles."""
-    articles = await article_manager.list_articles()
-    # Efficiently load all likes/dislikes for all articles in a single query
-    article_ids = [article.id for article in articles]
-    likes_map = await article_manager.get_likes_for_articles(article_ids)
-    result = []
-    for article in articles:
-        likes, dislikes = likes_map.get(article.id, (0, 0))
-        result.append(
-            schemas.ArticleResponse(
-                id=article.id,
-                title=article.title,
-                short_description=article.short_description,
-                description=article.description,
-                created_at=article.created_at,
-                updated_at=article.updated_at,
-                comments=[
-                    schemas.CommentResponse(
-                        id=c.id,
-                        content=c.content,
-                        created_at=c.created_at,
-                        updated_at=c.updated_at,
-                    )
-                    for c in getattr(article, "comments", [])
-                ],
-                article_likes=likes,
-                article_dislikes=dislikes,
+    """List articles, newest first.
+
+    Pages of `limit` articles are read with the `next_cursor` of the previous
+    page as `cursor`, the next page is also linked in the `Link` header.
+    Without `limit` and `cursor`, all articles are returned as a plain list
+    while `PAGINATION.legacy_article_list` is on.
+
+    Every article embeds its latest `PAGINATION.comment_preview` comments,
+    as `/api/articles/{article_id}` does; the others are read from
+    `/api/articles/{article_id}/comments`.
+
+    `fields` and `include` limit the articles to some fields and embedded
+    relationships, the others are not even read from the database.
+
+    Responses carry an `ETag`; a request with a matching `If-None-Match`
+    gets an empty `304 Not Modified` after a single cheap query.
+
+    While the database fails, the last full response is served instead, up
+    to `SHARED_CACHE.stale_if_error` seconds past its expiry.
+    """
+    pagination = settings.PAGINATION
+    preview = pagination.comment_preview
+    paginated = not (
+        pagination.legacy_article_list and limit is None and cursor is None
+    )
+    page = {"limit": None, "after": None}
+    if paginated:
+        limit = min(limit or pagination.default_limit, pagination.max_limit)
+        try:
+            after = decode_cursor(cursor, (datetime, int)) if cursor else None
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e)) from None
+        # one more row tells whether there is a next page
+        page = {"limit": limit + 1, "after": after}
+
+    fragments = article_manager.fragments
+    stale_key = page_key(limit if paginated else None, cursor)
+    if not fieldset.sparse:
+        # served instead of an error if the database fails
+        stale_if_error(request, lambda: fragments.get_stale(stale_key))
+    versions = await article_manager.list_article_versions(**page)
+    etag = make_etag(
+        [tuple(version) for version in versions],
+        fieldset.as_key(),
+        paginated,
+        limit,
+    )
+    if etag_matches(request.headers.get(IF_NONE_MATCH_HEADER), etag):
+        return not_modified(etag)
+
+    next_cursor = None
+    if paginated:
+        versions, next_cursor = paginate(
+            versions, limit, lambda version: (version.created_at, version.id)
+        )
+    headers = {ETAG_HEADER: etag}
+    if next_cursor is not None:
+        headers["Link"] = next_page_link(request, next_cursor, limit)
+
+    if fieldset.sparse:
+        article_ids = [version.id for version in versions]
+        articles = await article_manager.get_articles_by_ids(
+            article_ids, fields=fieldset.columns
+        )
+        by_id = {article.id: article for article in articles}
+        previews = None
+        if "comments" in fieldset.relationships:
+            previews = await article_manager.list_comment_previews(
+                article_ids, preview
+            )
+        items = [
+            _sparse_article(
+                by_id[version.id],
+                fieldset,
+                _likes(version),
+                (
+                    previews.get(version.id, [])
+                    if previews is not None
+                    else None
+                ),
+            )
+            # articles deleted since the versions were read are left out
+            for version in versions
+            if version.id in by_id
+        ]
+        content = items
+        if paginated:
+            content = {"items": items, "next_cursor": next_cursor}
+        return JSONResponse(jsonable_encoder(content), headers=headers)
+
+    # the page is assembled from the cached JSON of the articles, only the
+    # articles changed since they were cached are loaded and encoded
+    cached = await fragments.get_many(versions, DETAIL)
+    missing = [version.id for version in versions if version.id not in cached]
+    if missing:
+        start = time.perf_counter()
+        if settings.DB_RENDER_JSON:
+            rendered = await article_manager.get_articles_json(
+                missing, comments=preview
+            )
+        else:
+            # the versions have the like counters, no need to read them
+            rendered = await _encode_articles(
+                article_manager,
+                missing,
+                {version.id: _likes(version) for version in versions},
+                preview,
+            )
+        encoded = []
+        for version in versions:
+            content = rendered.get(version.id)
+            if content is None:
+                continue
+            encoded.append((version, content))
+            cached[version.id] = content
+        # the whole batch took that long, items are refreshed a bit early
+        await fragments.set_many(
+            encoded, DETAIL, delta=time.perf_counter() - start
+        )
+    items = b",".join(cached[v.id] for v in versions if v.id in cached)
+    if paginated:
+        content = (
+            b'{"items":['
+            + items
+            + b'],"next_cursor":'
+            + json.dumps(next_cursor).encode()
+            + b"}"
+        )
+    else:
+        content = b"[" + items + b"]"
+    await fragments.set_page(stale_key, content, etag)
+    return _json_response(content, headers)
+
+
+async def _encode_articles(
+    article_manager: ArticleManager,
+    article_ids: list[int],
+    likes: dict[int, tuple[int, int]],
+    preview: int,
+) -> dict[int, bytes]:
+    """Encode the full representation of articles, by ID.
+
+    It is the one of `_build_article_detail()`, with the latest `preview`
+    comments.
+    """
+    articles = await article_manager.get_articles_by_ids(article_ids)
+    previews = await article_manager.list_comment_previews(article_ids, preview)
+    return {
+        article.id: encode(
+            _article_response(
+                article, previews.get(article.id, []), likes[article.id]
             )
         )
-    return result
+        for article in articles
+    }
 
 
 @router.put("/{article_id}", response_model=schemas.ArticleResponse)
@@ -115,18 +472,22 @@ async def update_article(
     article_id: int,
     payload: schemas.ArticleCreateRequest,
     article_manager: Annotated[ArticleManager, Depends(get_article_manager)],
+    settings: Annotated[Settings, Depends(get_app_settings)],
 ):
     """Update an article by its ID."""
     article = await article_manager.get_article_by_id(article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    # Update fields
-    article.title = payload.article.title
-    article.short_description = payload.article.short_description
-    article.description = payload.article.description
-    await article_manager.session.commit()
-    await article_manager.session.refresh(article)
-    return schemas.ArticleResponse.model_validate(article, from_attributes=True)
+    comments = await article_manager.list_comments(
+        article.id, limit=settings.PAGINATION.comment_preview
+    )
+    await article_manager.update_article(
+        article,
+        title=payload.article.title,
+        short_description=payload.article.short_description,
+        description=payload.article.description,
+    )
+    return _article_response(article, comments)
 
 
 @router.delete("/{article_id}", status_code=204)
@@ -138,6 +499,90 @@ async def delete_article(
     article = await article_manager.get_article_by_id(article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    await article_manager.session.delete(article)
-    await article_manager.session.commit()
+    await article_manager.delete_article(article)
     return None
+
+
+async def _add_like(
+    article_manager: ArticleManager, article_id: int, dislike: bool
+) -> schemas.ArticleLikesResponse:
+    likes = await article_manager.add_article_like(article_id, dislike=dislike)
+    if likes is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return schemas.ArticleLikesResponse(
+        article_likes=likes[0], article_dislikes=likes[1]
+    )
+
+
+@router.post("/{article_id}/like", response_model=schemas.ArticleLikesResponse)
+async def like_article(
+    article_id: int,
+    article_manager: Annotated[ArticleManager, Depends(get_article_manager)],
+):
+    """Like an article.
+
+    The counter is incremented by the database in a single statement, so
+    concurrent likes are never lost.
+    """
+    return await _add_like(article_manager, article_id, dislike=False)
+
+
+@router.post(
+    "/{article_id}/dislike", response_model=schemas.ArticleLikesResponse
+)
+async def dislike_article(
+    article_id: int,
+    article_manager: Annotated[ArticleManager, Depends(get_article_manager)],
+):
+    """Dislike an article, see `like_article`."""
+    return await _add_like(article_manager, article_id, dislike=True)
+
+
+@router.get("/{article_id}/comments", response_model=schemas.CommentPage)
+async def list_article_comments(
+    article_id: int,
+    request: Request,
+    response: Response,
+    article_manager: Annotated[
+        ArticleManager, Depends(get_article_read_manager)
+    ],
+    settings: Annotated[Settings, Depends(get_app_settings)],
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    cursor: Optional[str] = None,
+):
+    """List comments of an article, newest first.
+
+    Pages of `limit` comments are read with the `next_cursor` of the
+    previous page as `cursor`, the next page is also linked in the `Link`
+    header.
+    """
+    pagination = settings.PAGINATION
+    limit = min(limit or pagination.default_limit, pagination.max_limit)
+    try:
+        after = decode_cursor(cursor, (datetime, int)) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    rows = await article_manager.list_comments(
+        article_id, limit=limit + 1, after=after
+    )
+    # the article is only looked up when there is nothing to tell apart an
+    # article without comments from a missing one
+    if not rows and not await article_manager.article_exists(article_id):
+        raise HTTPException(status_code=404, detail="Article not found")
+    comments, next_cursor = paginate(
+        rows, limit, lambda comment: (comment.created_at, comment.id)
+    )
+    if next_cursor is not None:
+        response.headers["Link"] = next_page_link(request, next_cursor, limit)
+    return schemas.CommentPage(
+        items=[
+            schemas.CommentResponse(
+                id=c.id,
+                content=c.content,
+                created_at=c.created_at,
+                updated_at=c.updated_at,
+            )
+            for c in comments
+        ],
+        next_cursor=next_cursor,
+    )
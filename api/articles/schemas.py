@@ -1,10 +1,12 @@
 """Article API Schemas."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Literal, Optional, Union
 
 from pydantic import BaseModel, ConfigDict
 
+from api.pagination import CursorPage
+
 
 class CommentResponse(BaseModel):
     id: int
@@ -31,3 +33,131 @@ class ArticleResponse(ArticleBase):
     comments: List[CommentResponse] = []
     article_likes: int = 0
     article_dislikes: int = 0
+
+
+class ArticleLikesResponse(BaseModel):
+    article_likes: int
+    article_dislikes: int
+
+
+class ArticleBulkCreateRequest(BaseModel):
+    articles: List[Any]
+    """Articles to create, each one is validated as `ArticleBase` by the
+    route, so that a malformed one, even not an object, is only reported.
+    """
+    atomic: Optional[bool] = None
+    """Create none of the articles when one is invalid, the
+    `BULK_CREATE.atomic` setting if omitted.
+    """
+
+
+class BulkItemError(BaseModel):
+    loc: List[Union[str, int]]
+    msg: str
+    type: str
+
+
+class ArticleBulkCreateResult(BaseModel):
+    status: Literal["created", "invalid", "skipped"]
+    """`skipped` articles are valid, but not created as another one of an
+    atomic request is invalid.
+    """
+    article: Optional[ArticleResponse] = None
+    errors: List[BulkItemError] = []
+
+
+class ArticleBulkCreateResponse(BaseModel):
+    items: List[ArticleBulkCreateResult]
+    """Results in the order of the request articles."""
+
+
+ArticlePage = CursorPage[ArticleResponse]
+CommentPage = CursorPage[CommentResponse]
+
+
+ARTICLE_COLUMNS = frozenset(
+    {
+        "id",
+        "title",
+        "short_description",
+        "description",
+        "created_at",
+        "updated_at",
+    }
+)
+"""Article fields read from the `articles` table."""
+ARTICLE_LIKE_FIELDS = frozenset({"article_likes", "article_dislikes"})
+"""Article fields read from the `likes` table."""
+ARTICLE_INCLUDES = frozenset({"comments"})
+"""Relationships which can be embedded in articles."""
+
+
+class ArticleFieldset(BaseModel):
+    """Article fields and relationships a client asked for.
+
+    `fields` and `include` are `None` when the client did not send them:
+    all fields and the comments are returned then, as before sparse
+    fieldsets existed. With `fields` alone, no relationship is embedded.
+    """
+
+    model_config = ConfigDict(frozen=True)
+    fields: Optional[frozenset[str]] = None
+    include: Optional[frozenset[str]] = None
+
+    @classmethod
+    def from_query(
+        cls, fields: Optional[str], include: Optional[str]
+    ) -> "ArticleFieldset":
+        """Parse comma separated `fields` and `include` query parameters.
+
+        Raises:
+            ValueError: A field or relationship is unknown.
+        """
+        parsed_fields = _split(fields)
+        if parsed_fields is not None:
+            unknown = parsed_fields - ARTICLE_COLUMNS - ARTICLE_LIKE_FIELDS
+            if unknown:
+                raise ValueError(
+                    f"Unknown fields: {', '.join(sorted(unknown))}"
+                )
+        parsed_include = _split(include)
+        if parsed_include is not None:
+            unknown = parsed_include - ARTICLE_INCLUDES
+            if unknown:
+                raise ValueError(
+                    f"Unknown include: {', '.join(sorted(unknown))}"
+                )
+        return cls(fields=parsed_fields, include=parsed_include)
+
+    def as_key(self) -> tuple[Optional[list[str]], Optional[list[str]]]:
+        """Get the fieldset in a stable, JSON serializable form."""
+        return (
+            sorted(self.fields) if self.fields is not None else None,
+            sorted(self.include) if self.include is not None else None,
+        )
+
+    @property
+    def sparse(self) -> bool:
+        """Whether the client asked for anything but the full article."""
+        return self.fields is not None or self.include is not None
+
+    @property
+    def columns(self) -> Optional[frozenset[str]]:
+        """Columns to load, `None` for all of them."""
+        if self.fields is None:
+            return None
+        # the ID is the primary key, it is always loaded
+        return (self.fields & ARTICLE_COLUMNS) | {"id"}
+
+    @property
+    def relationships(self) -> frozenset[str]:
+        """Relationships to load."""
+        if self.include is not None:
+            return self.include
+        return ARTICLE_INCLUDES if self.fields is None else frozenset()
+
+
+def _split(value: Optional[str]) -> Optional[frozenset[str]]:
+    if value is None:
+        return None
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
@@ -0,0 +1,25 @@
+"""Caches.
+
+- `LocalCache`: in-process cache of Python objects, kept consistent across
+  workers by `api.invalidation.InvalidationBus`;
+- `Cache`: cache of bytes shared by all workers and nodes, on one of the
+  backends: `MemoryBackend` (in-process stand-in), `RedisBackend` (Redis
+  server) or `ShardedBackend` (several of them).
+"""
+
+from .backends import CacheBackend, CacheError, MemoryBackend
+from .local import LocalCache
+from .namespaced import Cache
+from .redis import RedisBackend
+from .sharding import HashRing, ShardedBackend
+
+__all__ = [
+    "Cache",
+    "CacheBackend",
+    "CacheError",
+    "HashRing",
+    "LocalCache",
+    "MemoryBackend",
+    "RedisBackend",
+    "ShardedBackend",
+]
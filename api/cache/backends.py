@@ -0,0 +1,119 @@
+"""Cache backends.
+
+A backend stores bytes under string keys, with a time to live. Every
+operation works on a batch of keys, so a request touching many keys costs
+a single round trip on networked backends.
+"""
+
+import abc
+import collections
+import time
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+
+class CacheError(Exception):
+    """The cache backend failed, e.g. its server can't be reached."""
+
+
+class CacheBackend(abc.ABC):
+    """Interface of the cache backends."""
+
+    @abc.abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        """Get the values of keys, `None` for the missing ones.
+
+        Raises:
+            CacheError: The backend failed.
+        """
+
+    @abc.abstractmethod
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        """Store values, for `ttl` seconds or until evicted.
+
+        Raises:
+            CacheError: The backend failed.
+        """
+
+    @abc.abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Remove keys.
+
+        Raises:
+            CacheError: The backend failed.
+        """
+
+    async def close(self) -> None:  # noqa: B027 optional to implement
+        """Release the resources of the backend."""
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the backend state as a dictionary."""
+        return {"backend": type(self).__name__}
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU backend, bounded by the size of its values.
+
+    It is local to the worker process, the stand-in when no cache server is
+    configured.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        """Size of the stored values."""
+        self._clock = clock
+        self._entries: collections.OrderedDict[
+            str, tuple[Optional[float], bytes]
+        ] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        now = self._clock()
+        values = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= now:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            values.append(entry[1] if entry is not None else None)
+        return values
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        expires = self._clock() + ttl if ttl is not None else None
+        for key, value in items.items():
+            self._remove(key)
+            if len(value) > self.max_bytes:
+                continue
+            self._entries[key] = (expires, value)
+            self.nbytes += len(value)
+        while self.nbytes > self.max_bytes:
+            _key, (_expires, value) = self._entries.popitem(last=False)
+            self.nbytes -= len(value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= len(entry[1])
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "size": len(self._entries),
+            "bytes": self.nbytes,
+        }
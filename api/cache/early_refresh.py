@@ -0,0 +1,42 @@
+"""Probabilistic early refresh of cached values (XFetch).
+
+Once a popular value expires, all its readers miss together and recompute
+it at the same time. With XFetch, every read of a value close to its expiry
+decides at random to treat it as expired already; the closer the expiry
+and the longer the value takes to compute, the likelier. A single reader
+recomputes the value ahead of time while the others keep getting the
+cached one.
+
+See "Optimal Probabilistic Cache Stampede Prevention", Vattani et al.
+"""
+
+import math
+import random as _random
+import time
+from typing import Callable, Optional
+
+
+def refresh_early(
+    expires: Optional[float],
+    delta: float,
+    beta: float = 1.0,
+    now: Optional[float] = None,
+    random: Callable[[], float] = _random.random,
+) -> bool:
+    """Tell whether a value should be recomputed before it expires.
+
+    Args:
+        expires (Optional[float]): Unix time the value expires at, `None` if
+            it does not.
+        delta (float): Seconds it took to compute the value.
+        beta (float): Eagerness, above `1` refreshes earlier, `0` never
+            does.
+        now (Optional[float]): Unix time, the current one if omitted.
+        random (Callable[[], float]): Source of numbers in `[0, 1)`.
+    """
+    if expires is None or beta <= 0:
+        return False
+    if now is None:
+        now = time.time()
+    # 1 - random() is in (0, 1], so its log is finite
+    return now - delta * beta * math.log(1 - random()) >= expires
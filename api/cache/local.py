@@ -0,0 +1,105 @@
+"""In-process caches.
+
+Every worker keeps its own caches, they are kept consistent across workers
+by `api.invalidation.InvalidationBus`.
+"""
+
+import collections
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class LocalCache:
+    """LRU cache with a time to live, local to the worker process.
+
+    Values loaded from the database may be outdated by the time they are
+    stored, if an invalidation came in meanwhile. To avoid caching them,
+    take a `stamp()` before loading and pass it to `set()`:
+
+    ```python
+    stamp = cache.stamp()
+    value = await load_from_db(key)
+    cache.set(key, value, stamp=stamp)
+    ```
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        """Seconds an entry is served for."""
+        self.enabled = True
+        """Disabled caches miss on every `get()` and ignore `set()`."""
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: collections.OrderedDict[Hashable, tuple[float, Any]] = (
+            collections.OrderedDict()
+        )
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, or `default` if it is missing or expired."""
+        entry = self._entries.get(key) if self.enabled else None
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def stamp(self) -> int:
+        """Get a marker of the invalidations seen so far, see `set()`."""
+        return self._invalidations
+
+    def set(
+        self, key: Hashable, value: Any, stamp: Optional[int] = None
+    ) -> None:
+        """Store a value.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to store.
+            stamp (Optional[int]): `stamp()` taken before the value was
+                loaded; the value is not stored if anything was
+                invalidated since.
+        """
+        if not self.enabled:
+            return
+        if stamp is not None and stamp != self._invalidations:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: Hashable) -> None:
+        """Remove entries."""
+        self._invalidations += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._invalidations += 1
+        self._entries.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the size and counters as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,108 @@
+"""Namespaced, fail-soft view of a cache backend."""
+
+import logging
+from typing import Any, Mapping, Optional, Sequence
+
+from .backends import CacheBackend, CacheError
+
+logger = logging.getLogger(__name__)
+
+
+class Cache:
+    """Cache shared by all workers, on top of a `CacheBackend`.
+
+    Keys are prefixed with the namespace, so several applications or
+    versions of the data can share the cache servers. A failing backend is
+    treated as empty: a cache outage slows requests down rather than
+    failing them.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str = "",
+        default_ttl: Optional[float] = None,
+    ) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        """Seconds a value is kept when `set()` is given no TTL."""
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def key(self, key: str) -> str:
+        """Get the backend key of a key."""
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def _failed(self, operation: str, error: CacheError) -> None:
+        self.errors += 1
+        logger.warning("Cache %s failed: %s", operation, error)
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, bytes]:
+        """Get the values of keys, the missing ones are left out."""
+        if not keys:
+            return {}
+        try:
+            values = await self.backend.get_many([self.key(k) for k in keys])
+        except CacheError as e:
+            self._failed("get", e)
+            self.misses += len(keys)
+            return {}
+        found = {
+            key: value
+            for key, value in zip(keys, values, strict=True)
+            if value is not None
+        }
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, `None` if it is missing."""
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        """Store values for `ttl` seconds, `default_ttl` if omitted."""
+        if not items:
+            return
+        ttl = ttl if ttl is not None else self.default_ttl
+        try:
+            await self.backend.set_many(
+                {self.key(k): v for k, v in items.items()}, ttl
+            )
+        except CacheError as e:
+            self._failed("set", e)
+
+    async def set(
+        self, key: str, value: bytes, ttl: Optional[float] = None
+    ) -> None:
+        """Store a value, see `set_many()`."""
+        await self.set_many({key: value}, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        """Remove keys."""
+        if not keys:
+            return
+        try:
+            await self.backend.delete(*(self.key(k) for k in keys))
+        except CacheError as e:
+            self._failed("delete", e)
+
+    async def close(self) -> None:
+        """Close the backend."""
+        await self.backend.close()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the counters and the backend state as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+            **self.backend.as_dict(),
+        }
@@ -0,0 +1,86 @@
+"""Backend on a Redis server, with the `redis` asyncio client."""
+
+import asyncio
+from typing import Any, Mapping, Optional, Sequence
+
+import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import RedisError
+
+from .backends import CacheBackend, CacheError
+
+
+class RedisBackend(CacheBackend):
+    """Backend on one Redis server."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        max_connections: int = 10,
+        timeout: float = 0.5,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        """Seconds a round trip, including connecting, may take."""
+        self.errors = 0
+        self.client = redis.Redis(
+            host=host,
+            port=port,
+            db=db,
+            max_connections=max_connections,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            # served by all Redis versions and compatible servers
+            protocol=2,
+            # a miss is cheaper than waiting for a struggling server
+            retry=Retry(NoBackoff(), 0),
+        )
+
+    @property
+    def address(self) -> str:
+        """The `host:port` of the server."""
+        return f"{self.host}:{self.port}"
+
+    async def _call(self, call: Any) -> Any:
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await call
+        except (RedisError, OSError, TimeoutError) as e:
+            self.errors += 1
+            raise CacheError(f"{self.address}: {type(e).__name__}: {e}") from e
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+        return await self._call(self.client.mget(keys))
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        if not items:
+            return
+        px = max(int(ttl * 1000), 1) if ttl is not None else None
+        # the SETs are sent in a single round trip
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(key, value, px=px)
+        await self._call(pipeline.execute())
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._call(self.client.delete(*keys))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "address": self.address,
+            "errors": self.errors,
+        }
@@ -0,0 +1,110 @@
+"""Keys spread over several cache nodes with consistent hashing.
+
+Every node is placed on a hash ring many times (virtual nodes), a key
+belongs to the first node after its own hash. Adding or removing a node
+only moves the keys of its ring segments, about `1 / len(nodes)` of them,
+instead of nearly all keys as with `hash(key) % len(nodes)`.
+"""
+
+import asyncio
+import bisect
+import hashlib
+from typing import Any, Mapping, Optional, Sequence
+
+from .backends import CacheBackend
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring of node names."""
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 100) -> None:
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node.")
+        self.nodes = list(nodes)
+        self.replicas = replicas
+        """Virtual nodes per node, more spread the keys more evenly."""
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(replicas)
+        )
+        self._hashes = [point for point, _node in points]
+        self._nodes = [node for _point, node in points]
+
+    def node(self, key: str) -> str:
+        """Get the node a key belongs to."""
+        i = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[i]
+
+
+class ShardedBackend(CacheBackend):
+    """Backend spreading the keys over several backends.
+
+    Batches are split by node and the nodes are queried concurrently, so a
+    batch costs one round trip to each node it touches.
+    """
+
+    def __init__(
+        self, backends: Mapping[str, CacheBackend], replicas: int = 100
+    ) -> None:
+        self.backends = dict(backends)
+        self.ring = HashRing(list(self.backends), replicas)
+
+    def _by_node(self, keys: Sequence[str]) -> dict[str, list[str]]:
+        by_node: dict[str, list[str]] = {}
+        for key in keys:
+            by_node.setdefault(self.ring.node(key), []).append(key)
+        return by_node
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[bytes]]:
+        by_node = self._by_node(keys)
+        results = await asyncio.gather(
+            *(
+                self.backends[node].get_many(node_keys)
+                for node, node_keys in by_node.items()
+            )
+        )
+        values: dict[str, Optional[bytes]] = {}
+        for node_keys, node_values in zip(
+            by_node.values(), results, strict=True
+        ):
+            values.update(zip(node_keys, node_values, strict=True))
+        return [values[key] for key in keys]
+
+    async def set_many(
+        self, items: Mapping[str, bytes], ttl: Optional[float] = None
+    ) -> None:
+        by_node = self._by_node(list(items))
+        await asyncio.gather(
+            *(
+                self.backends[node].set_many(
+                    {key: items[key] for key in node_keys}, ttl
+                )
+                for node, node_keys in by_node.items()
+            )
+        )
+
+    async def delete(self, *keys: str) -> None:
+        by_node = self._by_node(keys)
+        await asyncio.gather(
+            *(
+                self.backends[node].delete(*node_keys)
+                for node, node_keys in by_node.items()
+            )
+        )
+
+    async def close(self) -> None:
+        await asyncio.gather(*(b.close() for b in self.backends.values()))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **super().as_dict(),
+            "nodes": {
+                name: backend.as_dict()
+                for name, backend in self.backends.items()
+            },
+        }
@@ -0,0 +1,106 @@
+"""Circuit breaker for the database connections.
+
+The breaker is checked on every pool checkout (see `api.db.create_engine`).
+Connection failures and checkout timeouts are recorded as failures; once
+`failure_threshold` of them happen within `window` seconds the circuit
+opens and checkouts fail right away with `CircuitOpenError`, instead of
+piling up waiting on a database which is down. After `reset_timeout` the
+circuit is half-open: checkouts go through again, the first success closes
+it and the first failure opens it for another `reset_timeout`.
+"""
+
+import collections
+import math
+import time
+from typing import Any, Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open, the call was not attempted."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Database is unavailable.")
+        self.retry_after = retry_after
+        """Seconds until the circuit is half-open."""
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for a while."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        window: float = 10.0,
+        reset_timeout: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures: collections.deque[float] = collections.deque()
+        self._opened_at: Optional[float] = None
+        self.times_opened = 0
+        """Number of times the circuit opened."""
+        self.rejected = 0
+        """Number of calls rejected while open."""
+
+    @property
+    def state(self) -> str:
+        """`closed`, `open` or `half_open`."""
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit is half-open."""
+        if self._opened_at is None:
+            return 0.0
+        remaining = self._opened_at + self.reset_timeout - self._clock()
+        return max(remaining, 0.0)
+
+    def check(self) -> None:
+        """Raise `CircuitOpenError` if calls are not allowed now."""
+        if self.state == OPEN:
+            self.rejected += 1
+            raise CircuitOpenError(self.retry_after())
+
+    def record_success(self) -> None:
+        """Record a successful call, closes a half-open circuit."""
+        if self._opened_at is not None and self.state == HALF_OPEN:
+            self._opened_at = None
+            self._failures.clear()
+
+    def record_failure(self) -> None:
+        """Record a failed call, may open the circuit."""
+        now = self._clock()
+        if self.state == HALF_OPEN:
+            self._open(now)
+            return
+
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > self.window:
+            self._failures.popleft()
+        if len(self._failures) >= self.failure_threshold:
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._failures.clear()
+        self.times_opened += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the state and counters as a dictionary."""
+        return {
+            "state": self.state,
+            "recent_failures": len(self._failures),
+            "retry_after": math.ceil(self.retry_after()),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,93 @@
+"""Adaptive concurrency limit of the database-bound requests.
+
+Without a limit, requests queue for a connection once the pool is exhausted
+and latency grows until everything times out. `AdaptiveLimiter` caps the
+number of requests using the database at the same time and rejects the
+excess right away. The cap adapts with AIMD (additive increase,
+multiplicative decrease) to the database latency the requests observe:
+
+- a request which waited too long for a connection or the database, or
+  failed on a timeout, shrinks the limit by `backoff`;
+- a fast request grows it by one, as long as the limit is actually used.
+"""
+
+import math
+from typing import Any
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Too many requests use the database, the request was rejected."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Too many concurrent requests.")
+        self.retry_after = retry_after
+        """Seconds the client should wait before retrying."""
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter."""
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        latency_threshold: float = 0.1,
+        backoff: float = 0.9,
+        retry_after: float = 1.0,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        """Seconds of latency from which the database counts as overloaded."""
+        self.backoff = backoff
+        self.retry_after = retry_after
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        """Requests holding a slot now."""
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed at the same time."""
+        return int(self._limit)
+
+    def acquire(self) -> None:
+        """Take a slot.
+
+        Raises:
+            ConcurrencyLimitExceeded: All slots are taken.
+        """
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            raise ConcurrencyLimitExceeded(self.retry_after)
+        self.in_flight += 1
+        self.accepted += 1
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Give a slot back and adapt the limit.
+
+        Args:
+            latency (float): Database latency the request observed.
+            overloaded (bool): The request failed because the database
+                is overloaded, e.g. it timed out.
+        """
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if overloaded or latency > self.latency_threshold:
+            self._limit = max(self._limit * self.backoff, self.min_limit)
+        elif in_flight * 2 >= self._limit:
+            # only grow a limit which is used, idle periods would inflate
+            # it far beyond what the database can take
+            self._limit = min(self._limit + 1, self.max_limit)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the limit and counters as a dictionary."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "retry_after": math.ceil(self.retry_after),
+        }
@@ -1,5 +1,10 @@
 """Functionality to work with the database."""
 
+import time
+import uuid
+from typing import Any, Optional
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     AsyncEngine,
@@ -8,25 +13,243 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+
+from api.circuit_breaker import CircuitBreaker
+from api.instrumentation import record_pool_wait
+from api.settings import (
+    DbCircuitBreakerSettings,
+    DbPoolSettings,
+    DbStatementCacheSettings,
+)
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     """Base class for all models."""
 
 
-def create_engine(db_url: str) -> AsyncEngine:
-    """Create a database pool from a database URL."""
-    return create_async_engine(
-        db_url,
-        poolclass=NullPool,
-    )
+class PoolMetrics:
+    """Checkout statistics collected by the instrumented pools."""
+
+    def __init__(self) -> None:
+        self.waiting = 0
+        """Number of callers currently waiting for a connection."""
+        self.checkouts = 0
+        """Total number of successful checkouts."""
+        self.timeouts = 0
+        """Total number of checkouts that ran out of `pool.timeout`."""
+        self.wait_time_total = 0.0
+        """Total time (seconds) spent waiting for a connection."""
+        self.wait_time_max = 0.0
+        """Longest time (seconds) spent waiting for a connection."""
+
+    def record_checkout(self, wait_time: float) -> None:
+        """Record a successful checkout and the time it took."""
+        self.checkouts += 1
+        self.wait_time_total += wait_time
+        if wait_time > self.wait_time_max:
+            self.wait_time_max = wait_time
+
+
+class _InstrumentedPoolMixin:
+    """Measure how long every checkout waits for a connection.
+
+    `_do_get` is the single place where both pools hand out connections,
+    so timing it covers queueing for a free connection (`QueuePool`) as
+    well as opening a new one (`NullPool`, overflow connections).
+
+    The optional `circuit_breaker` is checked there too. Connection
+    attempts (including reconnects after a failed pre-ping) and checkout
+    timeouts are reported to it.
+    """
+
+    metrics: PoolMetrics
+    circuit_breaker: Optional[CircuitBreaker] = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _should_wrap_creator(self, creator):
+        invoke_creator = super()._should_wrap_creator(creator)
+
+        def connect(record):
+            breaker = self.circuit_breaker
+            if breaker is None:
+                return invoke_creator(record)
+            try:
+                connection = invoke_creator(record)
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return connection
+
+        return connect
+
+    def _do_get(self):
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            breaker.check()
+
+        metrics = self.metrics
+        metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            metrics.timeouts += 1
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        finally:
+            metrics.waiting -= 1
+        wait_time = time.perf_counter() - started
+        metrics.record_checkout(wait_time)
+        record_pool_wait(wait_time)
+        return record
+
+    def recreate(self):
+        # `engine.dispose()` replaces the pool with a fresh instance,
+        # keep the counters and the breaker so they survive it
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        pool.circuit_breaker = self.circuit_breaker
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """Async queue pool which collects `PoolMetrics`."""
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    """Non-pooling pool which collects `PoolMetrics`."""
+
+
+def _unique_statement_name() -> str:
+    """Name prepared statements uniquely, PgBouncer may mix them up."""
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def create_engine(
+    db_url: str,
+    pool: Optional[DbPoolSettings] = None,
+    statement_cache: Optional[DbStatementCacheSettings] = None,
+    circuit_breaker: Optional[DbCircuitBreakerSettings] = None,
+) -> AsyncEngine:
+    """Create a database pool from a database URL.
+
+    Args:
+        db_url (str): The database URL.
+        pool (Optional[DbPoolSettings]): Connection pool tuning. When
+            omitted or disabled, every checkout opens a new connection
+            (`NullPool`), which is what the tests rely on.
+        statement_cache (Optional[DbStatementCacheSettings]): Compiled SQL
+            and prepared statement cache sizes. SQLAlchemy defaults are
+            used when omitted.
+        circuit_breaker (Optional[DbCircuitBreakerSettings]): Fail
+            checkouts fast after repeated connection failures. No breaker
+            is installed when omitted or disabled.
+    """
+    engine_kwargs: dict[str, Any] = {}
+    connect_args: dict[str, Any] = {}
+    if pool is not None:
+        # asyncpg waits up to a minute for a connection by default
+        connect_args["timeout"] = pool.connect_timeout
+    if statement_cache is not None:
+        connect_args["prepared_statement_cache_size"] = (
+            statement_cache.prepared_statement_cache_size
+        )
+        if statement_cache.pgbouncer_transaction_mode:
+            connect_args.update(
+                # asyncpg's own cache and ours have to be off both
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=_unique_statement_name,
+            )
+        engine_kwargs["query_cache_size"] = statement_cache.compiled_cache_size
+    if connect_args:
+        engine_kwargs["connect_args"] = connect_args
+
+    if pool is None or not pool.enabled:
+        engine = create_async_engine(
+            db_url, poolclass=InstrumentedNullPool, **engine_kwargs
+        )
+    else:
+        engine = create_async_engine(
+            db_url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool.size,
+            max_overflow=pool.max_overflow,
+            pool_recycle=pool.recycle,
+            pool_pre_ping=pool.pre_ping,
+            pool_timeout=pool.timeout,
+            **engine_kwargs,
+        )
+
+    if circuit_breaker is not None and circuit_breaker.enabled:
+        engine.pool.circuit_breaker = CircuitBreaker(
+            failure_threshold=circuit_breaker.failure_threshold,
+            window=circuit_breaker.window,
+            reset_timeout=circuit_breaker.reset_timeout,
+        )
+    return engine
+
+
+def get_pool_status(db_engine: AsyncEngine) -> dict[str, Any]:
+    """Get a snapshot of the connection pool statistics.
+
+    Returns:
+        dict[str, Any]: Pool class, checked out/in connections, overflow,
+            number of waiters and checkout wait times (milliseconds).
+    """
+    pool: Pool = db_engine.pool
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        mean_wait = (
+            metrics.wait_time_total / metrics.checkouts
+            if metrics.checkouts
+            else 0.0
+        )
+        status.update(
+            waiting=metrics.waiting,
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            checkout_wait_mean_ms=round(mean_wait * 1000, 3),
+            checkout_wait_max_ms=round(metrics.wait_time_max * 1000, 3),
+        )
+    return status
+
+
+def get_circuit_breaker(db_engine: AsyncEngine) -> Optional[CircuitBreaker]:
+    """Get the circuit breaker of an engine's pool, if installed."""
+    return getattr(db_engine.pool, "circuit_breaker", None)
 
 
 def async_session_maker(
     db_engine: AsyncEngine,
+    read_only: bool = False,
 ) -> async_sessionmaker[AsyncSession]:
-    """Create an async session class."""
+    """Create an async session class.
+
+    Args:
+        db_engine (AsyncEngine): The engine sessions are bound to.
+        read_only (bool): Run every transaction as `READ ONLY`; the
+            setting is reset when the connection returns to the pool.
+    """
+    if read_only:
+        db_engine = db_engine.execution_options(postgresql_readonly=True)
     return async_sessionmaker(
         db_engine, class_=AsyncSession, expire_on_commit=False
     )
@@ -0,0 +1,104 @@
+"""Per-request deadlines.
+
+A request gets a deadline from the `REQUEST_TIMEOUT_SECONDS` setting or the
+client's `X-Request-Timeout` header (seconds), whichever is shorter. It is
+set by `api.middlewares.DeadlineMiddleware` when the request comes in, and
+the database sessions apply what is left of it as `statement_timeout` to
+every transaction, so Postgres cancels statements the client would not
+wait for anyway. Timeouts are capped by the `MAX_REQUEST_TIMEOUT_SECONDS`
+setting, and `statement_timeout` by `MAX_STATEMENT_TIMEOUT_MS`.
+"""
+
+import math
+import time
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+MAX_STATEMENT_TIMEOUT_MS = 2_147_483_647
+"""Largest `statement_timeout` Postgres accepts."""
+
+QUERY_CANCELED = "57014"
+"""SQLSTATE of a statement cancelled by `statement_timeout`."""
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of its deadline."""
+
+    def __init__(self) -> None:
+        super().__init__("Request deadline exceeded.")
+
+
+def parse_timeout(
+    header: Optional[str],
+    default: Optional[float],
+    maximum: float = MAX_STATEMENT_TIMEOUT_MS / 1000,
+) -> Optional[float]:
+    """Get the timeout of a request in seconds.
+
+    Args:
+        header (Optional[str]): Value of the `X-Request-Timeout` header.
+            Malformed, non-finite and non-positive values are ignored.
+        default (Optional[float]): The `REQUEST_TIMEOUT_SECONDS` setting.
+        maximum (float): The `MAX_REQUEST_TIMEOUT_SECONDS` setting, longer
+            timeouts are shortened to it.
+
+    Returns:
+        Optional[float]: The shorter of both, `None` for no deadline.
+    """
+    timeouts = [default] if default is not None else []
+    try:
+        requested = float(header) if header is not None else None
+    except ValueError:
+        requested = None
+    if requested is not None and math.isfinite(requested) and requested > 0:
+        timeouts.append(requested)
+    return min(*timeouts, maximum) if timeouts else None
+
+
+def remaining_ms(deadline: float) -> int:
+    """Get the whole milliseconds left until a `time.monotonic()` deadline,
+    at most `MAX_STATEMENT_TIMEOUT_MS`.
+
+    Raises:
+        DeadlineExceeded: Less than a millisecond is left.
+    """
+    remaining = (deadline - time.monotonic()) * 1000
+    if remaining < 1:
+        raise DeadlineExceeded()
+    return int(min(remaining, MAX_STATEMENT_TIMEOUT_MS))
+
+
+def apply_statement_timeout(session: Session, deadline: float) -> None:
+    """Limit the statements of every transaction of a session to the time
+    left until the deadline.
+
+    The deadline is kept in the session, see `session_deadline()`.
+    """
+    session.info["deadline"] = deadline
+
+    def set_statement_timeout(
+        _session: Session, _transaction, connection: Connection
+    ) -> None:
+        # `SET LOCAL` is reset when the transaction ends, so the setting
+        # does not leak to the next user of the pooled connection
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {remaining_ms(deadline)}"
+        )
+
+    event.listen(session, "after_begin", set_statement_timeout)
+
+
+def session_deadline(session: Session | AsyncSession) -> Optional[float]:
+    """Get the deadline applied to a session, `None` if it has none."""
+    return session.info.get("deadline")
+
+
+def is_query_canceled(error: exc.DBAPIError) -> bool:
+    """Check whether Postgres cancelled the statement on a timeout."""
+    return getattr(error.orig, "sqlstate", None) == QUERY_CANCELED
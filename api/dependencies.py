@@ -15,14 +15,29 @@ async def some_endpoint(
 ```
 """
 
-from typing import Annotated, AsyncGenerator
+import contextlib
+import time
+from typing import Annotated, AsyncGenerator, AsyncIterator, Optional
 
-from fastapi import Depends, FastAPI, Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, FastAPI, Request, Response
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .db import async_session_maker
+from .cache import Cache
+from .circuit_breaker import CircuitOpenError
+from .concurrency import AdaptiveLimiter
+from .deadlines import (
+    DeadlineExceeded,
+    apply_statement_timeout,
+    is_query_canceled,
+)
+from .instrumentation import get_current_query_stats
+from .invalidation import InvalidationBus
 from .settings import Settings
 
+LAST_WRITE_COOKIE = "last_write_at"
+"""Cookie holding the time of the client's last committed write."""
+
 
 async def get_app_instance(request: Request) -> FastAPI:
     """DI function to populate app instance"""
@@ -36,10 +51,144 @@ async def get_app_settings(
     return app.state.settings
 
 
+async def get_invalidation_bus(
+    app: Annotated[FastAPI, Depends(get_app_instance)],
+) -> Optional[InvalidationBus]:
+    """DI function to populate the cache invalidation bus, if caching is on."""
+    return app.state.invalidation_bus
+
+
+async def get_shared_cache(
+    app: Annotated[FastAPI, Depends(get_app_instance)],
+) -> Optional[Cache]:
+    """DI function to populate the cache shared by all nodes, if it is on."""
+    return app.state.shared_cache
+
+
+async def limit_db_concurrency(
+    app: Annotated[FastAPI, Depends(get_app_instance)],
+) -> AsyncGenerator[None, None]:
+    """DI function to hold a slot of the database concurrency limit.
+
+    Raises `ConcurrencyLimitExceeded` (503) when all slots are taken. The
+    latency the request observed, its connection wait plus the mean time
+    of its statements, adapts the limit (see `api.concurrency`).
+    """
+    limiter: Optional[AdaptiveLimiter] = app.state.db_limiter
+    if limiter is None:
+        yield
+        return
+
+    limiter.acquire()
+    started = time.perf_counter()
+    stats = get_current_query_stats()
+    if stats is not None:
+        queries, db_time, pool_wait = (
+            stats.queries,
+            stats.db_time,
+            stats.pool_wait,
+        )
+    overloaded = False
+    try:
+        yield
+    except (exc.TimeoutError, CircuitOpenError, DeadlineExceeded):
+        overloaded = True
+        raise
+    finally:
+        if stats is None:
+            latency = time.perf_counter() - started
+        else:
+            statements = stats.queries - queries
+            latency = stats.pool_wait - pool_wait
+            if statements:
+                latency += (stats.db_time - db_time) / statements
+        limiter.release(latency, overloaded=overloaded)
+
+
+@contextlib.asynccontextmanager
+async def _session_scope(
+    session_class: async_sessionmaker[AsyncSession],
+    deadline: Optional[float],
+) -> AsyncIterator[AsyncSession]:
+    """Open a session limited to the request deadline, if any."""
+    async with session_class() as session:
+        if deadline is None:
+            yield session
+            return
+
+        apply_statement_timeout(session.sync_session, deadline)
+        try:
+            yield session
+        except exc.DBAPIError as e:
+            if is_query_canceled(e):
+                raise DeadlineExceeded() from e
+            raise
+
+
+def _get_deadline(request: Request) -> Optional[float]:
+    """Get the request deadline set by `DeadlineMiddleware`."""
+    return getattr(request.state, "deadline", None)
+
+
 async def get_db_session(
+    request: Request,
     app: Annotated[FastAPI, Depends(get_app_instance)],
+    settings: Annotated[Settings, Depends(get_app_settings)],
+    response: Response,
+    _db_slot: Annotated[None, Depends(limit_db_concurrency)],
 ) -> AsyncGenerator[AsyncSession, None]:
-    """DI function to populate SQLAlchemy Session over the app."""
-    session_class = async_session_maker(app.state.db_engine)
-    async with session_class() as session:
+    """DI function to populate SQLAlchemy Session over the app.
+
+    The session is bound to the primary database. Once it commits, the
+    client is pinned to the primary for reads for a while, so it can read
+    its own writes even if the replica lags behind.
+
+    The request holds a slot of the database concurrency limit meanwhile.
+
+    Statements are cancelled once the request deadline passes, see
+    `api.deadlines`.
+    """
+
+    def remember_write(_session) -> None:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            str(time.time()),
+            max_age=settings.DB_READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+
+    session_scope = _session_scope(
+        app.state.db_session_maker, _get_deadline(request)
+    )
+    async with session_scope as session:
+        event.listen(session.sync_session, "after_commit", remember_write)
+        yield session
+
+
+def _wrote_recently(request: Request, window: int) -> bool:
+    """Check whether the client committed a write within `window` seconds."""
+    try:
+        last_write_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - last_write_at < window
+
+
+async def get_db_read_session(
+    request: Request,
+    app: Annotated[FastAPI, Depends(get_app_instance)],
+    settings: Annotated[Settings, Depends(get_app_settings)],
+    _db_slot: Annotated[None, Depends(limit_db_concurrency)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """DI function to populate a read-only SQLAlchemy Session.
+
+    Transactions run as `READ ONLY` on the replica, or on the primary if
+    no replica is configured or the client has written recently. The
+    request deadline applies as in `get_db_session`.
+    """
+    session_class = app.state.db_read_session_maker
+    if _wrote_recently(request, settings.DB_READ_YOUR_WRITES_SECONDS):
+        session_class = app.state.db_primary_read_session_maker
+    async with _session_scope(session_class, _get_deadline(request)) as session:
         yield session
@@ -0,0 +1,385 @@
+"""SQLAlchemy engine instrumentation.
+
+Engine event hooks which collect statistics about the statements the API
+runs. They are installed once per engine, usually from the app lifespan:
+
+```python
+install_query_tags(engine)
+stats = StatementCacheStats.install(engine)
+install_query_timing(engine)
+slow_query_log = SlowQueryLog.install(engine, threshold=0.5)
+```
+
+Per-request numbers are collected into the `RequestQueryStats` of the
+current request, see `api.middlewares.ServerTimingMiddleware`.
+"""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_OPTION = "api_explain"
+"""Execution option marking the statements run by `SlowQueryLog`."""
+
+_T = TypeVar("_T")
+
+
+class StatementCacheStats:
+    """Hit/miss counters of the statement caches.
+
+    Two caches are involved in running a statement:
+
+    - SQLAlchemy's compiled cache, which skips compiling a statement
+      construct to SQL (`query_cache_size` of the engine);
+    - the asyncpg prepared statement cache, kept per connection, which
+      skips the parse/plan round trip to Postgres
+      (`prepared_statement_cache_size`).
+    """
+
+    def __init__(self) -> None:
+        self.compiled_hits = 0
+        self.compiled_misses = 0
+        self.prepared_hits = 0
+        self.prepared_misses = 0
+
+    @classmethod
+    def install(cls, db_engine: AsyncEngine) -> "StatementCacheStats":
+        """Start counting cache hits and misses of an engine."""
+        stats = cls()
+        event.listen(
+            db_engine.sync_engine, "before_cursor_execute", stats._on_execute
+        )
+        return stats
+
+    def _on_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        cache_hit = getattr(context, "cache_hit", None)
+        if cache_hit is CACHE_HIT:
+            self.compiled_hits += 1
+        elif cache_hit is CACHE_MISS:
+            self.compiled_misses += 1
+
+        # asyncpg dialect keeps prepared statements in an LRU cache keyed
+        # by the SQL string, the same string we get here
+        prepared = getattr(
+            conn.connection.dbapi_connection,
+            "_prepared_statement_cache",
+            None,
+        )
+        if prepared is None:
+            return
+        if statement in prepared:
+            self.prepared_hits += 1
+        else:
+            self.prepared_misses += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the counters as a dictionary."""
+        return {
+            "compiled_hits": self.compiled_hits,
+            "compiled_misses": self.compiled_misses,
+            "prepared_hits": self.prepared_hits,
+            "prepared_misses": self.prepared_misses,
+        }
+
+
+class RequestQueryStats:
+    """Statements run by a single request and the time they took."""
+
+    __slots__ = ("queries", "db_time", "pool_wait", "scope")
+
+    def __init__(self, scope: Optional[dict[str, Any]] = None) -> None:
+        self.queries = 0
+        """Number of statements sent to the database."""
+        self.db_time = 0.0
+        """Seconds spent executing statements."""
+        self.pool_wait = 0.0
+        """Seconds spent waiting for a connection from the pool."""
+        self.scope = scope
+        """ASGI scope of the request, if any."""
+
+    @property
+    def route(self) -> Optional[str]:
+        """Method and path template of the matched route, e.g.
+        `GET /api/articles/{article_id}`.
+        """
+        if self.scope is None:
+            return None
+        # the router stores the matched route into the scope we share
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path")
+        return f"{self.scope.get('method')} {path}"
+
+
+_current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def get_current_query_stats() -> Optional[RequestQueryStats]:
+    """Get the stats of the request being handled, if tracked."""
+    return _current_query_stats.get()
+
+
+@contextlib.contextmanager
+def track_query_stats(
+    scope: Optional[dict[str, Any]] = None,
+) -> Iterator[RequestQueryStats]:
+    """Collect the statements run within the block into fresh stats."""
+    stats = RequestQueryStats(scope)
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+def record_pool_wait(wait_time: float) -> None:
+    """Add a pool checkout wait to the current request, if tracked."""
+    stats = _current_query_stats.get()
+    if stats is not None:
+        stats.pool_wait += wait_time
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    stats = _current_query_stats.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    stats = _current_query_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is None or started_at is None:
+        return
+    stats.db_time += time.perf_counter() - started_at
+
+
+def install_query_timing(db_engine: AsyncEngine) -> None:
+    """Count statements and their duration into the current request stats.
+
+    Outside of `track_query_stats()` the hooks only do a context variable
+    lookup, so they are cheap to keep installed.
+    """
+    sync_engine = db_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+_current_query_tag: ContextVar[Optional[str]] = ContextVar(
+    "current_query_tag", default=None
+)
+
+
+def _tagged(func: Callable[..., Any], tag: str) -> Callable[..., Any]:
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _current_query_tag.set(tag)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _current_query_tag.reset(token)
+
+    return wrapper
+
+
+def tag_queries(cls: type[_T]) -> type[_T]:
+    """Tag the statements run by the public async methods of a manager.
+
+    Statements get a `/* ArticleManager.list_articles */` comment once
+    `install_query_tags()` is installed on the engine, which is how
+    `pg_stat_statements` and the slow query log tell where they come from.
+    """
+    for name, func in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(func):
+            continue
+        setattr(cls, name, _tagged(func, f"{cls.__name__}.{name}"))
+    return cls
+
+
+def _tag_statement(conn, cursor, statement, parameters, context, executemany):
+    tag = _current_query_tag.get()
+    if tag is not None:
+        statement = f"/* {tag} */ {statement}"
+    return statement, parameters
+
+
+def install_query_tags(db_engine: AsyncEngine) -> None:
+    """Prefix statements with the manager method running them.
+
+    Install it before the other hooks so they see the tagged statement.
+    The tag is the same for every call of a method, so the statement stays
+    cacheable as a prepared statement.
+    """
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        _tag_statement,
+        retval=True,
+    )
+
+
+_LEADING_COMMENTS_RE = re.compile(r"^\s*(/\*.*?\*/\s*)*", re.DOTALL)
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace statement parameter values with their type names.
+
+    Keeps the shape of the parameters (and whether they were `NULL`) for
+    the logs without leaking emails, password hashes or tokens into them.
+    """
+    if isinstance(parameters, dict):
+        return {k: redact_parameters(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(v) for v in parameters]
+    if parameters is None:
+        return None
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """Log statements slower than a threshold, together with their plan.
+
+    The plan is captured by `EXPLAIN (ANALYZE off, FORMAT JSON)` in a
+    background task on a separate connection, so the request which ran the
+    slow statement is not delayed any further. At most `max_explains`
+    plans are captured at the same time, others are skipped.
+    """
+
+    def __init__(
+        self,
+        db_engine: AsyncEngine,
+        threshold: float,
+        explain: bool = True,
+        max_explains: int = 2,
+    ) -> None:
+        self.db_engine = db_engine
+        self.threshold = threshold
+        """Duration (seconds) from which a statement is considered slow."""
+        self.explain = explain
+        self.max_explains = max_explains
+        self.slow_queries = 0
+        """Number of slow statements seen."""
+        self.explains_skipped = 0
+        """Number of plans not captured because of `max_explains`."""
+        self._explaining: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def install(
+        cls, db_engine: AsyncEngine, threshold: float, **kwargs: Any
+    ) -> "SlowQueryLog":
+        """Start logging slow statements of an engine."""
+        slow_query_log = cls(db_engine, threshold, **kwargs)
+        sync_engine = db_engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", cls._before)
+        event.listen(sync_engine, "after_cursor_execute", slow_query_log._after)
+        return slow_query_log
+
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started_at = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_slow_query_started_at", None)
+        if started_at is None or context.execution_options.get(EXPLAIN_OPTION):
+            return
+        duration = time.perf_counter() - started_at
+        if duration < self.threshold:
+            return
+
+        self.slow_queries += 1
+        stats = get_current_query_stats()
+        route = stats.route if stats is not None else None
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            duration * 1000,
+            route,
+            statement,
+            extra={
+                "db_statement": statement,
+                "db_parameters": redact_parameters(parameters),
+                "db_duration_ms": round(duration * 1000, 3),
+                "http_route": route,
+            },
+        )
+        if self.explain and not executemany:
+            self._schedule_explain(statement, parameters, route)
+
+    def _schedule_explain(
+        self, statement: str, parameters: Any, route: Optional[str]
+    ) -> None:
+        sql = _LEADING_COMMENTS_RE.sub("", statement)
+        if not sql.lower().startswith(_EXPLAINABLE):
+            return
+        if statement in self._explaining:
+            return
+        if len(self._explaining) >= self.max_explains:
+            self.explains_skipped += 1
+            return
+
+        # engine hooks run inside the event loop (via SQLAlchemy greenlets)
+        task = asyncio.get_running_loop().create_task(
+            self._explain(statement, parameters, route)
+        )
+        self._explaining[statement] = task
+        task.add_done_callback(lambda _: self._explaining.pop(statement, None))
+
+    async def _explain(
+        self, statement: str, parameters: Any, route: Optional[str]
+    ) -> None:
+        # the task inherited the request context, keep the EXPLAIN out of
+        # the request stats
+        _current_query_stats.set(None)
+        try:
+            async with self.db_engine.connect() as conn:
+                conn = await conn.execution_options(**{EXPLAIN_OPTION: True})
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}",
+                    parameters,
+                )
+                plan = result.scalar()
+                await conn.rollback()
+        except Exception:
+            logger.exception("Could not capture plan of a slow query")
+            return
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        logger.warning(
+            "Plan of slow query in %s: %s",
+            route,
+            statement,
+            extra={
+                "db_statement": statement,
+                "db_plan": plan,
+                "http_route": route,
+            },
+        )
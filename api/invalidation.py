@@ -0,0 +1,203 @@
+"""Cross-worker cache invalidation over Postgres `LISTEN/NOTIFY`.
+
+Write paths publish the cache keys they make stale with `pg_notify` in
+their own transaction, so the message is only delivered if the write
+commits. Every worker listens on a dedicated connection and evicts the keys
+from its `LocalCache`s:
+
+```python
+bus = InvalidationBus(dsn)
+await bus.start()
+
+revoked = bus.cache("revoked_tokens")
+...
+await bus.publish(session, {"revoked_tokens": [jti]})
+await session.commit()
+```
+
+Messages sent while a worker is not listening are lost, so its caches are
+disabled while the connection is down and flushed once it is back.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "api_invalidation"
+
+
+class InvalidationBus:
+    """Keep the worker's caches in sync with writes of all workers."""
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = CHANNEL,
+        cache_max_size: int = 10_000,
+        cache_ttl: float = 60.0,
+        reconnect_delay: float = 1.0,
+        ping_interval: float = 10.0,
+    ) -> None:
+        self.dsn = dsn
+        """Plain asyncpg DSN, without the `+asyncpg` SQLAlchemy suffix."""
+        self.channel = channel
+        self.cache_max_size = cache_max_size
+        self.cache_ttl = cache_ttl
+        self.reconnect_delay = reconnect_delay
+        self.ping_interval = ping_interval
+        """Seconds between liveness checks of the listening connection."""
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+        """Number of times the listener connected after a failure."""
+        self.messages = 0
+        """Number of messages received."""
+        self._caches: dict[str, LocalCache] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def cache(self, name: str) -> LocalCache:
+        """Get the cache with a name, creating it on first use.
+
+        Caches are disabled until the listener is connected.
+        """
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = LocalCache(self.cache_max_size, self.cache_ttl)
+            cache.enabled = self.connected.is_set()
+            self._caches[name] = cache
+        return cache
+
+    def invalidate_locally(
+        self, name: str, keys: Optional[list[str]] = None
+    ) -> None:
+        """Evict keys from a cache of this worker, all of them if `None`."""
+        cache = self._caches.get(name)
+        if cache is None:
+            return
+        if keys is None:
+            cache.clear()
+        else:
+            cache.delete(*keys)
+
+    def flush(self) -> None:
+        """Evict everything from all caches of this worker."""
+        for cache in self._caches.values():
+            cache.clear()
+
+    def invalidate_all_locally(
+        self, invalidations: dict[str, Optional[list[str]]]
+    ) -> None:
+        """Evict keys from several caches of this worker."""
+        for name, keys in invalidations.items():
+            self.invalidate_locally(name, keys)
+
+    async def publish(
+        self,
+        session: AsyncSession,
+        invalidations: dict[str, Optional[list[str]]],
+    ) -> None:
+        """Invalidate keys in all workers once the session commits.
+
+        The keys are also evicted from this worker's caches right after the
+        commit, without waiting for the notification to come back.
+
+        Args:
+            session (AsyncSession): Session running the write.
+            invalidations (dict[str, Optional[list[str]]]): Keys to evict
+                by cache name, `None` evicts all keys of the cache.
+        """
+        payload = json.dumps(invalidations)
+        await session.execute(select(func.pg_notify(self.channel, payload)))
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda _session: self.invalidate_all_locally(invalidations),
+            once=True,
+        )
+
+    def _on_notification(
+        self, _conn: Any, _pid: int, _channel: str, payload: str
+    ) -> None:
+        self.messages += 1
+        try:
+            invalidations = json.loads(payload)
+            self.invalidate_all_locally(invalidations)
+        except (ValueError, AttributeError, TypeError):
+            logger.warning("Malformed invalidation message: %r", payload)
+            self.flush()
+
+    def _set_connected(self, connected: bool) -> None:
+        # anything cached may have missed messages while disconnected
+        self.flush()
+        for cache in self._caches.values():
+            cache.enabled = connected
+        if connected:
+            self.connected.set()
+        else:
+            self.connected.clear()
+
+    async def _listen(self) -> None:
+        conn = await asyncpg.connect(self.dsn)
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _conn: lost.set())
+        try:
+            await conn.add_listener(self.channel, self._on_notification)
+            self._set_connected(True)
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), self.ping_interval)
+                except asyncio.TimeoutError:
+                    # a silently dropped connection is only noticed on use
+                    await conn.fetchval("SELECT 1", timeout=self.ping_interval)
+            raise ConnectionError("Listening connection closed")
+        finally:
+            self._set_connected(False)
+            conn.terminate()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Invalidation listener disconnected, reconnecting",
+                    exc_info=True,
+                )
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        """Start listening in a background task."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the listener state and cache counters as a dictionary."""
+        return {
+            "connected": self.connected.is_set(),
+            "reconnects": self.reconnects,
+            "messages": self.messages,
+            "caches": {
+                name: cache.as_dict() for name, cache in self._caches.items()
+            },
+        }
@@ -0,0 +1,9 @@
+"""Custom middlewares for the API Application."""
+
+from .deadline import DeadlineMiddleware
+from .server_timing import ServerTimingMiddleware
+
+__all__ = [
+    "DeadlineMiddleware",
+    "ServerTimingMiddleware",
+]
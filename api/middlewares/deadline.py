@@ -0,0 +1,45 @@
+"""Request deadline middleware."""
+
+import time
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.deadlines import (
+    MAX_STATEMENT_TIMEOUT_MS,
+    REQUEST_TIMEOUT_HEADER,
+    parse_timeout,
+)
+
+
+class DeadlineMiddleware:
+    """Give every request a deadline, see `api.deadlines`.
+
+    The deadline (a `time.monotonic()` timestamp, or `None`) is stored in
+    `request.state.deadline` as soon as the request comes in, so the time
+    spent before the first statement counts against it too.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_timeout: Optional[float] = None,
+        max_timeout: float = MAX_STATEMENT_TIMEOUT_MS / 1000,
+    ) -> None:
+        self.app = app
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            timeout = parse_timeout(
+                Headers(scope=scope).get(REQUEST_TIMEOUT_HEADER),
+                self.default_timeout,
+                self.max_timeout,
+            )
+            state = scope.setdefault("state", {})
+            state["deadline"] = (
+                time.monotonic() + timeout if timeout is not None else None
+            )
+        await self.app(scope, receive, send)
@@ -0,0 +1,84 @@
+"""Per-request database timing middleware."""
+
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.instrumentation import RequestQueryStats, track_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def format_server_timing(stats: RequestQueryStats, total: float) -> str:
+    """Format request stats as a `Server-Timing` header value.
+
+    Durations are in milliseconds, as the header specification requires.
+    """
+    return ", ".join(
+        [
+            f'db;dur={stats.db_time * 1000:.3f};desc="{stats.queries} queries"',
+            f"db-pool;dur={stats.pool_wait * 1000:.3f}",
+            f"total;dur={total * 1000:.3f}",
+        ]
+    )
+
+
+class ServerTimingMiddleware:
+    """Report statements run by each request and the time they took.
+
+    The numbers are collected by the engine hooks from
+    `api.instrumentation.install_query_timing`, sent to the client as a
+    `Server-Timing` header and logged with every finished request.
+    """
+
+    def __init__(self, app: ASGIApp, emit_header: bool = True) -> None:
+        self.app = app
+        self.emit_header = emit_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        with track_query_stats(scope) as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if self.emit_header:
+                        headers = MutableHeaders(scope=message)
+                        headers.append(
+                            "Server-Timing",
+                            format_server_timing(
+                                stats, time.perf_counter() - started
+                            ),
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "http_method": scope["method"],
+                        "http_path": scope["path"],
+                        "http_route": stats.route,
+                        "status_code": status_code,
+                        "duration_ms": round(
+                            (time.perf_counter() - started) * 1000, 3
+                        ),
+                        "db_queries": stats.queries,
+                        "db_time_ms": round(stats.db_time * 1000, 3),
+                        "db_pool_wait_ms": round(stats.pool_wait * 1000, 3),
+                    },
+                )
@@ -0,0 +1,122 @@
+"""Keyset (cursor) pagination.
+
+Pages are read with `WHERE (sort key) < (last key of the previous page)`
+on an index of the sort key, so every page costs the same, unlike
+`OFFSET`. The last key is handed to clients as an opaque cursor:
+
+```python
+after = decode_cursor(cursor, (datetime, int)) if cursor else None
+rows = await manager.list_things(limit=limit + 1, after=after)
+page, next_cursor = paginate(rows, limit, lambda r: (r.created_at, r.id))
+```
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Generic, Optional, Sequence, TypeVar
+
+from pydantic import BaseModel
+from starlette.requests import Request
+
+T = TypeVar("T")
+
+INT4_MAX = 2**31 - 1
+"""Largest value of an `integer` column, the type of the primary keys."""
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or belongs to another sort order."""
+
+    def __init__(self) -> None:
+        super().__init__("Invalid cursor.")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """A page of items and the cursor of the next one."""
+
+    items: list[T]
+    next_cursor: Optional[str] = None
+    """Pass as `cursor` to get the next page; `None` on the last page."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor."""
+    data = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, types: Sequence[type], max_int: int = INT4_MAX
+) -> tuple[Any, ...]:
+    """Decode a cursor into sort key values.
+
+    Values the columns of the sort key could not hold are rejected, the
+    database would fail on them.
+
+    Args:
+        cursor (str): The cursor from `encode_cursor()`.
+        types (Sequence[type]): Types of the sort key values, `datetime`
+            values are parsed from ISO 8601 and must be naive, as the
+            `timestamp` columns are.
+        max_int (int): Largest magnitude of `int` values, that of an
+            `integer` column by default.
+
+    Returns:
+        tuple[Any, ...]: The sort key values.
+
+    Raises:
+        InvalidCursor: The cursor is not one of `types`' sort keys.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor() from None
+    if not isinstance(data, list) or len(data) != len(types):
+        raise InvalidCursor()
+
+    values = []
+    for value, type_ in zip(data, types, strict=True):
+        try:
+            if type_ is datetime:
+                value = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidCursor() from None
+        # bool is an int, but never a valid key
+        if not isinstance(value, type_) or isinstance(value, bool):
+            raise InvalidCursor()
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            raise InvalidCursor()
+        if isinstance(value, int) and not -max_int - 1 <= value <= max_int:
+            raise InvalidCursor()
+        values.append(value)
+    return tuple(values)
+
+
+def paginate(
+    rows: Sequence[T], limit: int, key: Callable[[T], Sequence[Any]]
+) -> tuple[list[T], Optional[str]]:
+    """Cut a page from rows fetched with `limit + 1`.
+
+    Args:
+        rows (Sequence[T]): Rows read with one row more than `limit`,
+            which tells whether there is a next page.
+        limit (int): The page size.
+        key (Callable[[T], Sequence[Any]]): Sort key of a row.
+
+    Returns:
+        tuple[list[T], Optional[str]]: The page and the next cursor.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(key(page[-1]))
+
+
+def next_page_link(request: Request, next_cursor: str, limit: int) -> str:
+    """Build a `Link` header value pointing to the next page."""
+    url = request.url.include_query_params(cursor=next_cursor, limit=limit)
+    return f'<{url}>; rel="next"'
@@ -0,0 +1,311 @@
+"""Report of the API's statements from `pg_stat_statements`.
+
+Statements are mapped back to the manager method running them with the
+`/* ArticleManager.list_articles */` tags added by
+`api.instrumentation.install_query_tags()`. The extension has to be loaded
+(`shared_preload_libraries = 'pg_stat_statements'`) and created in the
+database (`CREATE EXTENSION pg_stat_statements`).
+
+```sh
+# top statements by total time
+python -m api.pg_stats report --order-by total --limit 10
+# compare before and after a deploy
+python -m api.pg_stats snapshot before.json
+python -m api.pg_stats snapshot after.json
+python -m api.pg_stats diff before.json after.json --order-by mean
+```
+"""
+
+import argparse
+import asyncio
+import datetime
+import re
+import sys
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from api.db import create_engine
+from api.settings import Settings
+
+_TAG_RE = re.compile(r"^\s*/\*\s*(?P<tag>[\w.]+)\s*\*/\s*")
+
+_STATEMENTS_QUERY = text(
+    """
+    SELECT s.queryid, s.query, s.calls, s.total_exec_time, s.rows
+    FROM pg_stat_statements AS s
+    JOIN pg_database AS d ON d.oid = s.dbid
+    WHERE d.datname = current_database()
+    """
+)
+
+ORDER_BY = ("total", "mean", "rows")
+
+
+class StatementStats(BaseModel):
+    """Cumulative statistics of a normalized statement."""
+
+    queryid: int
+    query: str
+    calls: int
+    total_time_ms: float
+    rows: int
+
+    @property
+    def source(self) -> Optional[str]:
+        """Manager method running the statement, e.g.
+        `ArticleManager.list_articles`.
+        """
+        match = _TAG_RE.match(self.query)
+        return match.group("tag") if match else None
+
+    @property
+    def mean_time_ms(self) -> float:
+        """Mean execution time of a call."""
+        return self.total_time_ms / self.calls if self.calls else 0.0
+
+    @property
+    def rows_per_call(self) -> float:
+        """Mean number of rows returned or affected by a call."""
+        return self.rows / self.calls if self.calls else 0.0
+
+
+class Snapshot(BaseModel):
+    """Statistics of all statements at a point in time."""
+
+    taken_at: datetime.datetime
+    statements: list[StatementStats]
+
+
+class StatementDiff(BaseModel):
+    """Statistics of a statement between two snapshots."""
+
+    window: StatementStats
+    """Calls, time and rows accumulated between the snapshots."""
+    mean_before_ms: Optional[float] = None
+    """Mean time of a call up to the first snapshot, if it was there."""
+
+    @property
+    def mean_change(self) -> Optional[float]:
+        """Relative change of the mean time, `0.5` is 50% slower."""
+        if not self.mean_before_ms:
+            return None
+        return self.window.mean_time_ms / self.mean_before_ms - 1
+
+
+def _sort_key(stats: StatementStats, order_by: str) -> float:
+    if order_by == "total":
+        return stats.total_time_ms
+    if order_by == "mean":
+        return stats.mean_time_ms
+    if order_by == "rows":
+        return stats.rows_per_call
+    raise ValueError(f"Unknown order: {order_by}")
+
+
+def rank_statements(
+    statements: list[StatementStats],
+    order_by: str = "total",
+    limit: Optional[int] = None,
+    tagged_only: bool = True,
+) -> list[StatementStats]:
+    """Get the most expensive statements first.
+
+    Args:
+        statements (list[StatementStats]): Statements to rank.
+        order_by (str): `total` time, `mean` time or `rows` per call.
+        limit (Optional[int]): Number of statements to keep.
+        tagged_only (bool): Skip statements not run by a manager method.
+
+    Returns:
+        list[StatementStats]: Ranked statements.
+    """
+    if tagged_only:
+        statements = [s for s in statements if s.source is not None]
+    ranked = sorted(
+        statements, key=lambda s: _sort_key(s, order_by), reverse=True
+    )
+    return ranked[:limit] if limit is not None else ranked
+
+
+def diff_snapshots(before: Snapshot, after: Snapshot) -> list[StatementDiff]:
+    """Get the statistics accumulated between two snapshots.
+
+    Statements are matched by `queryid`. A statement whose calls went down
+    had its statistics reset in between, so all of its `after` numbers are
+    counted. Statements not called between the snapshots are left out.
+
+    Args:
+        before (Snapshot): The earlier snapshot, e.g. before a deploy.
+        after (Snapshot): The later snapshot.
+
+    Returns:
+        list[StatementDiff]: Statistics of the statements called in between.
+    """
+    previous = {s.queryid: s for s in before.statements}
+    diffs = []
+    for stats in after.statements:
+        old = previous.get(stats.queryid)
+        window = stats
+        if old is not None and stats.calls >= old.calls:
+            window = stats.model_copy(
+                update={
+                    "calls": stats.calls - old.calls,
+                    "total_time_ms": stats.total_time_ms - old.total_time_ms,
+                    "rows": stats.rows - old.rows,
+                }
+            )
+        if not window.calls:
+            continue
+        diffs.append(
+            StatementDiff(
+                window=window,
+                mean_before_ms=old.mean_time_ms if old is not None else None,
+            )
+        )
+    return diffs
+
+
+def _short_query(query: str, width: int = 60) -> str:
+    query = " ".join(_TAG_RE.sub("", query).split())
+    return query if len(query) <= width else query[: width - 3] + "..."
+
+
+def format_statements(statements: list[StatementStats]) -> str:
+    """Format ranked statements as a text table."""
+    lines = [
+        f"{'source':<40} {'calls':>8} {'total ms':>12} {'mean ms':>10} "
+        f"{'rows/call':>10}  query"
+    ]
+    for s in statements:
+        lines.append(
+            f"{s.source or '-':<40} {s.calls:>8} {s.total_time_ms:>12.1f} "
+            f"{s.mean_time_ms:>10.3f} {s.rows_per_call:>10.1f}  "
+            f"{_short_query(s.query)}"
+        )
+    return "\n".join(lines)
+
+
+def format_diffs(diffs: list[StatementDiff]) -> str:
+    """Format ranked snapshot differences as a text table."""
+    lines = [
+        f"{'source':<40} {'calls':>8} {'total ms':>12} {'mean ms':>10} "
+        f"{'before ms':>10} {'change':>8}  query"
+    ]
+    for d in diffs:
+        s = d.window
+        before = (
+            f"{d.mean_before_ms:.3f}" if d.mean_before_ms is not None else "-"
+        )
+        change = f"{d.mean_change:+.0%}" if d.mean_change is not None else "-"
+        lines.append(
+            f"{s.source or '-':<40} {s.calls:>8} {s.total_time_ms:>12.1f} "
+            f"{s.mean_time_ms:>10.3f} {before:>10} {change:>8}  "
+            f"{_short_query(s.query)}"
+        )
+    return "\n".join(lines)
+
+
+async def fetch_statements(db_engine: AsyncEngine) -> list[StatementStats]:
+    """Read the statistics of the current database's statements."""
+    async with db_engine.connect() as conn:
+        res = await conn.execute(_STATEMENTS_QUERY)
+        return [
+            StatementStats(
+                queryid=row.queryid,
+                query=row.query,
+                calls=row.calls,
+                total_time_ms=row.total_exec_time,
+                rows=row.rows,
+            )
+            for row in res
+        ]
+
+
+async def take_snapshot(settings: Settings) -> Snapshot:
+    """Take a snapshot of the statistics of the API's database."""
+    engine = create_engine(settings.get_db_url())
+    try:
+        statements = await fetch_statements(engine)
+    finally:
+        await engine.dispose()
+    return Snapshot(
+        taken_at=datetime.datetime.now(datetime.timezone.utc),
+        statements=statements,
+    )
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m api.pg_stats",
+        description="Rank the API's statements from pg_stat_statements.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_ranking_args(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--order-by", choices=ORDER_BY, default="total")
+        command.add_argument("--limit", type=int, default=20)
+        command.add_argument(
+            "--all",
+            action="store_true",
+            help="include statements not run by a manager method",
+        )
+
+    add_ranking_args(commands.add_parser("report", help="rank statements"))
+
+    snapshot = commands.add_parser("snapshot", help="save the statistics")
+    snapshot.add_argument("output", type=Path)
+
+    diff = commands.add_parser("diff", help="rank changes between snapshots")
+    diff.add_argument("before", type=Path)
+    diff.add_argument("after", type=Path)
+    add_ranking_args(diff)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Command line entry point."""
+    args = _parse_args(argv)
+
+    if args.command == "diff":
+        before = Snapshot.model_validate_json(args.before.read_text())
+        after = Snapshot.model_validate_json(args.after.read_text())
+        diffs = diff_snapshots(before, after)
+        if not args.all:
+            diffs = [d for d in diffs if d.window.source is not None]
+        diffs.sort(
+            key=lambda d: _sort_key(d.window, args.order_by), reverse=True
+        )
+        print(format_diffs(diffs[: args.limit]))
+        return
+
+    try:
+        snapshot = asyncio.run(take_snapshot(Settings()))
+    except ProgrammingError as e:
+        sys.exit(
+            f"Could not read pg_stat_statements: {e.orig}\n"
+            "Is the extension loaded and created in the database?"
+        )
+    if args.command == "snapshot":
+        args.output.write_text(snapshot.model_dump_json(indent=2))
+        print(
+            f"Saved {len(snapshot.statements)} statements to {args.output}",
+            file=sys.stderr,
+        )
+        return
+
+    ranked = rank_statements(
+        snapshot.statements,
+        order_by=args.order_by,
+        limit=args.limit,
+        tagged_only=not args.all,
+    )
+    print(format_statements(ranked))
+
+
+if __name__ == "__main__":
+    main()
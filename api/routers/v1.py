@@ -1,11 +1,18 @@
 """Root router.
-Contains the root endpoint.
+Contains the root, liveness and readiness endpoints.
 """
 
-from fastapi import APIRouter
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, FastAPI, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from api.articles.routers import router as article_router
 from api.auth.routers import router as auth_router
+from api.circuit_breaker import OPEN
+from api.db import get_circuit_breaker, get_pool_status
+from api.dependencies import get_app_instance
 from api.users.routers import router as user_router
 
 router = APIRouter()
@@ -18,3 +25,108 @@ router.include_router(article_router, prefix="/api/articles")
 async def home():
     """Simple home page."""
     return {"message": "Hello World"}
+
+
+def _database_status(db_engine: AsyncEngine) -> dict[str, Any]:
+    """Readiness of a database from the state kept in memory."""
+    pool = get_pool_status(db_engine)
+    # every connection is taken and requests queue up for one; pools
+    # without a capacity, such as `NullPool`, open one per checkout
+    saturated = (
+        "size" in pool
+        and pool.get("waiting", 0) > 0
+        and pool["checked_out"] >= pool["size"] + pool["max_overflow"]
+    )
+
+    breaker = get_circuit_breaker(db_engine)
+    circuit = breaker.as_dict() if breaker is not None else None
+    return {
+        "ready": not saturated
+        and (circuit is None or circuit["state"] != OPEN),
+        "saturated": saturated,
+        "circuit_breaker": circuit,
+        "pool": pool,
+    }
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness probe, the process is up and serving."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(app: Annotated[FastAPI, Depends(get_app_instance)]):
+    """Readiness probe.
+
+    Reports whether the startup warm-up finished, and the circuit breaker
+    and pool saturation of the databases without running a query, so
+    frequent probes add no database load.
+    """
+    databases = {"primary": _database_status(app.state.db_engine)}
+    if app.state.db_replica_engine is not None:
+        databases["replica"] = _database_status(app.state.db_replica_engine)
+
+    warmed_up = app.state.warmed_up
+    ready = warmed_up and all(db["ready"] for db in databases.values())
+    return JSONResponse(
+        {
+            "status": "ok" if ready else "unavailable",
+            "warmed_up": warmed_up,
+            "databases": databases,
+        },
+        status_code=(
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
+
+
+@router.get("/metrics")
+async def metrics(app: Annotated[FastAPI, Depends(get_app_instance)]):
+    """Runtime metrics of the worker, as JSON.
+
+    Covers the database concurrency limit, the pools, circuit breakers and
+    statement caches of the databases, the in-process caches, the shared
+    cache, the coalescing of its builds, the stale responses served and
+    the buffered likes.
+    """
+    databases = {}
+    engines = {
+        "primary": (
+            app.state.db_engine,
+            app.state.db_statement_cache_stats,
+        ),
+        "replica": (
+            app.state.db_replica_engine,
+            app.state.db_replica_statement_cache_stats,
+        ),
+    }
+    for name, (engine, statement_cache_stats) in engines.items():
+        if engine is None:
+            continue
+        breaker = get_circuit_breaker(engine)
+        databases[name] = {
+            "pool": get_pool_status(engine),
+            "circuit_breaker": breaker.as_dict() if breaker else None,
+            "statement_cache": statement_cache_stats.as_dict(),
+        }
+
+    limiter = app.state.db_limiter
+    bus = app.state.invalidation_bus
+    shared_cache = app.state.shared_cache
+    fragments = app.state.article_fragments
+    single_flight = fragments.single_flight
+    like_buffer = app.state.like_buffer
+    return {
+        "db_concurrency": limiter.as_dict() if limiter else None,
+        "databases": databases,
+        "caches": bus.as_dict() if bus else None,
+        "shared_cache": shared_cache.as_dict() if shared_cache else None,
+        "single_flight": (
+            single_flight.as_dict() if single_flight is not None else None
+        ),
+        "stale_served": fragments.stale_served,
+        "like_buffer": (
+            like_buffer.as_dict() if like_buffer is not None else None
+        ),
+    }
@@ -1,5 +1,7 @@
 """API Settings."""
 
+from typing import Optional
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,6 +22,180 @@ class CorsSettings(BaseModel):
     allow_credentials: bool = True
 
 
+class DbPoolSettings(BaseModel):
+    """Database Connection Pool Settings."""
+
+    enabled: bool = True
+    """Keep connections open between requests; `False` selects `NullPool`."""
+    size: int = 5
+    """Number of connections kept open in the pool."""
+    max_overflow: int = 10
+    """Extra connections allowed on top of `size` under load."""
+    recycle: int = 1800
+    """Close connections older than this many seconds (`-1` disables)."""
+    pre_ping: bool = True
+    """Test connections for liveness on checkout."""
+    timeout: float = 30.0
+    """Seconds to wait for a free connection before giving up."""
+    connect_timeout: float = 10.0
+    """Seconds to wait for a new connection to be established."""
+
+
+class DbCircuitBreakerSettings(BaseModel):
+    """Database Circuit Breaker Settings."""
+
+    enabled: bool = True
+    failure_threshold: int = 5
+    """Connection failures or checkout timeouts opening the circuit."""
+    window: float = 10.0
+    """Seconds within which the failures are counted."""
+    reset_timeout: float = 15.0
+    """Seconds the circuit stays open before checkouts are tried again."""
+
+
+class DbStatementCacheSettings(BaseModel):
+    """Database Statement Cache Settings."""
+
+    compiled_cache_size: int = 500
+    """SQL strings compiled by SQLAlchemy kept per engine."""
+    prepared_statement_cache_size: int = 100
+    """Server-side prepared statements kept per connection (`0` disables)."""
+    pgbouncer_transaction_mode: bool = False
+    """Connections go through PgBouncer in transaction pooling mode.
+
+    Prepared statements can't be reused across transactions there, so
+    caching is turned off and every statement gets a unique name.
+    """
+
+
+class DbSlowQuerySettings(BaseModel):
+    """Slow Query Log Settings."""
+
+    threshold_ms: Optional[float] = None
+    """Log statements running longer than this; `None` disables the log."""
+    explain: bool = True
+    """Capture the plan of slow statements with `EXPLAIN`."""
+    max_explains: int = 2
+    """Plans captured at the same time, extra ones are skipped."""
+
+
+class DbConcurrencySettings(BaseModel):
+    """Adaptive Database Concurrency Limit Settings, see `api.concurrency`."""
+
+    enabled: bool = True
+    initial_limit: int = 20
+    """Requests using the database at the same time, at startup."""
+    min_limit: int = 2
+    max_limit: int = 200
+    latency_threshold_ms: float = 100.0
+    """Connection wait plus mean statement time from which the limit
+    shrinks.
+    """
+    backoff: float = 0.9
+    """Factor the limit shrinks by on a slow or timed out request."""
+    retry_after: float = 1.0
+    """Seconds clients are told to wait when rejected."""
+
+
+class PaginationSettings(BaseModel):
+    """Cursor Pagination Settings."""
+
+    default_limit: int = 20
+    """Page size when the client sends no `limit`."""
+    max_limit: int = 100
+    """Largest page size, bigger `limit`s are capped to it."""
+    comment_preview: int = 5
+    """Number of latest comments embedded in an article."""
+    legacy_article_list: bool = True
+    """Serve `GET /api/articles` without `limit` and `cursor` as the full,
+    unpaginated array the existing front-end expects.
+    """
+
+
+class CacheSettings(BaseModel):
+    """In-process Cache Settings."""
+
+    enabled: bool = True
+    """Cache in every worker, kept in sync over Postgres `LISTEN/NOTIFY`."""
+    max_size: int = 10_000
+    """Entries kept per cache, least recently used ones are evicted."""
+    ttl: float = 60.0
+    """Seconds an entry is served for, bounds staleness of missed updates."""
+    invalidation_channel: str = "api_invalidation"
+    """`NOTIFY` channel the workers publish invalidations to."""
+    reconnect_delay: float = 1.0
+    """Seconds to wait before reconnecting the invalidation listener."""
+
+
+class SharedCacheSettings(BaseModel):
+    """Shared Cache Settings, see `api.cache.Cache`."""
+
+    enabled: bool = True
+    nodes: list[str] = []
+    """`host:port` of Redis protocol servers, keys are spread over them by
+    consistent hashing. Without nodes, every worker caches in its own
+    memory.
+    """
+    namespace: str = "api"
+    """Prefix of all keys, change it to start with an empty cache."""
+    ttl: float = 3600.0
+    """Seconds a value is kept by default."""
+    max_bytes: int = 64 * 1024 * 1024
+    """Memory the values may use per worker, without nodes."""
+    timeout: float = 0.5
+    """Seconds a cache round trip may take before it counts as a miss."""
+    max_connections: int = 10
+    """Connections per node and worker."""
+    single_flight: bool = True
+    """Share one build among the concurrent requests missing the same
+    value.
+    """
+    early_refresh_beta: float = 1.0
+    """Eagerness to rebuild values before they expire, `0` waits for them
+    to expire.
+    """
+    stale_if_error: float = 300.0
+    """Seconds past their expiry cached responses are still served while
+    the database fails, `0` to fail instead.
+    """
+
+
+class BulkCreateSettings(BaseModel):
+    """Bulk Article Creation Settings, see `POST /api/articles/bulk`."""
+
+    max_articles: int = 100
+    """Largest number of articles created by a single request."""
+    atomic: bool = True
+    """Create none of the articles when one is invalid, unless the request
+    says otherwise.
+    """
+
+
+class LikeBufferSettings(BaseModel):
+    """Like Buffer Settings, see `api.articles.like_buffer`."""
+
+    enabled: bool = False
+    """Add up likes in memory and write them in batches. The likes a
+    worker did not write yet are lost if it dies.
+    """
+    flush_interval: float = 1.0
+    """Seconds between two writes of the buffered likes."""
+
+
+class WarmUpSettings(BaseModel):
+    """Startup Warm-up Settings, see `api.warmup`."""
+
+    enabled: bool = True
+    pool_connections: Optional[int] = None
+    """Connections opened per engine; `None` fills the whole pool size."""
+    openapi: bool = True
+    """Build the OpenAPI schema served at `/swagger.json`."""
+    prime_caches: bool = False
+    """Store the JSON of the latest articles in the shared cache."""
+    prime_articles: int = 100
+    """Number of latest articles to prime the caches with."""
+
+
 class Settings(BaseSettings):
     """API Settings."""
 
@@ -37,6 +213,18 @@ class Settings(BaseSettings):
 
     CORS_MIDDLEWARE: CorsSettings = CorsSettings()
 
+    SERVER_TIMING_HEADER: bool = True
+    """Send per-request DB timings to clients as a `Server-Timing` header."""
+    REQUEST_TIMEOUT_SECONDS: Optional[float] = None
+    """Deadline of every request; clients may shorten it with the
+    `X-Request-Timeout` header. `None` leaves requests without a deadline
+    unless the client sends the header.
+    """
+    MAX_REQUEST_TIMEOUT_SECONDS: float = 3600.0
+    """Longest deadline a request gets, from the setting or the header; at
+    most 2147483.647, the longest `statement_timeout` Postgres accepts.
+    """
+
     SALT: str = "1" * 16
     """Salt key for hashing passwords."""
 
@@ -52,6 +240,30 @@ class Settings(BaseSettings):
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "postgres"
     DB_NAME: str = "postgres"
+    DB_POOL: DbPoolSettings = DbPoolSettings()
+    DB_STATEMENT_CACHE: DbStatementCacheSettings = DbStatementCacheSettings()
+    DB_CIRCUIT_BREAKER: DbCircuitBreakerSettings = DbCircuitBreakerSettings()
+    DB_SLOW_QUERY: DbSlowQuerySettings = DbSlowQuerySettings()
+    DB_CONCURRENCY: DbConcurrencySettings = DbConcurrencySettings()
+    DB_QUERY_TAGS: bool = True
+    """Prefix statements with a `/* Manager.method */` comment."""
+    DB_RENDER_JSON: bool = False
+    """Render full article responses as JSON in the database, in a single
+    query, instead of loading and encoding ORM objects; the JSON is the
+    same byte for byte.
+    """
+
+    CACHE: CacheSettings = CacheSettings()
+    SHARED_CACHE: SharedCacheSettings = SharedCacheSettings()
+    PAGINATION: PaginationSettings = PaginationSettings()
+    LIKE_BUFFER: LikeBufferSettings = LikeBufferSettings()
+    BULK_CREATE: BulkCreateSettings = BulkCreateSettings()
+    WARM_UP: WarmUpSettings = WarmUpSettings()
+
+    DB_REPLICA_URL: Optional[str] = None
+    """Read replica URL for read-only routes; the primary is used if unset."""
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+    """How long a client keeps reading from the primary after a write."""
 
     def get_db_url(self) -> str:
         """Get the database URL."""
@@ -0,0 +1,105 @@
+"""Coalescing of concurrent identical calls.
+
+When a hot cache entry goes missing, every request reading it misses at
+the same time and runs the same queries. `SingleFlight` lets the first
+caller of a key run the call while the callers arriving meanwhile wait for
+its result:
+
+```python
+flights = SingleFlight()
+data = await flights.do(f"article:{article_id}", load_article)
+```
+
+Only calls in flight are shared, nothing is kept once the call returns.
+Callers which must not see data read before they arrived have to put what
+they already know into the key, e.g. the version of the data.
+
+Waiters keep their own deadline with `timeout`, and errors of the caller
+running the call rather than of the call itself, such as its deadline
+passing, are not shared with `retry_on`.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The caller running the call was cancelled, its waiters retry."""
+
+
+class SingleFlight:
+    """Share the result of concurrent calls with the same key."""
+
+    def __init__(self) -> None:
+        self._flights: dict[str, asyncio.Future] = {}
+        self.calls = 0
+        """Calls run."""
+        self.shared = 0
+        """Calls which got the result of another one instead of running."""
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+        retry_on: tuple[type[Exception], ...] = (),
+    ) -> T:
+        """Run `call`, or wait for the call of `key` already in flight.
+
+        The result, or the exception, of the call is given to all callers
+        which waited for it.
+
+        Args:
+            key (str): Identifies the call.
+            call (Callable[[], Awaitable[T]]): Runs the call.
+            timeout (Optional[float]): Seconds to wait for the call of
+                another caller, `TimeoutError` is raised past them.
+            retry_on (tuple[type[Exception], ...]): Exceptions of the call
+                which are the caller's own; its waiters run the call again
+                instead of getting them.
+        """
+        async with asyncio.timeout(timeout):
+            while key in self._flights:
+                self.shared += 1
+                try:
+                    # a waiter being cancelled must not cancel the call
+                    return await asyncio.shield(self._flights[key])
+                except _LeaderCancelled:
+                    # the next waiter to resume runs the call
+                    self.shared -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        # waiters may all be gone, the exception must not be reported as
+        # never retrieved then
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = future
+        self.calls += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except retry_on:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the counters as a dictionary."""
+        return {
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
@@ -0,0 +1,61 @@
+"""Stale responses served while the database fails.
+
+A read route tells, before it touches the database, where a stale copy of
+its response can be found:
+
+```python
+stale_if_error(request, lambda: fragments.get_stale(article_id, DETAIL))
+```
+
+If the database then fails, is unreachable or too slow, the exception
+handlers of `api.app` serve that copy instead of an error, marked as stale
+with a `Warning` and `Cache-Control: stale-if-error` (RFC 5861). Reads
+keep working through short outages, e.g. a failover of the primary, as
+long as their responses were cached recently.
+"""
+
+import math
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+
+STALE_WARNING = '111 - "Revalidation Failed"'
+
+StaleCopy = tuple[bytes, float]
+"""JSON of a response and its age in seconds."""
+
+
+def stale_if_error(
+    request: Request, load: Callable[[], Awaitable[Optional[StaleCopy]]]
+) -> None:
+    """Register how to load a stale copy of the response of a request."""
+    request.state.stale_if_error = load
+
+
+async def stale_response(
+    request: Request, max_stale: float
+) -> Optional[Response]:
+    """Get the stale copy of the response of a request, if there is one.
+
+    Args:
+        request (Request): The failed request.
+        max_stale (float): Seconds a copy may be served past its expiry,
+            advertised in `Cache-Control`.
+    """
+    load = getattr(request.state, "stale_if_error", None)
+    if load is None or max_stale <= 0:
+        return None
+    copy = await load()
+    if copy is None:
+        return None
+    content, age = copy
+    cache_control = f"max-age=0, stale-if-error={math.ceil(max_stale)}"
+    return Response(
+        content,
+        media_type="application/json",
+        headers={
+            "Age": str(math.floor(age)),
+            "Cache-Control": cache_control,
+            "Warning": STALE_WARNING,
+        },
+    )
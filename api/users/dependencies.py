@@ -1,11 +1,18 @@
 """Users' FastAPI DI definitions."""
 
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.dependencies import get_app_settings, get_db_session
+from api.cache import Cache
+from api.dependencies import (
+    get_app_settings,
+    get_db_session,
+    get_invalidation_bus,
+    get_shared_cache,
+)
+from api.invalidation import InvalidationBus
 from api.settings import Settings
 
 from .managers import PasswordManager, UserManager
@@ -22,10 +29,16 @@ async def get_password_manager(
 async def get_user_manager(
     session: Annotated[AsyncSession, Depends(get_db_session)],
     password_manager: Annotated[PasswordManager, Depends(get_password_manager)],
+    invalidation: Annotated[
+        Optional[InvalidationBus], Depends(get_invalidation_bus)
+    ],
+    cache: Annotated[Optional[Cache], Depends(get_shared_cache)],
 ):
     """DI Factory to build UserManager instance."""
     manager = UserManager(
         session=session,
         password_manager=password_manager,
+        invalidation=invalidation,
+        cache=cache,
     )
     return manager
@@ -1,12 +1,39 @@
 """User repository managers to operate on the DB."""
 
+import hashlib
+from typing import Optional
+
 from argon2 import PasswordHasher
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.cache import Cache
+from api.instrumentation import tag_queries
+from api.invalidation import InvalidationBus
+
 from .models import JwtDenylist, User
 
+# Built once, see `api.articles.managers` for the reasoning.
+_USER_BY_EMAIL_QUERY = select(User).where(User.email == bindparam("email"))
+_REVOKED_TOKEN_QUERY = select(JwtDenylist.jti).where(
+    JwtDenylist.jti == bindparam("token")
+)
+
+REVOKED_TOKENS_CACHE = "revoked_tokens"
+"""Cache of whether JWTs are revoked, keyed by `token_cache_key()`."""
+REVOKED_TOKEN_KEY = "revoked_token:{}"
+"""Shared cache key of a revoked JWT, by `token_cache_key()`.
+
+Only revocations are shared: they are final, so the entries never need to
+be invalidated.
+"""
+
+
+def token_cache_key(token: str) -> str:
+    """Key a token in caches by its hash, not to keep tokens in memory."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
 
 class PasswordManager:
     """Password manager to encrypt and decrypt the password string."""
@@ -34,19 +61,28 @@ class UserAlreadyExists(Exception):
         self.email = email
 
 
+@tag_queries
 class UserManager:
     """User repository manager to run main actions on users records."""
 
     session: AsyncSession
     password_manager: PasswordManager
+    invalidation: Optional[InvalidationBus]
+    cache: Optional[Cache]
 
     def __init__(
         self,
         session: AsyncSession,
         password_manager: PasswordManager,
+        invalidation: Optional[InvalidationBus] = None,
+        cache: Optional[Cache] = None,
     ):
         self.session = session
         self.password_manager = password_manager
+        # provides the caches, nothing is cached without it
+        self.invalidation = invalidation
+        # the cache shared with other nodes, for revoked tokens
+        self.cache = cache
 
     def set_password(self, user: User, password: str) -> None:
         """Set the user's password."""
@@ -82,8 +118,7 @@ class UserManager:
 
     async def get_user_by_email(self, email: str) -> User | None:
         """Get user by email."""
-        query = select(User).where(User.email == email)
-        res = await self.session.execute(query)
+        res = await self.session.execute(_USER_BY_EMAIL_QUERY, {"email": email})
         user = res.scalars().first()
         return user
 
@@ -93,11 +128,41 @@ class UserManager:
         """Add token to JWT denylist."""
         jwt_denylist = JwtDenylist(jti=token)
         self.session.add(jwt_denylist)
+        if self.invalidation is not None:
+            await self.invalidation.publish(
+                self.session, {REVOKED_TOKENS_CACHE: [token_cache_key(token)]}
+            )
         if commit:
             await self.session.commit()
+            await self._share_revocation(token)
+
+    async def _share_revocation(self, token: str) -> None:
+        if self.cache is not None:
+            key = REVOKED_TOKEN_KEY.format(token_cache_key(token))
+            await self.cache.set(key, b"1")
 
     async def is_token_revoked(self, token: str) -> bool:
         """Check if token is revoked."""
-        query = select(JwtDenylist).where(JwtDenylist.jti == token)
-        res = await self.session.execute(query)
-        return res.scalars().first() is not None
+        key = token_cache_key(token)
+        cache = None
+        if self.invalidation is not None:
+            cache = self.invalidation.cache(REVOKED_TOKENS_CACHE)
+            revoked = cache.get(key)
+            if revoked is not None:
+                return revoked
+            stamp = cache.stamp()
+
+        revoked = False
+        if self.cache is not None:
+            shared = await self.cache.get(REVOKED_TOKEN_KEY.format(key))
+            revoked = shared is not None
+        if not revoked:
+            res = await self.session.execute(
+                _REVOKED_TOKEN_QUERY, {"token": token}
+            )
+            revoked = res.scalars().first() is not None
+            if revoked:
+                await self._share_revocation(token)
+        if cache is not None:
+            cache.set(key, revoked, stamp=stamp)
+        return revoked
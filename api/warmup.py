@@ -0,0 +1,139 @@
+"""Startup warm-up.
+
+Work which otherwise happens lazily on the first requests after a deploy:
+opening pool connections, configuring the SQLAlchemy mappers, building the
+OpenAPI schema and, optionally, storing the JSON of the latest articles in
+the shared cache. It runs
+in the background from the lifespan; `/readyz` reports not ready until it
+finished, so no traffic is routed to a cold worker.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+
+from api.articles.fragments import DETAIL
+from api.articles.managers import ArticleManager
+from api.settings import WarmUpSettings
+
+logger = logging.getLogger(__name__)
+
+
+async def fill_pool(db_engine: AsyncEngine, connections: int) -> int:
+    """Open pool connections up front.
+
+    The connections are held all at once, so the pool opens a new one for
+    each of them, and then returned to the pool.
+
+    Args:
+        db_engine (AsyncEngine): The engine to warm up.
+        connections (int): Connections to open, at most the pool size.
+
+    Returns:
+        int: The number of connections opened, `0` for non-queue pools.
+    """
+    pool = db_engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+    connections = min(connections, pool.size())
+
+    results = await asyncio.gather(
+        *(db_engine.connect().start() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    await asyncio.gather(*(conn.close() for conn in opened))
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return len(opened)
+
+
+async def prime_caches(app: FastAPI, articles: int) -> int:
+    """Store the fragments of the latest articles, see `ArticleFragments`.
+
+    They are rendered by the database in a single query, whichever the
+    `DB_RENDER_JSON` setting: the JSON is the same byte for byte. The first
+    requests for these articles, alone or listed, only read their version.
+
+    Args:
+        app (FastAPI): The application.
+        articles (int): Number of latest articles to store.
+
+    Returns:
+        int: The number of articles stored, `0` without a shared cache.
+    """
+    fragments = app.state.article_fragments
+    if fragments.cache is None:
+        return 0
+    preview = app.state.settings.PAGINATION.comment_preview
+
+    async with app.state.db_read_session_maker() as session:
+        manager = ArticleManager(
+            session, fragments=fragments, like_buffer=app.state.like_buffer
+        )
+        versions = await manager.list_article_versions(limit=articles)
+        article_ids = [version.id for version in versions]
+        start = time.perf_counter()
+        rendered = await manager.get_articles_json(
+            article_ids, comments=preview
+        )
+        await fragments.set_many(
+            [(v, rendered[v.id]) for v in versions if v.id in rendered],
+            DETAIL,
+            delta=time.perf_counter() - start,
+        )
+    return len(versions)
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[Any]]) -> None:
+    started = time.perf_counter()
+    try:
+        result = await step()
+    except Exception:
+        # warm-up is an optimization, a failed step must not stop the app
+        logger.exception("Warm-up step %s failed", name)
+        return
+    logger.info(
+        "Warm-up step %s done in %.1f ms",
+        name,
+        (time.perf_counter() - started) * 1000,
+        extra={"warm_up_step": name, "warm_up_result": result},
+    )
+
+
+async def warm_up(app: FastAPI, settings: WarmUpSettings) -> None:
+    """Run the warm-up steps enabled in the settings."""
+
+    async def mappers() -> None:
+        configure_mappers()
+
+    async def pool() -> int:
+        connections = settings.pool_connections
+        if connections is None:
+            connections = app.state.settings.DB_POOL.size
+        engines = [app.state.db_engine, app.state.db_replica_engine]
+        opened = await asyncio.gather(
+            *(fill_pool(e, connections) for e in engines if e is not None)
+        )
+        return sum(opened)
+
+    async def openapi() -> None:
+        # FastAPI keeps the schema once built
+        app.openapi()
+
+    async def caches() -> int:
+        return await prime_caches(app, settings.prime_articles)
+
+    await _run_step("mappers", mappers)
+    await _run_step("pool", pool)
+    if settings.openapi:
+        await _run_step("openapi", openapi)
+    if settings.prime_caches:
+        await _run_step("caches", caches)
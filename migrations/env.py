@@ -20,7 +20,8 @@ config.set_main_option("sqlalchemy.url", app_settings.get_db_url())
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # keep loggers of the app alive when migrations run in-process (tests)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
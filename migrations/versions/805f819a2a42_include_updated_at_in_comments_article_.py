@@ -0,0 +1,31 @@
+"""include updated_at in comments article_id index
+
+Revision ID: 805f819a2a42
+Revises: cf922a7617db
+Create Date: 2026-10-17 03:47:15.599537
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '805f819a2a42'
+down_revision: Union[str, None] = 'cf922a7617db'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the comment stats of the article versions are read from the index only
+    op.drop_index('ix_comments_article_id_created_at_id', table_name='comments')
+    op.create_index('ix_comments_article_id_created_at_id', 'comments', ['article_id', 'created_at', 'id'], unique=False, postgresql_include=['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_article_id_created_at_id', table_name='comments')
+    op.create_index('ix_comments_article_id_created_at_id', 'comments', ['article_id', 'created_at', 'id'], unique=False)
@@ -0,0 +1,18 @@
+from typing import AsyncGenerator
+
+import pytest
+
+from tests._fixtures.fake_redis import FakeRedisServer
+
+__all__ = [
+    "fake_redis",
+]
+
+
+@pytest.fixture
+async def fake_redis() -> AsyncGenerator[FakeRedisServer, None]:
+    """Start an in-memory Redis protocol server."""
+    server = FakeRedisServer()
+    await server.start()
+    yield server
+    await server.stop()
@@ -0,0 +1,11 @@
+"""A clock the tests move by hand, for the classes taking a `clock`."""
+
+
+class FakeClock:
+    """Returns `now`, which only changes when a test sets it."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,146 @@
+"""In-memory Redis protocol server, to test `RedisBackend` without Redis.
+
+It serves the commands the backend uses, from a plain dictionary, on a
+local port:
+
+```python
+server = FakeRedisServer()
+await server.start()
+backend = RedisBackend(server.host, server.port)
+...
+await server.stop()
+```
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+from tests._fixtures.resp import (
+    ProtocolError,
+    RespError,
+    encode_reply,
+    read_reply,
+)
+
+
+class FakeRedisServer:
+    """Redis protocol server keeping the keys in memory."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.host = host
+        self.port = port
+        """The port to listen on, the one picked if `0` once started."""
+        self.commands: list[str] = []
+        """Names of the commands received, in order, but the `CLIENT`
+        commands clients send when connecting.
+        """
+        self.failing: set[str] = set()
+        """Names of the commands answered with an error."""
+        self._clock = clock
+        self._data: dict[bytes, tuple[Optional[float], bytes]] = {}
+        self._server: Optional[asyncio.Server] = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(
+            self._serve, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and close all connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    raise ProtocolError(f"Not a command: {command!r}")
+                writer.write(encode_reply(self._execute(command)))
+                await writer.drain()
+        except (EOFError, ConnectionError, ProtocolError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _execute(self, command: list[bytes]) -> Any:
+        name, args = command[0].decode().upper(), command[1:]
+        if name != "CLIENT":
+            self.commands.append(name)
+        if name in self.failing:
+            return RespError(f"ERR {name} failed")
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{name}'")
+        try:
+            return handler(*args)
+        except (TypeError, ValueError):
+            return RespError(f"ERR wrong arguments for '{name}'")
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= self._clock():
+            del self._data[key]
+            return None
+        return entry[1]
+
+    def _cmd_ping(self) -> str:
+        return "PONG"
+
+    def _cmd_client(self, *args: bytes) -> str:
+        return "OK"
+
+    def _cmd_select(self, db: bytes) -> str:
+        int(db)
+        return "OK"
+
+    def _cmd_get(self, key: bytes) -> Optional[bytes]:
+        return self._get(key)
+
+    def _cmd_mget(self, *keys: bytes) -> list[Optional[bytes]]:
+        if not keys:
+            raise TypeError()
+        return [self._get(key) for key in keys]
+
+    def _cmd_set(self, key: bytes, value: bytes, *options: bytes) -> str:
+        expires = None
+        if options:
+            if len(options) != 2 or options[0].upper() not in (b"EX", b"PX"):
+                raise ValueError()
+            amount = int(options[1])
+            seconds = amount if options[0].upper() == b"EX" else amount / 1000
+            expires = self._clock() + seconds
+        self._data[key] = (expires, value)
+        return "OK"
+
+    def _cmd_del(self, *keys: bytes) -> int:
+        if not keys:
+            raise TypeError()
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def _cmd_flushall(self) -> str:
+        self._data.clear()
+        return "OK"
@@ -0,0 +1,96 @@
+import contextlib
+from collections import Counter
+from typing import Callable, ContextManager, Iterator
+
+import fastapi
+import pytest
+from sqlalchemy import event
+
+__all__ = [
+    "query_budget",
+]
+
+
+class QueryRecorder:
+    """Record statements sent to the database."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        self.statements.append(statement)
+
+    def repeated(self) -> dict[str, int]:
+        """Statements which were run more than once, with their count.
+
+        Parameters are sent apart from the SQL, so the same query shape
+        always has the same SQL string.
+        """
+        return {
+            statement: count
+            for statement, count in Counter(self.statements).items()
+            if count > 1
+        }
+
+    def describe(self) -> str:
+        """List the recorded statements for a failure message."""
+        return "\n".join(
+            f"  {i}. {statement}"
+            for i, statement in enumerate(self.statements, start=1)
+        )
+
+
+@pytest.fixture
+def query_budget(
+    app_instance: fastapi.FastAPI,
+) -> Callable[..., ContextManager[QueryRecorder]]:
+    """Fail the test when a block runs more statements than budgeted.
+
+    Usage example:
+
+    ```python
+    async def test_list(api_client, query_budget):
+        with query_budget(max_queries=2):
+            await api_client.get("/api/articles")
+    ```
+
+    `max_repeated` limits how many times the same statement may run,
+    which is what an N+1 pattern looks like.
+    """
+    engine = app_instance.state.db_engine.sync_engine
+
+    @contextlib.contextmanager
+    def _budget(
+        max_queries: int, max_repeated: int = 1
+    ) -> Iterator[QueryRecorder]:
+        recorder = QueryRecorder()
+        event.listen(engine, "before_cursor_execute", recorder)
+        try:
+            yield recorder
+        finally:
+            event.remove(engine, "before_cursor_execute", recorder)
+
+        if len(recorder.statements) > max_queries:
+            pytest.fail(
+                f"Expected at most {max_queries} queries, "
+                f"{len(recorder.statements)} were run:\n"
+                f"{recorder.describe()}"
+            )
+        over_repeated = {
+            statement: count
+            for statement, count in recorder.repeated().items()
+            if count > max_repeated
+        }
+        if over_repeated:
+            pytest.fail(
+                f"Expected a query to run at most {max_repeated} times, "
+                f"repeated queries:\n"
+                + "\n".join(
+                    f"  {count}x {statement}"
+                    for statement, count in over_repeated.items()
+                )
+            )
+
+    return _budget
@@ -0,0 +1,93 @@
+"""Redis serialization protocol (RESP2).
+
+Just what `FakeRedisServer` needs: commands are arrays of bulk strings,
+replies are simple strings, errors, integers, bulk strings and arrays of
+those.
+"""
+
+import asyncio
+from typing import Any, Union
+
+CRLF = b"\r\n"
+
+Arg = Union[str, bytes, int, float]
+
+
+class ProtocolError(Exception):
+    """The peer sent something which is not RESP."""
+
+
+class RespError(Exception):
+    """An error reply, like `ERR unknown command`.
+
+    Replies are parsed into instances of it rather than raising it, so all
+    replies of a pipeline are read even if some of them are errors.
+    """
+
+
+def _to_bytes(arg: Arg) -> bytes:
+    if isinstance(arg, bytes):
+        return arg
+    return str(arg).encode()
+
+
+def encode_command(*args: Arg) -> bytes:
+    """Encode a command, e.g. `encode_command("GET", "key")`."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = _to_bytes(arg)
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def encode_reply(value: Any) -> bytes:
+    """Encode a reply.
+
+    `str` is sent as a simple string, `bytes` as a bulk string, `None` as
+    the null bulk string and `RespError` as an error.
+    """
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, bool) or not isinstance(value, (int, bytes, list)):
+        raise TypeError(f"Can't encode {type(value).__name__} in RESP")
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(encode_reply(v) for v in value)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read a reply, or a command, which is an array of bulk strings.
+
+    Raises:
+        ProtocolError: The data is not RESP.
+        asyncio.IncompleteReadError: The connection closed.
+    """
+    line = await reader.readuntil(CRLF)
+    prefix, rest = line[:1], line[1:-2]
+    try:
+        if prefix == b"+":
+            return rest.decode()
+        if prefix == b"-":
+            return RespError(rest.decode())
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [await read_reply(reader) for _ in range(length)]
+    except ValueError:
+        raise ProtocolError(f"Malformed line: {line!r}") from None
+    raise ProtocolError(f"Unknown reply type: {line!r}")
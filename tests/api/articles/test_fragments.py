@@ -0,0 +1,237 @@
+import asyncio
+import time
+from collections import namedtuple
+
+import pytest
+
+from api.articles.fragments import (
+    DETAIL,
+    ArticleFragments,
+    fragment_key,
+    page_key,
+)
+from api.cache import Cache, MemoryBackend
+from api.deadlines import DeadlineExceeded
+from api.singleflight import SingleFlight
+
+Version = namedtuple("Version", "id updated_at likes")
+
+
+async def test_fragments_of_other_versions_miss():
+    fragments = ArticleFragments(Cache(MemoryBackend()))
+    await fragments.set_many([(Version(1, "t1", 0), b'{"id":1}')], DETAIL)
+
+    assert await fragments.get_many([Version(1, "t1", 0)], DETAIL) == {
+        1: b'{"id":1}'
+    }
+    assert await fragments.get_many([Version(1, "t1", 0)], "other") == {}
+    assert await fragments.get_many([Version(1, "t1", 1)], DETAIL) == {}
+
+
+async def test_fragments_batched():
+    cache = Cache(MemoryBackend())
+    fragments = ArticleFragments(cache)
+    versions = [Version(i, "t1", 0) for i in range(1, 4)]
+    await fragments.set_many(
+        [(v, b'{"id":%d}' % v.id) for v in versions[:2]], DETAIL
+    )
+
+    assert await fragments.get_many(versions, DETAIL) == {
+        1: b'{"id":1}',
+        2: b'{"id":2}',
+    }
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+async def test_fragments_deleted_by_article():
+    cache = Cache(MemoryBackend())
+    fragments = ArticleFragments(cache)
+    version = Version(1, "t1", 0)
+    await fragments.set_many([(version, b"{}")], DETAIL)
+
+    await fragments.delete(1)
+
+    assert await cache.get(fragment_key(1, DETAIL)) is None
+
+
+async def test_fragments_without_cache():
+    fragments = ArticleFragments(None)
+    version = Version(1, "t1", 0)
+    await fragments.set_many([(version, b"{}")], DETAIL)
+
+    assert await fragments.get_many([version], DETAIL) == {}
+
+
+async def test_fragments_refreshed_before_they_expire():
+    now = 1000.0
+    cache = Cache(MemoryBackend(), default_ttl=60)
+    fragments = ArticleFragments(cache, clock=lambda: now)
+    version = Version(1, "t1", 0)
+    await fragments.set_many([(version, b"{}")], DETAIL, delta=0.01)
+
+    assert await fragments.get_many([version], DETAIL) == {1: b"{}"}
+    # a build taking as long as the TTL is always due for a refresh
+    await fragments.set_many([(version, b"{}")], DETAIL, delta=60_000)
+    assert await fragments.get_many([version], DETAIL) == {}
+
+
+async def test_fragments_without_early_refresh():
+    cache = Cache(MemoryBackend(), default_ttl=60)
+    fragments = ArticleFragments(cache, early_refresh_beta=0)
+    version = Version(1, "t1", 0)
+    await fragments.set_many([(version, b"{}")], DETAIL, delta=60_000)
+
+    assert await fragments.get_many([version], DETAIL) == {1: b"{}"}
+
+
+async def test_fragment_builds_coalesced():
+    fragments = ArticleFragments(
+        Cache(MemoryBackend()), single_flight=SingleFlight()
+    )
+    version = Version(1, "t1", 0)
+    builds = 0
+
+    async def build():
+        nonlocal builds
+        builds += 1
+        await asyncio.sleep(0.01)
+        return b'{"id":1}'
+
+    results = await asyncio.gather(
+        *(fragments.get_or_build(version, DETAIL, build) for _ in range(10))
+    )
+
+    assert results == [b'{"id":1}'] * 10
+    assert builds == 1
+    # later calls hit the cache
+    assert await fragments.get_or_build(version, DETAIL, build) == (b'{"id":1}')
+    assert builds == 1
+
+
+async def test_fragment_builds_of_other_versions_not_coalesced():
+    fragments = ArticleFragments(
+        Cache(MemoryBackend()), single_flight=SingleFlight()
+    )
+
+    async def build(data):
+        await asyncio.sleep(0.01)
+        return data
+
+    results = await asyncio.gather(
+        fragments.get_or_build(
+            Version(1, "t1", 0), DETAIL, lambda: build(b"old")
+        ),
+        fragments.get_or_build(
+            Version(1, "t2", 0), DETAIL, lambda: build(b"new")
+        ),
+    )
+
+    assert results == [b"old", b"new"]
+
+
+async def test_version_reads_coalesced_until_a_write():
+    fragments = ArticleFragments(None, single_flight=SingleFlight())
+    reads = 0
+
+    async def read():
+        nonlocal reads
+        reads += 1
+        await asyncio.sleep(0.01)
+        return reads
+
+    first = asyncio.gather(
+        *(fragments.coalesce_read("version:1", read) for _ in range(5))
+    )
+    await asyncio.sleep(0)
+    # readers arriving after a write wait for a read of their own
+    fragments.written()
+    second = fragments.coalesce_read("version:1", read)
+
+    assert await first == [1] * 5
+    assert await second == 2
+    assert reads == 2
+
+
+async def test_version_reads_keep_the_deadline_of_each_caller():
+    fragments = ArticleFragments(None, single_flight=SingleFlight())
+    release = asyncio.Event()
+    reads = 0
+
+    async def read():
+        nonlocal reads
+        reads += 1
+        await release.wait()
+        if reads == 1:
+            # the statement of the first caller hit its deadline
+            raise DeadlineExceeded()
+        await asyncio.sleep(0.01)
+        return reads
+
+    first = asyncio.create_task(fragments.coalesce_read("version:1", read))
+    await asyncio.sleep(0)
+    late = fragments.coalesce_read("version:1", read, time.monotonic())
+    others = asyncio.gather(
+        *(
+            fragments.coalesce_read("version:1", read, time.monotonic() + 5)
+            for _ in range(3)
+        )
+    )
+    with pytest.raises(DeadlineExceeded):
+        await late
+    release.set()
+
+    with pytest.raises(DeadlineExceeded):
+        await first
+    assert await others == [2] * 3
+    assert reads == 2
+
+
+async def test_stale_fragments_kept_past_their_expiry():
+    now = 1000.0
+    cache = Cache(MemoryBackend(), default_ttl=60)
+    fragments = ArticleFragments(
+        cache, early_refresh_beta=0, stale_if_error=30, clock=lambda: now
+    )
+    version = Version(1, "t1", 0)
+    await fragments.set_many([(version, b"{}")], DETAIL)
+    await fragments.set_page(page_key(20, None), b"[{}]", '"e1"')
+
+    now = 1060.0
+    assert await fragments.get_many([version], DETAIL) == {}
+    assert await fragments.get_stale(fragment_key(1, DETAIL)) == (b"{}", 60)
+    assert await fragments.get_stale(page_key(20, None)) == (b"[{}]", 60)
+    assert fragments.stale_served == 2
+
+    now = 1090.5
+    assert await fragments.get_stale(fragment_key(1, DETAIL)) is None
+    assert fragments.stale_served == 2
+
+
+async def test_no_stale_fragments_by_default():
+    fragments = ArticleFragments(Cache(MemoryBackend()))
+    await fragments.set_many([(Version(1, "t1", 0), b"{}")], DETAIL)
+
+    assert await fragments.get_stale(fragment_key(1, DETAIL)) is None
+
+
+async def test_pages_written_once_per_etag():
+    now = 1000.0
+    fragments = ArticleFragments(
+        Cache(MemoryBackend(), default_ttl=60),
+        stale_if_error=30,
+        clock=lambda: now,
+    )
+    key = page_key(20, None)
+    await fragments.set_page(key, b"[1]", '"e1"')
+
+    now = 1010.0
+    await fragments.set_page(key, b"[1]", '"e1"')
+    assert await fragments.get_stale(key) == (b"[1]", 10)
+
+    await fragments.set_page(key, b"[2]", '"e2"')
+    assert await fragments.get_stale(key) == (b"[2]", 0)
+
+    # written again before the copy expires
+    now = 1070.0
+    await fragments.set_page(key, b"[2]", '"e2"')
+    assert await fragments.get_stale(key) == (b"[2]", 0)
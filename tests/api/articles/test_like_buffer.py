@@ -0,0 +1,218 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from api.articles.like_buffer import LikeBuffer
+from api.articles.managers import ArticleManager
+from api.articles.models import Like
+from api.db import async_session_maker
+
+
+def _buffer(db_session, **kwargs) -> LikeBuffer:
+    # sessions on the connection of the test, rolled back with it
+    return LikeBuffer(async_session_maker(db_session.bind), **kwargs)
+
+
+async def _counts(db_session, article_id: int):
+    res = await db_session.execute(
+        select(Like.likes, Like.dislikes).where(
+            Like.likeable_type == "Article", Like.likeable_id == article_id
+        )
+    )
+    return res.first()
+
+
+async def test_pending_deltas_are_merged():
+    buffer = LikeBuffer(None)
+
+    buffer.add("Article", 1, likes=1)
+    buffer.add("Article", 1, likes=1)
+    buffer.add("Article", 1, dislikes=1)
+    buffer.add("Comment", 1, likes=1)
+
+    assert buffer.pending("Article", 1) == (2, 1)
+    assert buffer.pending("Article", 2) == (0, 0)
+    assert buffer.merge("Article", 1, (5, 5)) == (7, 6)
+    assert len(buffer) == 2
+
+
+@pytest.mark.integration
+async def test_flush_writes_all_deltas_at_once(db_session, query_budget):
+    manager = ArticleManager(db_session)
+    liked = await manager.create_article("Liked")
+    new = await manager.create_article("New")
+    db_session.add(Like(likeable_type="Article", likeable_id=liked.id, likes=5))
+    await db_session.commit()
+    buffer = _buffer(db_session)
+    for _ in range(3):
+        buffer.add("Article", liked.id, likes=1)
+        buffer.add("Article", new.id, dislikes=1)
+
+    with query_budget(max_queries=1):
+        assert await buffer.flush() == 2
+
+    assert tuple(await _counts(db_session, liked.id)) == (8, 0)
+    assert tuple(await _counts(db_session, new.id)) == (0, 3)
+    assert buffer.pending("Article", liked.id) == (0, 0)
+    assert buffer.as_dict() == {"pending": 0, "flushes": 1, "errors": 0}
+    assert await buffer.flush() == 0
+
+
+async def test_failed_flush_puts_deltas_back():
+    def session_maker():
+        raise ConnectionRefusedError()
+
+    buffer = LikeBuffer(session_maker)
+    buffer.add("Article", 1, likes=2)
+
+    assert await buffer.flush() == 0
+
+    assert buffer.pending("Article", 1) == (2, 0)
+    assert buffer.as_dict() == {"pending": 1, "flushes": 0, "errors": 1}
+
+
+class _FakeSession:
+    """Commits the deltas of the flush statement into `counts`."""
+
+    def __init__(self, counts, committing):
+        self.counts = counts
+        self.committing = committing
+        self.deltas = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def execute(self, _statement, params):
+        self.deltas = params
+
+    async def commit(self):
+        await self.committing.wait()
+        for likeable_id, likes in zip(
+            self.deltas["likeable_ids"], self.deltas["likes"], strict=True
+        ):
+            self.counts[likeable_id] = self.counts.get(likeable_id, 0) + likes
+
+
+async def test_reads_racing_a_flush_are_run_again():
+    counts = {1: 5}
+    committing = asyncio.Event()
+    buffer = LikeBuffer(lambda: _FakeSession(counts, committing))
+    buffer.add("Article", 1, likes=2)
+    started = asyncio.Event()
+    generations = []
+
+    async def read(generation):
+        generations.append(generation)
+        snapshot = counts.get(1, 0)
+        started.set()
+        await asyncio.sleep(0.01)
+        return snapshot
+
+    def merge(likes):
+        return buffer.merge("Article", 1, (likes, 0))
+
+    reading = asyncio.create_task(buffer.read(read, merge))
+    await started.wait()
+    flushing = asyncio.create_task(buffer.flush())
+    await asyncio.sleep(0)
+    # reads wait for the commit to finish
+    blocked = asyncio.create_task(buffer.read(read, merge))
+    committing.set()
+
+    assert await flushing == 1
+    assert await reading == (7, 0)
+    assert await blocked == (7, 0)
+    # the first read saw the counts before the commit, and the buffer after
+    assert generations == [0, 2, 2]
+    assert buffer.generation == 2
+
+
+@pytest.mark.integration
+async def test_flush_skips_deleted_articles(db_session):
+    manager = ArticleManager(db_session)
+    kept = await manager.create_article("Kept")
+    deleted = await manager.create_article("Deleted")
+    buffer = _buffer(db_session)
+    buffer.add("Article", kept.id, likes=1)
+    buffer.add("Article", deleted.id, likes=1)
+    buffer.add("Comment", 999999, likes=1)
+    await manager.delete_article(deleted)
+
+    assert await buffer.flush() == 3
+
+    assert tuple(await _counts(db_session, kept.id)) == (1, 0)
+    assert await _counts(db_session, deleted.id) is None
+    assert len(buffer) == 0
+
+
+@pytest.mark.integration
+async def test_buffer_flushes_in_background_and_on_stop(db_session):
+    article = await ArticleManager(db_session).create_article("Liked")
+    buffer = _buffer(db_session, flush_interval=0.01)
+    await buffer.start()
+
+    buffer.add("Article", article.id, likes=1)
+    while not buffer.flushes:
+        await asyncio.sleep(0.01)
+    buffer.add("Article", article.id, likes=1)
+    buffer.flush_interval = 3600
+    await buffer.stop()
+
+    assert tuple(await _counts(db_session, article.id)) == (2, 0)
+    assert len(buffer) == 0
+
+
+@pytest.mark.integration
+async def test_buffered_likes_are_served_before_flush(
+    api_client: AsyncClient, app_instance, db_session
+):
+    payload = {"article": {"title": "Liked", "description": "desc"}}
+    article_id = (await api_client.post("/api/articles", json=payload)).json()[
+        "id"
+    ]
+    url = f"/api/articles/{article_id}"
+    etag = (await api_client.get(url)).headers["ETag"]
+    buffer = _buffer(db_session)
+    app_instance.state.like_buffer = buffer
+    try:
+        await api_client.post(f"{url}/like")
+        last = await api_client.post(f"{url}/dislike")
+        missing = await api_client.post("/api/articles/999999/like")
+
+        assert last.json() == {"article_likes": 1, "article_dislikes": 1}
+        assert missing.status_code == 404
+        assert await _counts(db_session, article_id) is None
+        detail = await api_client.get(url)
+        assert detail.headers["ETag"] != etag
+        assert detail.json()["article_likes"] == 1
+        articles = (await api_client.get("/api/articles")).json()
+        found = next(a for a in articles if a["id"] == article_id)
+        assert (found["article_likes"], found["article_dislikes"]) == (1, 1)
+
+        await buffer.flush()
+
+        assert tuple(await _counts(db_session, article_id)) == (1, 1)
+        detail = await api_client.get(url)
+        assert detail.json()["article_dislikes"] == 1
+    finally:
+        app_instance.state.like_buffer = None
+
+
+@pytest.mark.integration
+async def test_rendered_json_merges_buffered_likes(db_session):
+    buffer = LikeBuffer(None)
+    manager = ArticleManager(db_session, like_buffer=buffer)
+    article = await manager.create_article("Liked")
+    buffer.add("Article", article.id, likes=2, dislikes=1)
+
+    rendered = await manager.get_articles_json([article.id, 999999])
+
+    assert list(rendered) == [article.id]
+    data = json.loads(rendered[article.id])
+    assert (data["article_likes"], data["article_dislikes"]) == (2, 1)
@@ -1,7 +1,13 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, select
 
-from api.articles.models import Like
+from api.articles.managers import ArticleManager
+from api.articles.models import Article, Like
+from api.db import async_session_maker, create_engine
+from api.settings import DbPoolSettings
 
 
 @pytest.mark.integration
@@ -73,3 +79,79 @@ async def test_article_likes_dislikes_default_zero(api_client: AsyncClient):
     assert found is not None
     assert found["article_likes"] == 0
     assert found["article_dislikes"] == 0
+
+
+@pytest.mark.integration
+async def test_like_and_dislike_article(api_client: AsyncClient):
+    payload = {"article": {"title": "Liked", "description": "desc"}}
+    article_id = (await api_client.post("/api/articles", json=payload)).json()[
+        "id"
+    ]
+    url = f"/api/articles/{article_id}"
+
+    first = await api_client.post(f"{url}/like")
+    await api_client.post(f"{url}/like")
+    last = await api_client.post(f"{url}/dislike")
+
+    assert first.status_code == 200
+    assert first.json() == {"article_likes": 1, "article_dislikes": 0}
+    assert last.json() == {"article_likes": 2, "article_dislikes": 1}
+    data = (await api_client.get(url)).json()
+    assert (data["article_likes"], data["article_dislikes"]) == (2, 1)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("action", ["like", "dislike"])
+async def test_like_missing_article(
+    api_client: AsyncClient, db_session, action
+):
+    resp = await api_client.post(f"/api/articles/999999/{action}")
+
+    assert resp.status_code == 404
+    # no counters are created for missing articles
+    query = select(Like.id).where(Like.likeable_id == 999999)
+    assert (await db_session.execute(query)).first() is None
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("likes, dislikes", [(800, 200), (4000, 1000)])
+async def test_concurrent_likes_are_not_lost(app_instance, likes, dislikes):
+    # real transactions on their own connections, unlike `api_client`
+    engine = create_engine(
+        app_instance.state.settings.get_db_url(),
+        pool=DbPoolSettings(size=20, max_overflow=0, pre_ping=False),
+    )
+    session_class = async_session_maker(engine)
+    async with session_class() as session:
+        article = await ArticleManager(session).create_article("Popular")
+        article_id = article.id
+
+    async def add_like(dislike: bool) -> None:
+        async with session_class() as session:
+            await ArticleManager(session).add_article_like(
+                article_id, dislike=dislike
+            )
+
+    try:
+        await asyncio.gather(
+            *(add_like(False) for _ in range(likes)),
+            *(add_like(True) for _ in range(dislikes)),
+        )
+        async with session_class() as session:
+            version = await ArticleManager(session).get_article_version(
+                article_id
+            )
+        assert (version.likes, version.dislikes) == (likes, dislikes)
+    finally:
+        async with session_class() as session:
+            await session.execute(
+                delete(Like).where(
+                    Like.likeable_type == "Article",
+                    Like.likeable_id == article_id,
+                )
+            )
+            await session.execute(
+                delete(Article).where(Article.id == article_id)
+            )
+            await session.commit()
+        await engine.dispose()
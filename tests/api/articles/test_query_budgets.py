@@ -0,0 +1,305 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from api.articles.fragments import ArticleFragments
+from api.articles.managers import ArticleManager
+from api.articles.models import Comment, Like
+from api.db import async_session_maker, create_engine
+from api.singleflight import SingleFlight
+
+
+@pytest.fixture
+async def articles_with_comments(api_client: AsyncClient, db_session):
+    """Create a few articles, each one with comments and likes."""
+    article_ids = []
+    for i in range(3):
+        payload = {
+            "article": {
+                "title": f"Budget {i}",
+                "short_description": "desc",
+                "description": "desc",
+            }
+        }
+        resp = await api_client.post("/api/articles", json=payload)
+        article_id = resp.json()["id"]
+        article_ids.append(article_id)
+        db_session.add_all(
+            [
+                Comment(article_id=article_id, content="first"),
+                Comment(article_id=article_id, content="second"),
+                Like(likeable_type="Article", likeable_id=article_id, likes=i),
+            ]
+        )
+    await db_session.commit()
+    return article_ids
+
+
+@pytest.mark.integration
+async def test_create_article_query_budget(
+    api_client: AsyncClient, query_budget
+):
+    payload = {"article": {"title": "Budget", "description": "desc"}}
+
+    with query_budget(max_queries=2):
+        resp = await api_client.post("/api/articles", json=payload)
+
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+async def test_create_articles_in_bulk_query_budget(
+    api_client: AsyncClient, query_budget
+):
+    articles = [{"title": f"Bulk {i}"} for i in range(20)]
+
+    # a single INSERT ... RETURNING, whatever the number of articles
+    with query_budget(max_queries=1):
+        resp = await api_client.post(
+            "/api/articles/bulk", json={"articles": articles}
+        )
+
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 20
+
+
+@pytest.mark.integration
+async def test_get_article_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    # the version with the likes, the article, its comment preview
+    with query_budget(max_queries=3):
+        resp = await api_client.get(
+            f"/api/articles/{articles_with_comments[0]}"
+        )
+
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+async def test_list_articles_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    # the number of queries must not grow with the number of articles:
+    # the versions with the likes, the articles, their comment previews
+    with query_budget(max_queries=3):
+        resp = await api_client.get("/api/articles")
+
+    assert resp.status_code == 200
+    assert len(resp.json()) >= len(articles_with_comments)
+
+
+@pytest.mark.integration
+async def test_list_articles_page_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    # the versions with the likes, the articles, their comment previews
+    with query_budget(max_queries=3):
+        resp = await api_client.get("/api/articles", params={"limit": 2})
+
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 2
+
+
+@pytest.mark.integration
+async def test_list_articles_sparse_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    params = {"limit": 2, "fields": "title,short_description"}
+
+    # versions, articles
+    with query_budget(max_queries=2) as recorder:
+        resp = await api_client.get("/api/articles", params=params)
+
+    assert resp.status_code == 200
+    (statement,) = [
+        s
+        for s in recorder.statements
+        if "ArticleManager.get_articles_by_ids" in s
+    ]
+    # neither the article text nor the comments are read
+    assert "articles.description" not in statement
+    assert "comments" not in statement
+
+
+@pytest.mark.integration
+async def test_update_article_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    payload = {"article": {"title": "Updated", "description": "desc"}}
+
+    # select, comment preview, update
+    with query_budget(max_queries=3):
+        resp = await api_client.put(
+            f"/api/articles/{articles_with_comments[0]}", json=payload
+        )
+
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+async def test_delete_article_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    # select, delete; comments are deleted by the database cascade
+    with query_budget(max_queries=2):
+        resp = await api_client.delete(
+            f"/api/articles/{articles_with_comments[0]}"
+        )
+
+    assert resp.status_code == 204
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("action", ["like", "dislike"])
+async def test_like_article_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget, action
+):
+    # the upsert alone
+    with query_budget(max_queries=1):
+        resp = await api_client.post(
+            f"/api/articles/{articles_with_comments[0]}/{action}"
+        )
+
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+async def test_list_comments_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    with query_budget(max_queries=1):
+        resp = await api_client.get(
+            f"/api/articles/{articles_with_comments[0]}/comments"
+        )
+
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 2
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "url", ["/api/articles/{id}", "/api/articles", "/api/articles?limit=2"]
+)
+async def test_rendered_json_query_budget(
+    api_client: AsyncClient,
+    app_instance,
+    articles_with_comments,
+    query_budget,
+    url,
+):
+    url = url.format(id=articles_with_comments[0])
+    settings = app_instance.state.settings
+    settings.DB_RENDER_JSON = True
+    try:
+        # versions, then the JSON of the articles with their comments
+        with query_budget(max_queries=2) as recorder:
+            resp = await api_client.get(url)
+    finally:
+        settings.DB_RENDER_JSON = False
+
+    assert resp.status_code == 200
+    assert "ArticleManager.get_articles_json" in recorder.statements[-1]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "url", ["/api/articles/{id}", "/api/articles", "/api/articles?limit=2"]
+)
+async def test_not_modified_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget, url
+):
+    url = url.format(id=articles_with_comments[0])
+    etag = (await api_client.get(url)).headers["etag"]
+
+    with query_budget(max_queries=1):
+        resp = await api_client.get(url, headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "url", ["/api/articles/{id}", "/api/articles", "/api/articles?limit=2"]
+)
+async def test_cached_fragments_query_budget(
+    api_client: AsyncClient, articles_with_comments, query_budget, url
+):
+    url = url.format(id=articles_with_comments[0])
+    first = await api_client.get(url)
+
+    # only the versions are read, the JSON comes from the cache
+    with query_budget(max_queries=1):
+        resp = await api_client.get(url)
+
+    assert resp.status_code == 200
+    assert resp.content == first.content
+
+
+@pytest.mark.integration
+async def test_concurrent_reads_share_one_build(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    url = f"/api/articles/{articles_with_comments[0]}"
+
+    with query_budget(max_queries=3) as recorder:
+        responses = await asyncio.gather(
+            *(api_client.get(url) for _ in range(10))
+        )
+
+    assert all(resp.status_code == 200 for resp in responses)
+    assert len({resp.content for resp in responses}) == 1
+    # the version is read once, and so is the article
+    for method in ("get_article_version", "get_article_by_id"):
+        reads = [
+            s for s in recorder.statements if f"ArticleManager.{method}" in s
+        ]
+        assert len(reads) == 1, recorder.describe()
+
+
+@pytest.mark.integration
+async def test_concurrent_list_reads_share_one_version_query(
+    api_client: AsyncClient, articles_with_comments, query_budget
+):
+    await api_client.get("/api/articles?limit=2")
+
+    # the fragments are cached, only the versions are read, once
+    with query_budget(max_queries=1):
+        responses = await asyncio.gather(
+            *(api_client.get("/api/articles?limit=2") for _ in range(10))
+        )
+
+    assert all(resp.status_code == 200 for resp in responses)
+    assert len({resp.content for resp in responses}) == 1
+
+
+@pytest.mark.integration
+async def test_reads_of_other_databases_are_not_coalesced(app_instance):
+    primary = app_instance.state.db_engine
+    # another URL of the same database stands in for a replica
+    replica = create_engine(primary.url.set(host="127.0.0.1"))
+    fragments = ArticleFragments(None, single_flight=SingleFlight())
+    try:
+        async with (
+            async_session_maker(primary)() as first,
+            async_session_maker(primary)() as second,
+            async_session_maker(replica)() as third,
+        ):
+
+            async def read_versions(*sessions):
+                await asyncio.gather(
+                    *(
+                        ArticleManager(
+                            s, fragments=fragments
+                        ).get_article_version(1)
+                        for s in sessions
+                    )
+                )
+
+            await read_versions(first, second)
+            assert fragments.single_flight.calls == 1
+            await read_versions(first, third)
+            assert fragments.single_flight.calls == 3
+    finally:
+        await replica.dispose()
@@ -0,0 +1,135 @@
+import pytest
+from sqlalchemy import func, select
+
+from api.articles.managers import ArticleManager
+from api.articles.models import Article
+from tests.plan_helpers import (
+    COMMENTS_PER_ARTICLE,
+    assert_estimated_rows,
+    assert_index_only_scan,
+    assert_no_seq_scan,
+    assert_uses_index,
+    explain_calls,
+)
+
+pytestmark = pytest.mark.query_plan
+
+BIG_TABLES = ("articles", "comments", "likes")
+
+
+@pytest.fixture
+async def article_ids(plan_session) -> list[int]:
+    """IDs of a few seeded articles from the middle of the table."""
+    max_id = (await plan_session.execute(select(func.max(Article.id)))).scalar()
+    return list(range(max_id // 2, max_id // 2 + 20))
+
+
+async def test_get_article_by_id_plan(plan_session, article_ids):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.get_article_by_id(article_ids[0])
+    )
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    assert_uses_index(plan, "articles_pkey")
+    assert_estimated_rows(plan, max_rows=1)
+
+
+@pytest.mark.xfail(
+    reason="list_articles without a limit reads the whole table",
+    strict=True,
+)
+async def test_list_articles_plan(plan_session):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(plan_session, manager.list_articles)
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    assert_estimated_rows(plan, max_rows=1000)
+
+
+async def test_list_articles_first_page_plan(plan_session):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.list_articles(limit=21)
+    )
+
+    assert_no_seq_scan(plan, "articles")
+    assert_uses_index(plan, "ix_articles_created_at_id")
+
+
+async def test_list_articles_next_page_plan(plan_session, article_ids):
+    manager = ArticleManager(plan_session)
+    article = await plan_session.get(Article, article_ids[0])
+
+    (plan,) = await explain_calls(
+        plan_session,
+        lambda: manager.list_articles(
+            limit=21, after=(article.created_at, article.id)
+        ),
+    )
+
+    assert_no_seq_scan(plan, "articles")
+    assert_uses_index(plan, "ix_articles_created_at_id")
+
+
+async def test_list_comments_plan(plan_session, article_ids):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.list_comments(article_ids[0], limit=21)
+    )
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    assert_uses_index(plan, "ix_comments_article_id_created_at_id")
+    assert_estimated_rows(plan, max_rows=COMMENTS_PER_ARTICLE * 5)
+
+
+async def test_get_article_version_plan(plan_session, article_ids):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.get_article_version(article_ids[0])
+    )
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    # the comments are counted without reading their rows
+    assert_index_only_scan(plan, "ix_comments_article_id_created_at_id")
+
+
+async def test_list_article_versions_plan(plan_session):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.list_article_versions(limit=21)
+    )
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    assert_uses_index(plan, "ix_articles_created_at_id")
+    assert_index_only_scan(plan, "ix_comments_article_id_created_at_id")
+
+
+async def test_get_articles_json_plan(plan_session, article_ids):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.get_articles_json(article_ids)
+    )
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    assert_uses_index(plan, "articles_pkey")
+    assert_uses_index(plan, "ix_comments_article_id_created_at_id")
+
+
+async def test_list_comment_previews_plan(plan_session, article_ids):
+    manager = ArticleManager(plan_session)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.list_comment_previews(article_ids, 5)
+    )
+
+    assert_no_seq_scan(plan, *BIG_TABLES)
+    assert_uses_index(plan, "ix_comments_article_id_created_at_id")
+    assert_estimated_rows(plan, max_rows=len(article_ids) * 5 * 5)
@@ -0,0 +1,55 @@
+import pytest
+from httpx import AsyncClient
+
+from api.users.managers import PasswordManager, UserManager
+
+
+@pytest.fixture
+async def registered_user(app_instance, db_session) -> tuple[str, str]:
+    """Create a user with a password, returns email and password."""
+    user_manager = UserManager(
+        db_session, PasswordManager(app_instance.state.settings.SALT)
+    )
+    await user_manager.create_user(
+        "budget@example.com", "password123", commit=True
+    )
+    return "budget@example.com", "password123"
+
+
+@pytest.mark.integration
+async def test_sign_in_query_budget(
+    api_client: AsyncClient, registered_user, query_budget
+):
+    email, password = registered_user
+
+    with query_budget(max_queries=1):
+        resp = await api_client.post(
+            "/api/auth/sign_in",
+            json={"user": {"email": email, "password": password}},
+        )
+
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+async def test_sign_out_query_budget(
+    api_client: AsyncClient, registered_user, query_budget
+):
+    email, password = registered_user
+    sign_in_resp = await api_client.post(
+        "/api/auth/sign_in",
+        json={"user": {"email": email, "password": password}},
+    )
+    token = sign_in_resp.json()["authentication_token"]
+
+    # denylist check and user lookup for the current user, then the cache
+    # invalidation notify and the insert
+    with query_budget(max_queries=4):
+        resp = await api_client.request(
+            "DELETE",
+            "/api/auth/sign_out",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"user": {"email": email}},
+        )
+
+    assert resp.status_code == 200
@@ -0,0 +1,83 @@
+from api.cache import Cache, CacheBackend, CacheError, MemoryBackend
+from tests._fixtures.clock import FakeClock
+
+
+class FailingBackend(CacheBackend):
+    async def get_many(self, keys):
+        raise CacheError("down")
+
+    async def set_many(self, items, ttl=None):
+        raise CacheError("down")
+
+    async def delete(self, *keys):
+        raise CacheError("down")
+
+
+async def test_memory_values_expire_after_ttl():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+    await backend.set_many({"a": b"1"}, ttl=10)
+    await backend.set_many({"b": b"2"})
+
+    clock.now = 9.9
+    assert await backend.get_many(["a", "b"]) == [b"1", b"2"]
+    clock.now = 10
+    assert await backend.get_many(["a", "b"]) == [None, b"2"]
+    assert backend.nbytes == 1
+
+
+async def test_memory_evicts_least_recently_used_bytes():
+    backend = MemoryBackend(max_bytes=6)
+    await backend.set_many({"a": b"aa", "b": b"bb", "c": b"cc"})
+    await backend.get_many(["a"])
+
+    await backend.set_many({"d": b"dd"})
+
+    assert await backend.get_many(["a", "b", "c", "d"]) == [
+        b"aa",
+        None,
+        b"cc",
+        b"dd",
+    ]
+    assert backend.nbytes == 6
+
+
+async def test_memory_skips_values_larger_than_the_cache():
+    backend = MemoryBackend(max_bytes=2)
+    await backend.set_many({"a": b"a", "big": b"big"})
+
+    assert await backend.get_many(["a", "big"]) == [b"a", None]
+
+
+async def test_cache_namespaces_keys():
+    backend = MemoryBackend()
+    await Cache(backend, namespace="v1").set("a", b"1")
+
+    assert await Cache(backend, namespace="v2").get("a") is None
+    assert await backend.get_many(["v1:a"]) == [b"1"]
+
+
+async def test_cache_default_ttl():
+    clock = FakeClock()
+    cache = Cache(MemoryBackend(clock=clock), default_ttl=5)
+    await cache.set_many({"a": b"1"})
+    await cache.set_many({"b": b"2"}, ttl=60)
+
+    clock.now = 5
+    assert await cache.get_many(["a", "b"]) == {"b": b"2"}
+
+
+async def test_cache_treats_failures_as_misses():
+    cache = Cache(FailingBackend())
+
+    await cache.set("a", b"1")
+    await cache.delete("a")
+    assert await cache.get("a") is None
+    assert cache.as_dict() == {
+        "namespace": "",
+        "hits": 0,
+        "misses": 1,
+        "hit_rate": 0.0,
+        "errors": 3,
+        "backend": "FailingBackend",
+    }
@@ -0,0 +1,36 @@
+import pytest
+
+from api.cache.early_refresh import refresh_early
+
+
+@pytest.mark.parametrize(
+    ("now", "random", "expected"),
+    [
+        # far from the expiry, only the unlikeliest draws refresh
+        (90.0, 0.5, False),
+        (90.0, 0.99999, True),
+        # close to it, most draws do
+        (99.5, 0.5, True),
+        (99.5, 0.1, False),
+        # expired
+        (100.0, 0.0, True),
+    ],
+)
+def test_refresh_early(now, random, expected):
+    assert (
+        refresh_early(100.0, delta=1.0, now=now, random=lambda: random)
+        is expected
+    )
+
+
+def test_longer_builds_refresh_earlier():
+    def refresh(delta):
+        return refresh_early(100.0, delta, now=95.0, random=lambda: 0.9)
+
+    assert refresh(1.0) is False
+    assert refresh(10.0) is True
+
+
+def test_never_refresh_without_expiry_or_beta():
+    assert refresh_early(None, 1.0, now=1e9) is False
+    assert refresh_early(100.0, 1.0, beta=0, now=99.99) is False
@@ -0,0 +1,53 @@
+from api.cache import LocalCache
+from tests._fixtures.clock import FakeClock
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = LocalCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LocalCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_set_with_stamp_skips_values_loaded_before_invalidation():
+    cache = LocalCache()
+    stamp = cache.stamp()
+    cache.delete("other")
+
+    cache.set("a", "stale", stamp=stamp)
+    assert cache.get("a") is None
+
+    cache.set("a", "fresh", stamp=cache.stamp())
+    assert cache.get("a") == "fresh"
+
+
+def test_disabled_cache_misses():
+    cache = LocalCache()
+    cache.enabled = False
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.as_dict() == {
+        "enabled": False,
+        "size": 0,
+        "hits": 0,
+        "misses": 1,
+        "hit_rate": 0.0,
+    }
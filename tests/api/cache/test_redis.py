@@ -0,0 +1,89 @@
+import pytest
+
+from api.cache import Cache, CacheError, RedisBackend
+from tests._fixtures.clock import FakeClock
+from tests._fixtures.fake_redis import FakeRedisServer
+
+
+async def test_get_set_delete(fake_redis):
+    backend = RedisBackend(fake_redis.host, fake_redis.port)
+    await backend.set_many({"a": b"1", "b": b"2"})
+
+    assert await backend.get_many(["a", "missing", "b"]) == [b"1", None, b"2"]
+    await backend.delete("a", "missing")
+    assert await backend.get_many(["a", "b"]) == [None, b"2"]
+    await backend.close()
+
+
+async def test_batches_are_single_round_trips(fake_redis):
+    backend = RedisBackend(fake_redis.host, fake_redis.port)
+    await backend.set_many({"a": b"1", "b": b"2"})
+    await backend.get_many(["a", "b", "c"])
+
+    # the SETs are pipelined
+    assert fake_redis.commands == ["SET", "SET", "MGET"]
+    await backend.close()
+
+
+async def test_values_expire_after_ttl():
+    clock = FakeClock()
+    server = FakeRedisServer(clock=clock)
+    await server.start()
+    backend = RedisBackend(server.host, server.port)
+    await backend.set_many({"a": b"1"}, ttl=1.5)
+
+    clock.now = 1.4
+    assert await backend.get_many(["a"]) == [b"1"]
+    clock.now = 1.5
+    assert await backend.get_many(["a"]) == [None]
+    await backend.close()
+    await server.stop()
+
+
+async def test_selects_the_database(fake_redis):
+    backend = RedisBackend(fake_redis.host, fake_redis.port, db=2)
+    await backend.get_many(["a"])
+
+    assert fake_redis.commands == ["SELECT", "MGET"]
+    await backend.close()
+
+
+async def test_error_replies_raise(fake_redis):
+    backend = RedisBackend(fake_redis.host, fake_redis.port)
+    fake_redis.failing.add("MGET")
+
+    with pytest.raises(CacheError, match="MGET failed"):
+        await backend.get_many(["a"])
+    # the connection is still usable
+    fake_redis.failing.clear()
+    assert await backend.get_many(["a"]) == [None]
+    assert backend.errors == 1
+    await backend.close()
+
+
+async def test_unreachable_server_raises(fake_redis):
+    backend = RedisBackend(fake_redis.host, fake_redis.port)
+    await backend.get_many(["a"])
+    await fake_redis.stop()
+
+    # the idle connection was closed by the server
+    with pytest.raises(CacheError):
+        await backend.get_many(["a"])
+    with pytest.raises(CacheError):
+        await backend.get_many(["a"])
+    assert backend.as_dict()["errors"] == 2
+
+
+async def test_cache_survives_an_outage(fake_redis):
+    cache = Cache(RedisBackend(fake_redis.host, fake_redis.port))
+    await cache.set("a", b"1")
+    await fake_redis.stop()
+
+    assert await cache.get("a") is None
+    await cache.set("a", b"1")
+    assert cache.errors == 2
+
+    # the server kept its keys
+    await fake_redis.start()
+    assert await cache.get("a") == b"1"
+    await cache.close()
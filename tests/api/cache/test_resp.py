@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from tests._fixtures.resp import (
+    ProtocolError,
+    RespError,
+    encode_command,
+    encode_reply,
+    read_reply,
+)
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def test_encode_command():
+    assert encode_command("SET", "k", b"v", 100) == (
+        b"*4\r\n$3\r\nSET\r\n$1\r\nk\r\n$1\r\nv\r\n$3\r\n100\r\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "OK",
+        RespError("ERR boom"),
+        42,
+        b"bulk\r\nwith crlf",
+        b"",
+        None,
+        [b"a", None, [1, "OK"]],
+    ],
+)
+async def test_replies_round_trip(value):
+    reply = await read_reply(_reader(encode_reply(value)))
+
+    if isinstance(value, RespError):
+        assert isinstance(reply, RespError)
+        assert str(reply) == str(value)
+    else:
+        assert reply == value
+
+
+async def test_read_commands():
+    reader = _reader(encode_command("MGET", "a", "b"))
+
+    assert await read_reply(reader) == [b"MGET", b"a", b"b"]
+
+
+@pytest.mark.parametrize("data", [b"?what\r\n", b"$x\r\n"])
+async def test_malformed_replies(data):
+    with pytest.raises(ProtocolError):
+        await read_reply(_reader(data))
+
+
+async def test_truncated_replies():
+    with pytest.raises(asyncio.IncompleteReadError):
+        await read_reply(_reader(b"$5\r\nab"))
@@ -0,0 +1,52 @@
+import collections
+
+from api.cache import HashRing, RedisBackend, ShardedBackend
+from tests._fixtures.fake_redis import FakeRedisServer
+
+
+def test_ring_spreads_keys():
+    ring = HashRing(["a", "b", "c"])
+    counts = collections.Counter(ring.node(f"key{i}") for i in range(3000))
+
+    assert set(counts) == {"a", "b", "c"}
+    assert min(counts.values()) > 600
+
+
+def test_ring_moves_few_keys_when_a_node_is_added():
+    keys = [f"key{i}" for i in range(3000)]
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+
+    moved = [k for k in keys if before.node(k) != after.node(k)]
+
+    # only the keys now on the new node move
+    assert all(after.node(k) == "d" for k in moved)
+    assert len(moved) < len(keys) / 3
+
+
+async def test_sharded_backend_spreads_batches():
+    servers = [FakeRedisServer(), FakeRedisServer()]
+    for server in servers:
+        await server.start()
+    backend = ShardedBackend(
+        {
+            f"node{i}": RedisBackend(server.host, server.port)
+            for i, server in enumerate(servers)
+        }
+    )
+    items = {f"key{i}": str(i).encode() for i in range(20)}
+
+    await backend.set_many(items)
+
+    assert all(len(server) > 0 for server in servers)
+    assert sum(len(server) for server in servers) == 20
+    keys = [*items, "missing"]
+    assert await backend.get_many(keys) == [*items.values(), None]
+    # one round trip per node
+    assert [s.commands.count("MGET") for s in servers] == [1, 1]
+
+    await backend.delete(*items)
+    assert sum(len(server) for server in servers) == 0
+    await backend.close()
+    for server in servers:
+        await server.stop()
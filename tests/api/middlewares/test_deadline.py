@@ -0,0 +1,53 @@
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from api.middlewares import DeadlineMiddleware
+
+
+async def _deadline_app(scope, receive, send):
+    deadline = scope["state"]["deadline"]
+    remaining = None if deadline is None else deadline - time.monotonic()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/plain")],
+        }
+    )
+    await send({"type": "http.response.body", "body": str(remaining).encode()})
+
+
+def _client(default_timeout=None, **kwargs) -> AsyncClient:
+    return AsyncClient(
+        transport=ASGITransport(
+            DeadlineMiddleware(
+                _deadline_app, default_timeout=default_timeout, **kwargs
+            )
+        ),
+        base_url="http://test",
+    )
+
+
+async def test_no_deadline_by_default():
+    response = await _client().get("/")
+    assert response.text == "None"
+
+
+async def test_deadline_from_setting():
+    response = await _client(default_timeout=30).get("/")
+    assert 29 < float(response.text) <= 30
+
+
+async def test_header_shortens_deadline():
+    response = await _client(default_timeout=30).get(
+        "/", headers={"X-Request-Timeout": "2.5"}
+    )
+    assert 2 < float(response.text) <= 2.5
+
+
+async def test_deadline_capped_by_max_timeout():
+    response = await _client(max_timeout=60).get(
+        "/", headers={"X-Request-Timeout": "1e10"}
+    )
+    assert 59 < float(response.text) <= 60
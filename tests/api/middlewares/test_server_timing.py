@@ -0,0 +1,97 @@
+import logging
+import re
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from api.instrumentation import RequestQueryStats, get_current_query_stats
+from api.middlewares import ServerTimingMiddleware
+from api.middlewares.server_timing import format_server_timing
+
+SERVER_TIMING_RE = re.compile(
+    r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", '
+    r"db-pool;dur=(?P<pool>[\d.]+), total;dur=(?P<total>[\d.]+)"
+)
+
+
+def test_format_server_timing():
+    stats = RequestQueryStats()
+    stats.queries = 3
+    stats.db_time = 0.0125
+    stats.pool_wait = 0.0005
+
+    assert format_server_timing(stats, total=0.05) == (
+        'db;dur=12.500;desc="3 queries", db-pool;dur=0.500, total;dur=50.000'
+    )
+
+
+async def _fake_app(scope, receive, send):
+    # emulates two statements reported by the engine hooks
+    stats = get_current_query_stats()
+    stats.queries += 2
+    stats.db_time += 0.002
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/plain")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def test_middleware_adds_header_and_logs(caplog):
+    client = AsyncClient(
+        transport=ASGITransport(ServerTimingMiddleware(_fake_app)),
+        base_url="http://test",
+    )
+
+    with caplog.at_level(logging.INFO, "api.middlewares.server_timing"):
+        response = await client.get("/some/path")
+
+    assert response.status_code == 200
+    match = SERVER_TIMING_RE.fullmatch(response.headers["server-timing"])
+    assert match is not None
+    assert match["queries"] == "2"
+    assert float(match["db"]) >= 2.0
+
+    (record,) = caplog.records
+    assert record.http_method == "GET"
+    assert record.http_path == "/some/path"
+    assert record.status_code == 200
+    assert record.db_queries == 2
+    assert get_current_query_stats() is None
+
+
+async def test_middleware_header_can_be_disabled():
+    client = AsyncClient(
+        transport=ASGITransport(
+            ServerTimingMiddleware(_fake_app, emit_header=False)
+        ),
+        base_url="http://test",
+    )
+
+    response = await client.get("/")
+
+    assert "server-timing" not in response.headers
+
+
+@pytest.mark.integration
+async def test_article_by_id_reports_its_queries(api_client: AsyncClient):
+    payload = {
+        "article": {
+            "title": "Timed",
+            "short_description": "desc",
+            "description": "desc",
+        }
+    }
+    create_resp = await api_client.post("/api/articles", json=payload)
+    article_id = create_resp.json()["id"]
+
+    resp = await api_client.get(f"/api/articles/{article_id}")
+
+    assert resp.status_code == 200
+    match = SERVER_TIMING_RE.fullmatch(resp.headers["server-timing"])
+    assert match is not None
+    # the article, the likes, then the comment preview
+    assert match["queries"] == "3"
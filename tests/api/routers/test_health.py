@@ -0,0 +1,119 @@
+"""Test the liveness and readiness endpoints."""
+
+import contextlib
+
+import pytest
+
+from api.circuit_breaker import CircuitBreaker
+from api.db import async_session_maker, create_engine
+from api.dependencies import get_db_read_session
+from api.routers.v1 import _database_status
+from api.settings import DbCircuitBreakerSettings, DbPoolSettings
+
+
+@contextlib.contextmanager
+def open_circuit(engine):
+    """Replace the engine's breaker with an open one for the block."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    previous = engine.pool.circuit_breaker
+    engine.pool.circuit_breaker = breaker
+    try:
+        yield breaker
+    finally:
+        engine.pool.circuit_breaker = previous
+
+
+async def test_healthz(api_client):
+    response = await api_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+async def test_readyz(api_client):
+    response = await api_client.get("/readyz")
+
+    assert response.status_code == 200
+    primary = response.json()["databases"]["primary"]
+    assert primary["ready"] is True
+    assert primary["saturated"] is False
+    assert primary["circuit_breaker"]["state"] == "closed"
+    assert primary["pool"]["pool"] == "InstrumentedNullPool"
+
+
+async def test_readyz_fails_while_circuit_is_open(api_client, app_instance):
+    with open_circuit(app_instance.state.db_engine):
+        response = await api_client.get("/readyz")
+
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "unavailable"
+    assert body["databases"]["primary"]["circuit_breaker"]["state"] == "open"
+
+
+@pytest.mark.integration
+async def test_open_circuit_fails_requests_fast(
+    api_client, app_instance, dependencies_override_ctx
+):
+    engine = create_engine(
+        app_instance.state.settings.get_db_url(),
+        circuit_breaker=DbCircuitBreakerSettings(),
+    )
+
+    async def get_session():
+        async with async_session_maker(engine)() as session:
+            yield session
+
+    try:
+        with (
+            open_circuit(engine),
+            dependencies_override_ctx({get_db_read_session: get_session}),
+        ):
+            response = await api_client.get("/api/articles/1")
+    finally:
+        await engine.dispose()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+
+
+async def test_connects_in_progress_do_not_saturate_null_pool(app_instance):
+    metrics = app_instance.state.db_engine.pool.metrics
+    metrics.waiting += 1
+    try:
+        status = _database_status(app_instance.state.db_engine)
+    finally:
+        metrics.waiting -= 1
+
+    assert status["saturated"] is False
+    assert status["ready"] is True
+
+
+@pytest.mark.integration
+async def test_queue_pool_saturated_once_full_with_waiters(app_instance):
+    engine = create_engine(
+        app_instance.state.settings.get_db_url(),
+        pool=DbPoolSettings(size=1, max_overflow=0),
+    )
+    try:
+        async with engine.connect():
+            assert _database_status(engine)["saturated"] is False
+            engine.pool.metrics.waiting = 1
+            status = _database_status(engine)
+        engine.pool.metrics.waiting = 0
+    finally:
+        await engine.dispose()
+
+    assert status["saturated"] is True
+    assert status["ready"] is False
+
+
+async def test_readyz_fails_until_warmed_up(api_client, app_instance):
+    app_instance.state.warmed_up = False
+    try:
+        response = await api_client.get("/readyz")
+    finally:
+        app_instance.state.warmed_up = True
+
+    assert response.status_code == 503
+    assert response.json()["warmed_up"] is False
@@ -0,0 +1,44 @@
+"""Test the metrics endpoint and load shedding."""
+
+import pytest
+
+from api.concurrency import AdaptiveLimiter
+from api.dependencies import get_db_read_session
+
+
+async def test_metrics(api_client):
+    response = await api_client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["db_concurrency"]["limit"] == 20
+    assert body["db_concurrency"]["rejected"] == 0
+    primary = body["databases"]["primary"]
+    assert primary["pool"]["pool"] == "InstrumentedNullPool"
+    assert primary["circuit_breaker"]["state"] == "closed"
+    assert "compiled_hits" in primary["statement_cache"]
+    assert body["caches"]["connected"] is True
+    assert body["shared_cache"]["backend"] == "MemoryBackend"
+    assert body["single_flight"]["in_flight"] == 0
+    assert body["stale_served"] >= 0
+
+
+@pytest.mark.integration
+async def test_requests_beyond_concurrency_limit_are_rejected(
+    api_client, app_instance
+):
+    limiter = AdaptiveLimiter(initial_limit=1, retry_after=2)
+    limiter.acquire()
+    previous = app_instance.state.db_limiter
+    app_instance.state.db_limiter = limiter
+    # use the real read session, not the one shared by the test
+    override = app_instance.dependency_overrides.pop(get_db_read_session)
+    try:
+        response = await api_client.get("/api/articles")
+    finally:
+        app_instance.dependency_overrides[get_db_read_session] = override
+        app_instance.state.db_limiter = previous
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert limiter.rejected == 1
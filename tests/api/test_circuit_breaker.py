@@ -0,0 +1,72 @@
+import pytest
+
+from api.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from tests._fixtures.clock import FakeClock
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=3, window=10.0, reset_timeout=5.0, clock=clock
+    )
+
+
+def test_opens_after_failures_within_window(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.check()
+
+    clock.now = 1.0
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.check()
+    assert exc_info.value.retry_after == 5.0
+    assert breaker.as_dict()["rejected"] == 1
+
+
+def test_failures_outside_window_are_forgotten(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 11.0
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+
+def test_half_open_success_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 5.0
+    assert breaker.state == HALF_OPEN
+    breaker.check()
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.as_dict()["recent_failures"] == 0
+
+
+def test_half_open_failure_opens_again(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 5.0
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == 5.0
+    assert breaker.times_opened == 2
@@ -0,0 +1,57 @@
+import pytest
+
+from api.concurrency import AdaptiveLimiter, ConcurrencyLimitExceeded
+
+
+def test_rejects_beyond_limit():
+    limiter = AdaptiveLimiter(initial_limit=2, retry_after=3)
+    limiter.acquire()
+    limiter.acquire()
+
+    with pytest.raises(ConcurrencyLimitExceeded) as exc_info:
+        limiter.acquire()
+
+    assert exc_info.value.retry_after == 3
+    assert limiter.as_dict() == {
+        "limit": 2,
+        "in_flight": 2,
+        "accepted": 2,
+        "rejected": 1,
+        "retry_after": 3,
+    }
+
+
+def test_slow_requests_shrink_limit_down_to_minimum():
+    limiter = AdaptiveLimiter(
+        initial_limit=10, min_limit=4, latency_threshold=0.1, backoff=0.5
+    )
+
+    limiter.acquire()
+    limiter.release(latency=0.5)
+    assert limiter.limit == 5
+
+    limiter.acquire()
+    limiter.release(latency=0.01, overloaded=True)
+    assert limiter.limit == 4
+
+
+def test_fast_requests_grow_used_limit_up_to_maximum():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+
+    for _ in range(3):
+        limiter.acquire()
+        limiter.acquire()
+        limiter.release(latency=0.01)
+        limiter.release(latency=0.01)
+
+    assert limiter.limit == 3
+
+
+def test_idle_limit_does_not_grow():
+    limiter = AdaptiveLimiter(initial_limit=10)
+
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(latency=0.01)
+
+    assert limiter.limit == 10
@@ -0,0 +1,127 @@
+import pytest
+from sqlalchemy import text
+
+from api.circuit_breaker import OPEN, CircuitOpenError
+from api.db import (
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    async_session_maker,
+    create_engine,
+    get_circuit_breaker,
+    get_pool_status,
+)
+from api.settings import DbCircuitBreakerSettings, DbPoolSettings, Settings
+
+DB_URL = Settings().get_db_url()
+
+
+async def test_create_engine_without_pool_settings_uses_null_pool():
+    engine = create_engine(DB_URL)
+    try:
+        assert isinstance(engine.pool, InstrumentedNullPool)
+    finally:
+        await engine.dispose()
+
+
+async def test_create_engine_with_disabled_pool_uses_null_pool():
+    engine = create_engine(DB_URL, pool=DbPoolSettings(enabled=False))
+    try:
+        assert isinstance(engine.pool, InstrumentedNullPool)
+    finally:
+        await engine.dispose()
+
+
+async def test_create_engine_applies_pool_settings():
+    pool_settings = DbPoolSettings(
+        size=3, max_overflow=2, recycle=60, pre_ping=False, timeout=1.5
+    )
+    engine = create_engine(DB_URL, pool=pool_settings)
+    try:
+        pool = engine.pool
+        assert isinstance(pool, InstrumentedQueuePool)
+        assert pool.size() == 3
+        assert pool.timeout() == 1.5
+        assert pool._max_overflow == 2
+        assert pool._recycle == 60
+        assert pool._pre_ping is False
+    finally:
+        await engine.dispose()
+
+
+async def test_pool_status_of_idle_pool():
+    engine = create_engine(DB_URL, pool=DbPoolSettings(size=4))
+    try:
+        status = get_pool_status(engine)
+    finally:
+        await engine.dispose()
+
+    assert status == {
+        "pool": "InstrumentedQueuePool",
+        "size": 4,
+        "max_overflow": 10,
+        "checked_out": 0,
+        "checked_in": 0,
+        "overflow": 0,
+        "waiting": 0,
+        "checkouts": 0,
+        "timeouts": 0,
+        "checkout_wait_mean_ms": 0.0,
+        "checkout_wait_max_ms": 0.0,
+    }
+
+
+async def test_pool_metrics_survive_dispose():
+    engine = create_engine(DB_URL, pool=DbPoolSettings())
+    engine.pool.metrics.record_checkout(0.5)
+
+    await engine.dispose()
+
+    status = get_pool_status(engine)
+    assert status["checkouts"] == 1
+    assert status["checkout_wait_max_ms"] == 500.0
+
+
+async def test_circuit_breaker_opens_on_connection_failures():
+    # nothing listens on port 1, connections are refused right away
+    engine = create_engine(
+        Settings(DB_PORT=1).get_db_url(),
+        pool=DbPoolSettings(),
+        circuit_breaker=DbCircuitBreakerSettings(failure_threshold=2),
+    )
+    try:
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await engine.connect()
+
+        with pytest.raises(CircuitOpenError):
+            await engine.connect()
+
+        await engine.dispose()
+        breaker = get_circuit_breaker(engine)
+        assert breaker.state == OPEN
+        assert breaker.rejected == 1
+    finally:
+        await engine.dispose()
+
+
+async def test_circuit_breaker_counts_successful_connections():
+    engine = create_engine(
+        DB_URL, circuit_breaker=DbCircuitBreakerSettings(failure_threshold=1)
+    )
+    try:
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+        assert get_circuit_breaker(engine).as_dict()["recent_failures"] == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_read_only_session_maker_sets_readonly_option():
+    engine = create_engine(DB_URL)
+    try:
+        session_class = async_session_maker(engine, read_only=True)
+        bind = session_class.kw["bind"]
+        assert bind.get_execution_options()["postgresql_readonly"] is True
+        assert "postgresql_readonly" not in engine.get_execution_options()
+    finally:
+        await engine.dispose()
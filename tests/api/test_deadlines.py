@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from sqlalchemy import text
+
+from api.db import async_session_maker
+from api.deadlines import (
+    MAX_STATEMENT_TIMEOUT_MS,
+    DeadlineExceeded,
+    parse_timeout,
+    remaining_ms,
+    session_deadline,
+)
+from api.dependencies import _session_scope, get_db_read_session
+
+
+@pytest.mark.parametrize(
+    "header,default,expected",
+    [
+        (None, None, None),
+        (None, 30.0, 30.0),
+        ("5", None, 5.0),
+        ("5", 30.0, 5.0),
+        ("60", 30.0, 30.0),
+        ("soon", 30.0, 30.0),
+        ("-1", None, None),
+        ("inf", None, None),
+        ("nan", 30.0, 30.0),
+        ("1e10", None, MAX_STATEMENT_TIMEOUT_MS / 1000),
+    ],
+)
+def test_parse_timeout(header, default, expected):
+    assert parse_timeout(header, default) == expected
+
+
+def test_parse_timeout_capped_by_maximum():
+    assert parse_timeout("1e10", None, maximum=60) == 60
+    assert parse_timeout(None, 1e10, maximum=60) == 60
+
+
+def test_remaining_ms_raises_once_deadline_passed():
+    assert 900 < remaining_ms(time.monotonic() + 1) <= 1000
+    with pytest.raises(DeadlineExceeded):
+        remaining_ms(time.monotonic())
+
+
+def test_remaining_ms_capped_by_postgres_limit():
+    assert remaining_ms(time.monotonic() + 1e10) == MAX_STATEMENT_TIMEOUT_MS
+
+
+@pytest.mark.integration
+async def test_session_statements_are_cancelled_at_deadline(app_instance):
+    session_class = async_session_maker(app_instance.state.db_engine)
+    deadline = time.monotonic() + 0.2
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        async with _session_scope(session_class, deadline) as session:
+            await session.execute(text("SELECT pg_sleep(5)"))
+
+    assert time.monotonic() - started < 2
+
+
+async def test_session_keeps_its_deadline(app_instance):
+    session_class = async_session_maker(app_instance.state.db_engine)
+    deadline = time.monotonic() + 5
+
+    async with _session_scope(session_class, deadline) as session:
+        assert session_deadline(session) == deadline
+    async with _session_scope(session_class, None) as session:
+        assert session_deadline(session) is None
+
+
+@pytest.mark.integration
+async def test_session_without_deadline_has_no_statement_timeout(app_instance):
+    session_class = async_session_maker(app_instance.state.db_engine)
+
+    async with _session_scope(session_class, None) as session:
+        timeout = await session.scalar(text("SHOW statement_timeout"))
+
+    assert timeout == "0"
+
+
+@pytest.mark.integration
+async def test_route_returns_504_past_deadline(api_client, app_instance):
+    # use the real read session, not the one shared by the test
+    override = app_instance.dependency_overrides.pop(get_db_read_session)
+    try:
+        response = await api_client.get(
+            "/api/articles", headers={"X-Request-Timeout": "0.0001"}
+        )
+    finally:
+        app_instance.dependency_overrides[get_db_read_session] = override
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded."}
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("timeout", ["inf", "nan", "1e10", "1e300"])
+async def test_route_bounds_out_of_range_timeouts(
+    api_client, app_instance, timeout
+):
+    # use the real read session, not the one shared by the test
+    override = app_instance.dependency_overrides.pop(get_db_read_session)
+    try:
+        response = await api_client.get(
+            "/api/articles", headers={"X-Request-Timeout": timeout}
+        )
+    finally:
+        app_instance.dependency_overrides[get_db_read_session] = override
+
+    assert response.status_code == 200
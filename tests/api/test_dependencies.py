@@ -0,0 +1,99 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from starlette.requests import Request
+
+from api.concurrency import AdaptiveLimiter, ConcurrencyLimitExceeded
+from api.dependencies import (
+    LAST_WRITE_COOKIE,
+    get_db_read_session,
+    limit_db_concurrency,
+)
+from api.settings import Settings
+
+
+def _make_request(cookies: dict[str, str] | None = None) -> Request:
+    cookie_header = "; ".join(f"{k}={v}" for k, v in (cookies or {}).items())
+    return Request(
+        {
+            "type": "http",
+            "headers": [(b"cookie", cookie_header.encode())],
+        }
+    )
+
+
+def _make_app():
+    replica_session = MagicMock(name="replica_session")
+    primary_session = MagicMock(name="primary_session")
+    replica_maker = MagicMock(name="replica_maker")
+    replica_maker.return_value.__aenter__.return_value = replica_session
+    primary_maker = MagicMock(name="primary_maker")
+    primary_maker.return_value.__aenter__.return_value = primary_session
+    app = SimpleNamespace(
+        state=SimpleNamespace(
+            db_read_session_maker=replica_maker,
+            db_primary_read_session_maker=primary_maker,
+        )
+    )
+    return app, replica_session, primary_session
+
+
+async def _read_session(request: Request, app) -> MagicMock:
+    gen = get_db_read_session(
+        request=request, app=app, settings=Settings(), _db_slot=None
+    )
+    session = await anext(gen)
+    await gen.aclose()
+    return session
+
+
+async def test_read_session_uses_replica_by_default():
+    app, replica_session, _ = _make_app()
+
+    session = await _read_session(_make_request(), app)
+
+    assert session is replica_session
+
+
+async def test_read_session_uses_primary_after_recent_write():
+    app, _, primary_session = _make_app()
+    request = _make_request({LAST_WRITE_COOKIE: str(time.time())})
+
+    session = await _read_session(request, app)
+
+    assert session is primary_session
+
+
+async def test_read_session_uses_replica_after_write_window():
+    app, replica_session, _ = _make_app()
+    window = Settings().DB_READ_YOUR_WRITES_SECONDS
+    request = _make_request({LAST_WRITE_COOKIE: str(time.time() - window)})
+
+    session = await _read_session(request, app)
+
+    assert session is replica_session
+
+
+async def test_read_session_ignores_malformed_cookie():
+    app, replica_session, _ = _make_app()
+    request = _make_request({LAST_WRITE_COOKIE: "yesterday"})
+
+    session = await _read_session(request, app)
+
+    assert session is replica_session
+
+
+async def test_db_concurrency_slot_is_held_until_exit():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    app = SimpleNamespace(state=SimpleNamespace(db_limiter=limiter))
+
+    gen = limit_db_concurrency(app=app)
+    await anext(gen)
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await anext(limit_db_concurrency(app=app))
+    await gen.aclose()
+
+    assert limiter.in_flight == 0
+    await anext(limit_db_concurrency(app=app))
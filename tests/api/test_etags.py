@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+from api.etags import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_stable_and_quoted():
+    version = (1, datetime(2024, 5, 1, 12, 30), 3, None)
+
+    etag = make_etag(version, ["title"])
+
+    assert etag == make_etag(version, ["title"])
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag != make_etag(version, ["description"])
+    assert etag != make_etag((1, datetime(2024, 5, 1, 12, 31), 3, None))
+
+
+@pytest.mark.parametrize(
+    "header, matches",
+    [
+        (None, False),
+        ("", False),
+        ('"other"', False),
+        ('"tag"', True),
+        ('W/"tag"', True),
+        ('"other", "tag"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"tag"') is matches
+
+
+def test_not_modified():
+    resp = not_modified('"tag"')
+
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == '"tag"'
+    assert resp.body == b""
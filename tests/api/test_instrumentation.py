@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import event, select, text
+
+from api.db import create_engine
+from api.instrumentation import SlowQueryLog, redact_parameters
+from api.settings import DbStatementCacheSettings
+from api.users.managers import PasswordManager, UserManager
+from api.users.models import User
+
+
+@pytest.mark.integration
+async def test_statement_cache_stats_count_hits(app_instance, db_session):
+    stats = app_instance.state.db_statement_cache_stats
+    user_manager = UserManager(db_session, PasswordManager(salt="a" * 16))
+
+    await user_manager.get_user_by_email("first@example.com")
+    before = stats.as_dict()
+    await user_manager.get_user_by_email("second@example.com")
+    after = stats.as_dict()
+
+    assert after["compiled_hits"] == before["compiled_hits"] + 1
+    assert after["compiled_misses"] == before["compiled_misses"]
+    assert after["prepared_hits"] == before["prepared_hits"] + 1
+    assert after["prepared_misses"] == before["prepared_misses"]
+
+
+@pytest.mark.integration
+async def test_pgbouncer_mode_disables_prepared_statement_cache(app_instance):
+    engine = create_engine(
+        app_instance.state.settings.get_db_url(),
+        statement_cache=DbStatementCacheSettings(
+            pgbouncer_transaction_mode=True
+        ),
+    )
+    try:
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+            raw = await conn.get_raw_connection()
+            assert raw.dbapi_connection._prepared_statement_cache is None
+    finally:
+        await engine.dispose()
+
+
+def test_redact_parameters_keeps_only_types():
+    assert redact_parameters(("secret@example.com", 42, None)) == [
+        "<str>",
+        "<int>",
+        None,
+    ]
+    assert redact_parameters({"token": "abc"}) == {"token": "<str>"}
+
+
+@pytest.mark.integration
+async def test_slow_query_log_captures_plan(app_instance, caplog):
+    engine = create_engine(app_instance.state.settings.get_db_url())
+    slow_query_log = SlowQueryLog.install(engine, threshold=0)
+    try:
+        with caplog.at_level(logging.WARNING, "api.instrumentation"):
+            async with engine.connect() as conn:
+                await conn.execute(
+                    select(User.id).where(User.email == "slow@example.com")
+                )
+            await asyncio.gather(*slow_query_log._explaining.values())
+    finally:
+        await engine.dispose()
+
+    assert slow_query_log.slow_queries == 1
+    slow_record, plan_record = caplog.records
+    assert slow_record.db_parameters == ["<str>"]
+    assert "slow@example.com" not in slow_record.getMessage()
+    assert plan_record.db_statement == slow_record.db_statement
+    assert plan_record.db_plan[0]["Plan"]["Relation Name"] == "users"
+
+
+@pytest.mark.integration
+async def test_manager_statements_are_tagged(app_instance, db_session):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = app_instance.state.db_engine.sync_engine
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        user_manager = UserManager(db_session, PasswordManager(salt="a" * 16))
+        await user_manager.get_user_by_email("tagged@example.com")
+        await db_session.execute(text("SELECT 1"))
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+    tagged, untagged = statements
+    assert tagged.startswith("/* UserManager.get_user_by_email */ SELECT")
+    assert untagged == "SELECT 1"
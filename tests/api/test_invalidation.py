@@ -0,0 +1,125 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from api.db import async_session_maker
+from api.invalidation import InvalidationBus
+from api.users.managers import PasswordManager, UserManager
+
+
+async def _wait_for(condition, timeout: float = 5.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def buses(app_instance):
+    """Two buses on a fresh channel, as two workers would run them."""
+    channel = f"test_{uuid.uuid4().hex}"
+    dsn = app_instance.state.settings.get_db_url().replace("+asyncpg", "")
+    buses = [
+        InvalidationBus(dsn, channel=channel, reconnect_delay=0.01)
+        for _ in range(2)
+    ]
+    for bus in buses:
+        await bus.start()
+        await asyncio.wait_for(bus.connected.wait(), 5)
+    try:
+        yield buses
+    finally:
+        for bus in buses:
+            await bus.stop()
+
+
+@pytest.mark.integration
+async def test_committed_invalidation_reaches_other_workers(
+    app_instance, buses
+):
+    writer, reader = buses
+    for bus in buses:
+        bus.cache("articles").set("1", "article 1")
+        bus.cache("articles").set("2", "article 2")
+
+    session_class = async_session_maker(app_instance.state.db_engine)
+    async with session_class() as session:
+        await writer.publish(session, {"articles": ["1"]})
+        # nothing is evicted before the commit
+        assert writer.cache("articles").get("1") == "article 1"
+        await session.commit()
+
+    assert writer.cache("articles").get("1") is None
+    await _wait_for(lambda: reader.cache("articles").get("1") is None)
+    assert reader.cache("articles").get("2") == "article 2"
+
+
+@pytest.mark.integration
+async def test_rolled_back_invalidation_is_not_sent(app_instance, buses):
+    writer, reader = buses
+    reader.cache("articles").set("1", "article 1")
+
+    session_class = async_session_maker(app_instance.state.db_engine)
+    async with session_class() as session:
+        await writer.publish(session, {"articles": ["1"]})
+        await session.rollback()
+        # a committed message after it shows the first one was not sent
+        await writer.publish(session, {"other": None})
+        await session.commit()
+
+    await _wait_for(lambda: reader.messages == 1)
+    assert reader.cache("articles").get("1") == "article 1"
+
+
+@pytest.mark.integration
+async def test_listener_reconnects_and_flushes(app_instance, buses):
+    _, reader = buses
+    cache = reader.cache("articles")
+    cache.set("1", "article 1")
+
+    async with app_instance.state.db_engine.connect() as conn:
+        await conn.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE query LIKE 'LISTEN%' AND query LIKE :channel"
+            ),
+            {"channel": f"%{reader.channel}%"},
+        )
+
+    await _wait_for(lambda: reader.reconnects == 1)
+    await asyncio.wait_for(reader.connected.wait(), 5)
+    assert cache.enabled
+    assert cache.get("1") is None
+
+
+@pytest.mark.integration
+async def test_revoked_token_cache_is_invalidated_on_sign_out(
+    app_instance, buses
+):
+    writer, reader = buses
+    password_manager = PasswordManager(salt="a" * 16)
+    token = f"token-{uuid.uuid4().hex}"
+    session_class = async_session_maker(app_instance.state.db_engine)
+
+    async with session_class() as session:
+        manager = UserManager(session, password_manager, invalidation=reader)
+        assert await manager.is_token_revoked(token) is False
+        # served from the cache now
+        assert reader.cache("revoked_tokens").hits == 0
+        assert await manager.is_token_revoked(token) is False
+        assert reader.cache("revoked_tokens").hits == 1
+
+    async with session_class() as session:
+        manager = UserManager(session, password_manager, invalidation=writer)
+        await manager.add_to_jwt_denylist(token, commit=True)
+
+    await _wait_for(lambda: len(reader.cache("revoked_tokens")) == 0)
+    async with session_class() as session:
+        manager = UserManager(session, password_manager, invalidation=reader)
+        assert await manager.is_token_revoked(token) is True
+        await session.execute(
+            text("DELETE FROM jwt_denylists WHERE jti = :token"),
+            {"token": token},
+        )
+        await session.commit()
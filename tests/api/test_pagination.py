@@ -0,0 +1,68 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from api.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+KEY_TYPES = (datetime, int)
+
+
+def test_cursor_round_trip():
+    values = (datetime(2024, 5, 1, 12, 30), 42)
+
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, KEY_TYPES) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%",
+        encode_cursor(["2024-05-01T12:30:00"]),
+        encode_cursor(["2024-05-01T12:30:00", "42"]),
+        encode_cursor(["yesterday", 42]),
+        encode_cursor(["2024-05-01T12:30:00", True]),
+        encode_cursor([None, 42]),
+        encode_cursor(["2020-01-01T00:00:00+00:00", 5]),
+        encode_cursor(["2024-05-01T12:30:00", 2**31]),
+        encode_cursor(["2024-05-01T12:30:00", -(2**31) - 1]),
+        encode_cursor(["2024-05-01T12:30:00", 2**70]),
+    ],
+)
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, KEY_TYPES)
+
+
+def test_decode_cursor_int_range():
+    cursor = encode_cursor([2**31])
+
+    assert decode_cursor(cursor, (int,), max_int=2**63 - 1) == (2**31,)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, (int,))
+
+
+def test_paginate():
+    rows = [SimpleNamespace(id=i) for i in (5, 4, 3)]
+
+    page, next_cursor = paginate(rows, 2, lambda r: (r.id,))
+
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor, (int,)) == (4,)
+
+
+def test_paginate_last_page():
+    rows = [SimpleNamespace(id=i) for i in (2, 1)]
+
+    page, next_cursor = paginate(rows, 2, lambda r: (r.id,))
+
+    assert page == rows
+    assert next_cursor is None
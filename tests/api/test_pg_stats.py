@@ -0,0 +1,92 @@
+import datetime
+
+from api.pg_stats import (
+    Snapshot,
+    StatementStats,
+    diff_snapshots,
+    format_statements,
+    rank_statements,
+)
+
+LIST_ARTICLES = StatementStats(
+    queryid=1,
+    query="/* ArticleManager.list_articles */ SELECT articles.id FROM articles",
+    calls=10,
+    total_time_ms=500.0,
+    rows=1000,
+)
+GET_USER = StatementStats(
+    queryid=2,
+    query="/* UserManager.get_user_by_email */ SELECT users.id FROM users",
+    calls=1000,
+    total_time_ms=800.0,
+    rows=1000,
+)
+UNTAGGED = StatementStats(
+    queryid=3, query="SELECT 1", calls=5000, total_time_ms=5000.0, rows=5000
+)
+
+
+def _snapshot(*statements: StatementStats) -> Snapshot:
+    return Snapshot(
+        taken_at=datetime.datetime.now(datetime.timezone.utc),
+        statements=list(statements),
+    )
+
+
+def test_statement_source_is_parsed_from_tag():
+    assert LIST_ARTICLES.source == "ArticleManager.list_articles"
+    assert UNTAGGED.source is None
+
+
+def test_rank_statements_by_total_mean_and_rows():
+    statements = [LIST_ARTICLES, GET_USER, UNTAGGED]
+
+    assert rank_statements(statements, "total") == [GET_USER, LIST_ARTICLES]
+    assert rank_statements(statements, "mean") == [LIST_ARTICLES, GET_USER]
+    assert rank_statements(statements, "rows", limit=1) == [LIST_ARTICLES]
+    assert rank_statements(statements, tagged_only=False)[0] == UNTAGGED
+
+
+def test_diff_snapshots_counts_calls_in_between():
+    slower = LIST_ARTICLES.model_copy(
+        update={"calls": 20, "total_time_ms": 1500.0, "rows": 2000}
+    )
+    new = StatementStats(
+        queryid=4,
+        query="/* ArticleManager.get_article_by_id */ SELECT 1",
+        calls=3,
+        total_time_ms=3.0,
+        rows=3,
+    )
+
+    diffs = diff_snapshots(
+        _snapshot(LIST_ARTICLES, GET_USER), _snapshot(slower, GET_USER, new)
+    )
+
+    by_source = {d.window.source: d for d in diffs}
+    assert set(by_source) == {
+        "ArticleManager.list_articles",
+        "ArticleManager.get_article_by_id",
+    }
+    window = by_source["ArticleManager.list_articles"]
+    assert window.window.calls == 10
+    assert window.window.mean_time_ms == 100.0
+    assert window.mean_before_ms == 50.0
+    assert window.mean_change == 1.0
+    assert by_source["ArticleManager.get_article_by_id"].mean_change is None
+
+
+def test_diff_snapshots_after_stats_reset_counts_everything():
+    reset = LIST_ARTICLES.model_copy(update={"calls": 2, "total_time_ms": 4.0})
+
+    (diff,) = diff_snapshots(_snapshot(LIST_ARTICLES), _snapshot(reset))
+
+    assert diff.window == reset
+
+
+def test_format_statements_strips_tags_from_queries():
+    lines = format_statements([LIST_ARTICLES]).splitlines()
+
+    assert lines[1].startswith("ArticleManager.list_articles ")
+    assert lines[1].endswith("SELECT articles.id FROM articles")
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from api.singleflight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_result():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    tasks = [asyncio.create_task(flights.do("k", call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert len(flights) == 1
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [1] * 5
+    assert flights.as_dict() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+async def test_calls_are_not_shared_once_done():
+    flights = SingleFlight()
+
+    async def call():
+        return object()
+
+    assert await flights.do("k", call) is not await flights.do("k", call)
+    assert flights.calls == 2
+
+
+async def test_other_keys_run_apart():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def call(value):
+        await release.wait()
+        return value
+
+    tasks = [
+        asyncio.create_task(flights.do(key, lambda key=key: call(key)))
+        for key in ("a", "b")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["a", "b"]
+    assert flights.calls == 2
+
+
+async def test_errors_are_shared():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(flights.do("k", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flights.calls == 1
+
+
+async def test_waiters_run_the_call_when_the_leader_is_cancelled():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        started.set()
+        if calls == 1:
+            await asyncio.Event().wait()
+        await asyncio.sleep(0.01)
+        return calls
+
+    leader = asyncio.create_task(flights.do("k", call))
+    await started.wait()
+    waiters = [asyncio.create_task(flights.do("k", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await asyncio.gather(*waiters) == [2] * 3
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert flights.calls == 2
+
+
+async def test_cancelled_waiters_do_not_cancel_the_call():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flights.do("k", call))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flights.do("k", call))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+
+    assert await leader == "done"
+
+
+async def test_waiters_keep_their_own_timeout():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flights.do("k", call))
+    await asyncio.sleep(0)
+
+    with pytest.raises(TimeoutError):
+        await flights.do("k", call, timeout=0.01)
+    release.set()
+    assert await leader == "done"
+
+
+async def test_waiters_run_the_call_on_errors_of_the_leader():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        if calls == 1:
+            raise TimeoutError()
+        await asyncio.sleep(0.01)
+        return calls
+
+    leader = asyncio.create_task(
+        flights.do("k", call, retry_on=(TimeoutError,))
+    )
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(flights.do("k", call, retry_on=(TimeoutError,)))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [2] * 3
+    with pytest.raises(TimeoutError):
+        await leader
+    assert flights.calls == 2
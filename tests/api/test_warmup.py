@@ -0,0 +1,81 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from api.articles.models import Article, Comment, Like
+from api.db import async_session_maker, create_engine
+from api.settings import DbPoolSettings, Settings, WarmUpSettings
+from api.warmup import fill_pool, prime_caches, warm_up
+
+DB_URL = Settings().get_db_url()
+
+
+@pytest.mark.integration
+async def test_fill_pool_opens_connections():
+    engine = create_engine(DB_URL, pool=DbPoolSettings(size=3))
+    try:
+        assert await fill_pool(engine, 5) == 3
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_fill_pool_skips_null_pool():
+    engine = create_engine(DB_URL)
+    try:
+        assert await fill_pool(engine, 5) == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_warm_up_builds_openapi_schema(app_instance):
+    app_instance.openapi_schema = None
+
+    await warm_up(app_instance, WarmUpSettings())
+
+    assert app_instance.openapi_schema is not None
+
+
+@pytest.mark.integration
+async def test_prime_caches_stores_latest_articles(
+    app_instance, api_client: AsyncClient, query_budget
+):
+    session_class = async_session_maker(app_instance.state.db_engine)
+    async with session_class() as session:
+        article = Article(title="Primed")
+        session.add(article)
+        await session.flush()
+        session.add_all(
+            [
+                Comment(article_id=article.id, content="Comment"),
+                Like(likeable_type="Article", likeable_id=article.id, likes=2),
+            ]
+        )
+        await session.commit()
+
+    try:
+        assert await prime_caches(app_instance, articles=1) == 1
+
+        # the first requests only read the versions, the JSON is cached
+        with query_budget(max_queries=1):
+            detail = await api_client.get(f"/api/articles/{article.id}")
+        with query_budget(max_queries=1):
+            page = await api_client.get("/api/articles", params={"limit": 1})
+
+        assert detail.status_code == 200
+        assert detail.json()["article_likes"] == 2
+        assert detail.json()["comments"][0]["content"] == "Comment"
+        assert [item["id"] for item in page.json()["items"]] == [article.id]
+    finally:
+        async with session_class() as session:
+            await session.execute(
+                delete(Like).where(Like.likeable_id == article.id)
+            )
+            await session.execute(
+                delete(Comment).where(Comment.article_id == article.id)
+            )
+            await session.execute(
+                delete(Article).where(Article.id == article.id)
+            )
+            await session.commit()
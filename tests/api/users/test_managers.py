@@ -1,6 +1,13 @@
 import pytest
 
-from api.users.managers import PasswordManager, UserAlreadyExists, UserManager
+from api.cache import Cache, MemoryBackend
+from api.users.managers import (
+    REVOKED_TOKEN_KEY,
+    PasswordManager,
+    UserAlreadyExists,
+    UserManager,
+    token_cache_key,
+)
 
 password_manager = PasswordManager(salt="a" * 16)
 
@@ -66,3 +73,18 @@ async def test_should_raise_error_same_email_user_creation(db_session):
 
     with pytest.raises(UserAlreadyExists):
         await user_manager.create_user("test@example.com", commit=True)
+
+
+@pytest.mark.integration
+async def test_revoked_tokens_are_shared(db_session):
+    cache = Cache(MemoryBackend())
+    user_manager = UserManager(db_session, password_manager, cache=cache)
+
+    await user_manager.add_to_jwt_denylist("revoked", commit=True)
+
+    key = REVOKED_TOKEN_KEY.format(token_cache_key("revoked"))
+    assert await cache.get(key) == b"1"
+    # another worker trusts the shared revocation without the database
+    await cache.set(REVOKED_TOKEN_KEY.format(token_cache_key("other")), b"1")
+    assert await user_manager.is_token_revoked("other") is True
+    assert await user_manager.is_token_revoked("valid") is False
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.mark.integration
+async def test_register_user_query_budget(api_client, query_budget):
+    with query_budget(max_queries=2):
+        response = await api_client.post(
+            "http://test/users",
+            json={
+                "registration": {
+                    "email": "budget@example.com",
+                    "password": "password123",
+                    "password_confirmation": "password123",
+                }
+            },
+        )
+
+    assert response.status_code == 200
@@ -0,0 +1,37 @@
+import pytest
+
+from api.users.managers import PasswordManager, UserManager
+from tests.plan_helpers import (
+    assert_estimated_rows,
+    assert_no_seq_scan,
+    assert_uses_index,
+    explain_calls,
+)
+
+pytestmark = pytest.mark.query_plan
+
+password_manager = PasswordManager(salt="a" * 16)
+
+
+async def test_get_user_by_email_plan(plan_session):
+    manager = UserManager(plan_session, password_manager)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.get_user_by_email("user42@example.com")
+    )
+
+    assert_no_seq_scan(plan, "users")
+    assert_uses_index(plan, "users_email_key")
+    assert_estimated_rows(plan, max_rows=1)
+
+
+async def test_is_token_revoked_plan(plan_session):
+    manager = UserManager(plan_session, password_manager)
+
+    (plan,) = await explain_calls(
+        plan_session, lambda: manager.is_token_revoked("not-a-revoked-token")
+    )
+
+    assert_no_seq_scan(plan, "jwt_denylists")
+    assert_uses_index(plan, "jwt_denylists_pkey")
+    assert_estimated_rows(plan, max_rows=1)
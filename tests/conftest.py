@@ -11,12 +11,44 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from api.app import create_app, lifespan
-from api.db import async_session_maker
-from api.dependencies import get_db_session
+from api.cache import MemoryBackend
+from api.db import async_session_maker, create_engine
+from api.dependencies import get_db_read_session, get_db_session
 from api.settings import Settings
 
+from ._fixtures.cache_fixtures import *  # noqa: F403
+from ._fixtures.query_fixtures import *  # noqa: F403
 from ._fixtures.user_fixtures import *  # noqa: F403
 from .db_helpers import create_db, db_exists, drop_db
+from .plan_helpers import seed_db
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register options of the query plan tests."""
+    parser.addoption(
+        "--query-plans",
+        action="store_true",
+        default=False,
+        help="run query plan tests against a large seeded database",
+    )
+    parser.addoption(
+        "--query-plans-scale",
+        type=int,
+        default=50_000,
+        help="number of articles (and users) seeded for query plan tests",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skip query plan tests unless they were asked for."""
+    if config.getoption("--query-plans"):
+        return
+    skip = pytest.mark.skip(reason="needs --query-plans to run")
+    for item in items:
+        if "query_plan" in item.keywords:
+            item.add_marker(skip)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -70,6 +102,8 @@ async def app_instance() -> AsyncGenerator[fastapi.FastAPI, None]:
     """Create a FastApi App instance for tests."""
     settings = Settings()
     settings.DB_NAME = "test__" + settings.DB_NAME
+    # no pooling in tests, connections are opened per test
+    settings.DB_POOL.enabled = False
 
     # we need to make sure the database exists
     await _db_manager(settings.get_db_url())
@@ -78,10 +112,43 @@ async def app_instance() -> AsyncGenerator[fastapi.FastAPI, None]:
     # run the lifespan (initialize db connection, etc.)
     async with lifespan(app):
         await _run_migrations(app.state.db_engine)
+        if app.state.warm_up_task is not None:
+            await app.state.warm_up_task
 
         yield app
 
 
+@pytest.fixture(scope="session")
+async def plan_engine(
+    request: pytest.FixtureRequest,
+) -> AsyncGenerator[AsyncEngine, None]:
+    """Create a database seeded at production scale for query plan tests.
+
+    The database is separate from the one of the other tests, so their
+    queries are not slowed down by the seeded data.
+    """
+    settings = Settings()
+    settings.DB_NAME = "test_plans__" + settings.DB_NAME
+    await _db_manager(settings.get_db_url())
+
+    engine = create_engine(settings.get_db_url())
+    await _run_migrations(engine)
+    await seed_db(engine, scale=request.config.getoption("--query-plans-scale"))
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def plan_session(
+    plan_engine: AsyncEngine,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Create a session on the seeded query plan database."""
+    async with async_session_maker(plan_engine)() as session:
+        yield session
+
+
 @pytest.fixture
 async def api_client(
     app_instance: fastapi.FastAPI,
@@ -91,6 +158,10 @@ async def api_client(
 
     # use one sessions for all connections
     app_instance.dependency_overrides[get_db_session] = lambda: db_session
+    app_instance.dependency_overrides[get_db_read_session] = lambda: db_session
+    # the rows cached by earlier tests were rolled back
+    app_instance.state.shared_cache.backend = MemoryBackend()
+    app_instance.state.article_fragments.forget_pages()
 
     client = AsyncClient(
         transport=ASGITransport(app_instance),
@@ -0,0 +1,146 @@
+"""
+Helpers for query plan tests.
+
+# Example usage:
+
+    async def test_plan(plan_session):
+        manager = ArticleManager(plan_session)
+        (plan,) = await explain_calls(
+            plan_session, lambda: manager.get_article_by_id(1)
+        )
+        assert_no_seq_scan(plan, "articles", "comments")
+
+"""
+
+import json
+from typing import Any, Awaitable, Callable, Iterator
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+COMMENTS_PER_ARTICLE = 10
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO articles (title, short_description, description, created_at)
+    SELECT 'Article ' || i, 'Short ' || i, repeat('Lorem ipsum ', 100),
+        now() - make_interval(mins => i)
+    FROM generate_series(1, CAST(:scale AS integer)) AS i
+    """,
+    """
+    INSERT INTO comments (article_id, content, created_at)
+    SELECT a.id, 'Comment ' || c, a.created_at + make_interval(mins => c)
+    FROM articles AS a, generate_series(1, CAST(:comments AS integer)) AS c
+    """,
+    """
+    INSERT INTO likes (likeable_type, likeable_id, likes, dislikes)
+    SELECT 'Article', a.id, (random() * 100)::integer,
+        (random() * 10)::integer
+    FROM articles AS a
+    """,
+    """
+    INSERT INTO users (email, encrypted_password)
+    SELECT 'user' || i || '@example.com', md5(i::text)
+    FROM generate_series(1, CAST(:scale AS integer)) AS i
+    """,
+    """
+    INSERT INTO jwt_denylists (jti)
+    SELECT md5('token' || i)
+    FROM generate_series(1, CAST(:scale AS integer)) AS i
+    """,
+]
+
+
+async def seed_db(engine: AsyncEngine, scale: int) -> None:
+    """Fill the tables with `scale` articles/users and refresh statistics."""
+    params = {"scale": scale, "comments": COMMENTS_PER_ARTICLE}
+    async with engine.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement), params)
+
+    # VACUUM is not allowed to run inside a transaction block; it marks the
+    # pages all-visible, as they are in a live database, so index only scans
+    # are planned
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("VACUUM ANALYZE")
+
+
+async def explain_calls(
+    session: AsyncSession, call: Callable[[], Awaitable[Any]]
+) -> list[dict[str, Any]]:
+    """Run `call` and return the plan of every statement it ran."""
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        await call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    conn = await session.connection()
+    plans = []
+    for statement, parameters in statements:
+        res = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        # the asyncpg dialect decodes json columns already
+        plans.append(res.scalar()[0]["Plan"])
+    return plans
+
+
+def iter_plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Iterate over a plan node and all of its children."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def assert_no_seq_scan(plan: dict[str, Any], *tables: str) -> None:
+    """Assert none of `tables` is read with a sequential scan."""
+    seq_scans = {
+        node["Relation Name"]
+        for node in iter_plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+    }
+    assert not seq_scans.intersection(tables), (
+        f"Sequential scan on {sorted(seq_scans.intersection(tables))}:\n"
+        f"{json.dumps(plan, indent=2)}"
+    )
+
+
+def assert_uses_index(plan: dict[str, Any], index_name: str) -> None:
+    """Assert the plan reads the index `index_name`."""
+    indexes = {
+        node.get("Index Name")
+        for node in iter_plan_nodes(plan)
+        if "Index Name" in node
+    }
+    assert index_name in indexes, (
+        f"Index {index_name} is not used, used: {sorted(indexes)}:\n"
+        f"{json.dumps(plan, indent=2)}"
+    )
+
+
+def assert_index_only_scan(plan: dict[str, Any], index_name: str) -> None:
+    """Assert the plan reads the index `index_name` without the table."""
+    scans = {
+        node["Node Type"]
+        for node in iter_plan_nodes(plan)
+        if node.get("Index Name") == index_name
+    }
+    assert scans == {"Index Only Scan"}, (
+        f"Index {index_name} is not read by an index only scan: "
+        f"{sorted(scans)}:\n{json.dumps(plan, indent=2)}"
+    )
+
+
+def assert_estimated_rows(plan: dict[str, Any], max_rows: int) -> None:
+    """Assert the planner expects the statement to return few rows."""
+    assert plan["Plan Rows"] <= max_rows, (
+        f"Expected at most {max_rows} rows, estimated {plan['Plan Rows']}"
+    )